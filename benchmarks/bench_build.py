@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Dictionary Build Benchmark & Regression Gate
+分別量測 build_dict.py 各階段的耗時與記憶體，與基準值比較；並確認完整建置的輸出
+與 repo 中的 dictionary.json 逐位元組相同
+
+階段：
+- parse_cin:    parse_cin_file（倉頡、注音）
+- parse_fcitx:  parse_fcitx_table（無蝦米）
+- charset:      計算 Big5 字元集點陣圖（不使用快取）
+- filter:       以點陣圖過濾 CJK / Big5
+- filter_encode: 逐字 is_cjk_character / is_big5_compatible 過濾（對照）
+- pinyin:       get_pinyin_with_tone（逐字）
+- pinyin_bulk:  resolve_pinyin_bulk（建置實際使用）
+- build_rows:   組合字典列
+- save:         save_dictionary（寫入暫存目錄）
+- build:        完整 build_dictionary（不使用快取）
+
+每階段回報最短耗時（--repeat 次）與 tracemalloc 記錄的配置高峰（另跑一次，不影響計時），
+並回報整個行程的 peak RSS（含 tracemalloc 的額外開銷），同樣與基準值比較。基準值預設為
+benchmarks/golden/build_baseline.json（納入版控，CI 與新 clone 皆會比較）；耗時依機器而異，
+在不同規格的機器上請以 --update-baseline 重新產生並提交，或以 --baseline 指定本機檔案。
+
+Usage:
+    python3 benchmarks/bench_build.py [--repeat N] [--threshold 0.25] [--baseline FILE]
+                                      [--update-baseline] [--jobs N]
+
+另以 --pinyin-heteronyms 模式建置一次（不寫檔），確認含拼音的產出檔未超出多音字模式的 gzip 上限。
+
+任一階段或 peak RSS 超過基準值的 (1 + threshold) 倍、輸出與 dictionary.json 不同，或多音字模式超出大小上限時
+以 exit code 1 結束。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import build_dict  # noqa: E402
+from charset_bitmap import DEFAULT_CHARSET, load_charset  # noqa: E402
+from packed_dict import pack_dictionary  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'golden', 'build_baseline.json')
+
+# 低於此耗時 / 記憶體差異時不視為退步（避免微小階段的量測雜訊）
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 256 * 1024
+
+
+def quiet(func):
+    """執行 func 並隱藏其輸出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func()
+
+
+def measure(func, repeat: int) -> dict:
+    """回傳 {'seconds': 最短耗時, 'peak_bytes': 配置高峰} 與最後一次結果"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = quiet(func)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    quiet(func)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}, result
+
+
+def peak_rss_bytes() -> int:
+    """行程的 peak RSS（Linux 回傳 KB，macOS 回傳 bytes）"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def run_stages(repeat: int, jobs: int) -> tuple:
+    """依序量測各階段，回傳 ({stage: 結果}, 完整建置的字典)"""
+    stages = {}
+    cangjie_file = build_dict.find_first_existing_file(build_dict.CANGJIE_FILES)
+
+    stages['parse_cin'], (cj_data, zhuyin_data) = measure(
+        lambda: (build_dict.parse_cin_file(cangjie_file), build_dict.parse_cin_file(build_dict.BOPOMOFO_FILE)),
+        repeat)
+    stages['parse_fcitx'], boshiamy_data = measure(
+        lambda: build_dict.parse_fcitx_table(build_dict.BOSHIAMY_FILE), repeat)
+
+    all_chars = sorted(set(cj_data) | set(zhuyin_data) | set(boshiamy_data))
+    stages['charset'], charset = measure(lambda: load_charset(DEFAULT_CHARSET), repeat)
+    stages['filter'], (passed, _, _) = measure(lambda: build_dict._filter_shard(all_chars, charset), repeat)
+    stages['filter_encode'], _ = measure(
+        lambda: [c for c in all_chars if build_dict.filter_reason(c) is None], repeat)
+
+    # 先查詢一次，排除 pypinyin 首次載入的時間
+    build_dict.get_pinyin_with_tone(passed[0])
+    stages['pinyin'], _ = measure(lambda: [build_dict.get_pinyin_with_tone(c) for c in passed], repeat)
+    stages['pinyin_bulk'], pinyin_map = measure(lambda: build_dict.resolve_pinyin_bulk(passed), repeat)
+
+    stages['build_rows'], rows = measure(
+        lambda: build_dict._build_shard(passed, cj_data, zhuyin_data, boshiamy_data, pinyin_map), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dictionary.json')
+
+        def save():
+            # 每次重新寫入，避免 write_if_changed 略過
+            if os.path.exists(path):
+                os.remove(path)
+            build_dict.save_dictionary(rows, path)
+
+        stages['save'], _ = measure(save, repeat)
+
+    stages['build'], dictionary = measure(lambda: build_dict.build_dictionary(None, jobs=jobs), repeat)
+    return stages, dictionary
+
+
+def check_equivalence(dictionary: list) -> list:
+    """完整建置的輸出與 dictionary.json 比較，回傳不同的字元（最多 10 個）"""
+    data = json.dumps(dictionary, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(build_dict.OUTPUT_FILE, 'rb') as f:
+        committed = f.read()
+    if data == committed:
+        return []
+    expected = {entry[0]: entry for entry in json.loads(committed)}
+    actual = {entry[0]: entry for entry in dictionary}
+    differing = sorted(c for c in expected.keys() | actual.keys() if expected.get(c) != actual.get(c))
+    # 內容相同但位元組不同（如排序或序列化方式改變）
+    return [(c, expected.get(c), actual.get(c)) for c in differing[:10]] or [('<order>', None, None)]
+
+
+def check_heteronym_budgets() -> list:
+    """以多音字模式建置（不寫檔），回傳 (檔名, gzip 大小, 上限)，並標出超出上限者"""
+    dictionary = quiet(lambda: build_dict.build_dictionary(None, heteronym=True))
+    encoded = {
+        'dictionary.json': json.dumps(dictionary, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+        'dictionary.bin': pack_dictionary(dictionary),
+        'dictionary-data.js': build_dict.encode_dictionary_js(dictionary),
+    }
+    budgets = build_dict.size_budgets(heteronym=True)
+    return [(name, build_dict.compressed_sizes(data)[0], budgets[name]) for name, data in encoded.items()]
+
+
+def compare(stages: dict, rss: int, baseline: dict, threshold: float) -> list:
+    """回傳退步的階段（與 peak RSS）說明"""
+    regressions = []
+    base_rss = baseline.get('peak_rss_bytes')
+    if base_rss and rss > base_rss * (1 + threshold) + MIN_MEMORY_DELTA:
+        regressions.append(f"peak RSS: {base_rss / 1e6:.1f} MB -> {rss / 1e6:.1f} MB")
+    for name, current in stages.items():
+        base = baseline['stages'].get(name)
+        if not base:
+            continue
+        if current['seconds'] > base['seconds'] * (1 + threshold) + MIN_TIME_DELTA:
+            regressions.append(f"{name}: {base['seconds'] * 1000:.1f} ms -> {current['seconds'] * 1000:.1f} ms")
+        if current['peak_bytes'] > base['peak_bytes'] * (1 + threshold) + MIN_MEMORY_DELTA:
+            regressions.append(f"{name}: peak {base['peak_bytes'] / 1e6:.1f} MB -> "
+                               f"{current['peak_bytes'] / 1e6:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark build_dict.py stages against a baseline")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (best is reported)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown / memory growth per stage and peak RSS (0.25 = 25%%)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument('--update-baseline', action='store_true', help="overwrite the baseline with this run")
+    parser.add_argument('--jobs', type=int, default=1, help="jobs for the full build stage")
+    args = parser.parse_args()
+
+    stages, dictionary = run_stages(args.repeat, args.jobs)
+    rss = peak_rss_bytes()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        baseline.setdefault('stages', {})
+
+    print(f"{'Stage':<14} {'Time':>10} {'Baseline':>10} {'Peak alloc':>11}")
+    for name, stage in stages.items():
+        base = baseline.get('stages', {}).get(name)
+        base_text = f"{base['seconds'] * 1000:8.1f}ms" if base else f"{'-':>10}"
+        print(f"{name:<14} {stage['seconds'] * 1000:8.1f}ms {base_text} {stage['peak_bytes'] / 1e6:9.1f}MB")
+    base_rss = baseline.get('peak_rss_bytes')
+    base_rss_text = f" (baseline {base_rss / 1e6:.1f} MB)" if base_rss else ""
+    print(f"Peak RSS: {rss / 1e6:.1f} MB{base_rss_text}")
+
+    failed = False
+    mismatches = check_equivalence(dictionary)
+    if mismatches:
+        failed = True
+        print(f"\n[ERROR] Build output differs from {os.path.basename(build_dict.OUTPUT_FILE)}:")
+        for char, expected, actual in mismatches:
+            print(f"  {char}: {expected!r} != {actual!r}")
+    else:
+        print(f"Output identical to {os.path.basename(build_dict.OUTPUT_FILE)} ({len(dictionary):,} entries)")
+
+    print("Heteronym build (gzip / budget):")
+    for name, size, budget in check_heteronym_budgets():
+        status = ""
+        if size > budget:
+            failed = True
+            status = "  OVER BUDGET"
+        print(f"  {name:<20} {size / 1024:7.1f} KB / {budget / 1024:.0f} KB{status}")
+
+    if baseline:
+        regressions = compare(stages, rss, baseline, args.threshold)
+        if regressions:
+            failed = True
+            print(f"\n[ERROR] Regressions over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'peak_rss_bytes': rss,
+                       'stages': stages}, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
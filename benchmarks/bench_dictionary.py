@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Dictionary API Benchmark
+比較 json.load(dictionary.json) 與 dictionary.Dictionary（mmap dictionary.bin）的
+啟動時間、記憶體增量與標註整份新聞語料的耗時，並確認查詢結果與 dictionary.json 一致
+
+Usage:
+    python3 benchmarks/bench_dictionary.py [--repeat N]
+
+啟動時間與記憶體在獨立的子行程中量測；任一查詢結果不一致時以 exit code 1 結束。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from build_dict import CANGJIE_MAP, DEFAULT_CORPUS_FILES, OUTPUT_FILE, iter_corpus_text  # noqa: E402
+from dictionary import Dictionary  # noqa: E402
+from packed_dict import PINYIN_HETERONYM_SEP  # noqa: E402
+
+# 子行程：載入字典並查詢一個字，回報耗時與 RSS 增量 (KB，Linux 讀取 /proc/self/status)
+STARTUP = {
+    'json.load': "import json; d = {e[0]: e for e in json.load(open({path!r}, encoding='utf-8'))}; d['字']",
+    'Dictionary': "from dictionary import Dictionary; d = Dictionary(); d.lookup('字')",
+}
+_PROBE = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+def rss():
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+before = rss()
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, rss() - before)
+"""
+
+
+def startup(code: str) -> tuple:
+    """回傳 (載入耗時秒數, RSS 增量 KB)"""
+    probe = _PROBE.format(root=ROOT, code=code.replace('{path!r}', repr(OUTPUT_FILE)))
+    output = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True).stdout
+    seconds, rss = output.split()
+    return float(seconds), int(rss)
+
+
+def check(dictionary: Dictionary, rows: list) -> list:
+    """逐字比對 lookup / by_code / by_pinyin，回傳不一致的說明"""
+    keys = {symbol: key for key, symbol in CANGJIE_MAP.items()}
+    problems = []
+    for row in rows:
+        char = row[0]
+        if list(dictionary.lookup(char) or []) != row:
+            problems.append(f"lookup {char}: {dictionary.lookup(char)} != {row}")
+        if row[2] and char not in dictionary.by_code('cangjie', ''.join(keys[s] for s in row[2])):
+            problems.append(f"by_code cangjie {row[2]}: missing {char}")
+        if row[3] and char not in dictionary.by_code('boshiamy', row[3]):
+            problems.append(f"by_code boshiamy {row[3]}: missing {char}")
+        for reading in filter(None, row[4].split(PINYIN_HETERONYM_SEP)):
+            if char not in dictionary.by_pinyin(reading):
+                problems.append(f"by_pinyin {reading}: missing {char}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Dictionary API against json.load")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print("Startup (separate process, best of runs):")
+    for name, code in STARTUP.items():
+        runs = [startup(code) for _ in range(args.repeat)]
+        print(f"  {name:<11} {min(s for s, _ in runs) * 1000:7.1f} ms, "
+              f"RSS +{min(r for _, r in runs) / 1024:.1f} MB")
+
+    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    table = {row[0]: row for row in rows}
+    text = ''.join(t for path in DEFAULT_CORPUS_FILES if os.path.exists(path) for t in iter_corpus_text(path))
+
+    with Dictionary() as dictionary:
+        best_json = best_api = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            expected = [table[c][2] if c in table else None for c in text]
+            best_json = min(best_json, time.perf_counter() - start)
+            start = time.perf_counter()
+            encoded = dictionary.encode(text, 'cangjie')
+            best_api = min(best_api, time.perf_counter() - start)
+        print(f"Encode corpus ({len(text):,} characters, cangjie):")
+        print(f"  dict lookup {best_json * 1000:7.1f} ms")
+        print(f"  encode()    {best_api * 1000:7.1f} ms")
+
+        problems = check(dictionary, rows)
+        if encoded != expected:
+            problems.append("encode() differs from dictionary.json")
+    print(f"Checked {len(rows):,} entries: {len(problems)} mismatches")
+    if problems:
+        for line in problems[:10]:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+HTML Extraction Benchmark
+比較各文章擷取後端 (html_extract.py) 每頁的 CPU 時間，並確認輸出與原本的 BeautifulSoup 實作一致
+
+Usage:
+    python3 benchmarks/bench_extract.py [--corpus DIR] [--pages N] [--repeat N]
+
+--corpus 指定存放 *.html 的目錄（例如抓取時保存的新聞頁面）；
+未指定時以固定亂數種子產生模擬新聞頁面（含大量 script / nav / 廣告區塊）。
+incr/* 為 fetch_news 預設的邊下載邊擷取路徑（IncrementalExtractor，分別以 lxml 與 html.parser 斷詞）。
+另以非 UTF-8 頁面（Big5 / GBK，<meta> 宣告或僅於 Content-Type 標頭宣告，含第一個區塊只有 20 bytes
+的情況）驗證 incr/* 的解碼，輸出須與 UTF-8 版本相同。
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_news import parse_article_content  # noqa: E402
+from html_extract import (BACKENDS, INCREMENTAL_PARSERS, IncrementalExtractor,  # noqa: E402
+                          available_backends, extract_bs4)
+
+# fetch_news 預設路徑：邊下載邊擷取，每次讀入的區塊大小
+CHUNK_SIZE = 16 * 1024
+
+SENTENCES = [
+    '人工智慧技術在今年持續突破，深度學習模型的規模與能力大幅提升。',
+    '半導體產業迎來新一代製程，晶片效能提升同時功耗顯著下降。',
+    '雲端服務供應商擴建資料中心，以因應企業對運算資源的需求。',
+    'Researchers unveiled a new chip architecture for machine learning workloads.',
+    'The company said its cloud revenue grew faster than analysts expected.',
+    '資安專家提醒使用者更新系統，避免遭受勒索軟體攻擊。',
+    '電動車市場競爭激烈，各家廠商推出搭載自動駕駛功能的新車款。',
+]
+
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return ''.join(
+        '<p>' + ''.join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4))) + '</p>\n'
+        for _ in range(count))
+
+
+def synthetic_page(rng: random.Random) -> bytes:
+    """產生一頁模擬新聞網頁（結構隨機選自常見版型）"""
+    scripts = ''.join(f'<script>var cfg{i} = {{"k": "{"x" * rng.randint(500, 4000)}"}};</script>\n'
+                      for i in range(rng.randint(5, 30)))
+    nav = '<nav><ul>' + ''.join(f'<li><a href="/c/{i}">分類 {i}</a></li>' for i in range(80)) + '</ul></nav>'
+    related = '<aside>' + _paragraphs(rng, 10) + '</aside>'
+    footer = '<footer>' + _paragraphs(rng, 5) + '</footer>'
+    layout = rng.choice(['article', 'article-body', 'post-content', 'main', 'plain', 'short-article'])
+    body = _paragraphs(rng, rng.randint(10, 40))
+    if layout == 'article':
+        main = f'<article><h1>標題</h1>{body}</article>'
+    elif layout == 'short-article':
+        main = f'<article><p>短摘要。</p></article><div class="story-body">{body}</div>'
+    elif layout == 'plain':
+        main = f'<div id="wrap">{body}</div>'
+    elif layout == 'main':
+        main = f'<main>{body}</main>'
+    else:
+        main = f'<div class="col {layout} clearfix"><div class="ad">廣告</div>{body}</div>'
+    html = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>t</title>{scripts}'
+            f'<style>{"body{margin:0}" * 200}</style></head><body><header>{nav}</header>'
+            f'{main}{related}{footer}</body></html>')
+    return html.encode('utf-8')
+
+
+def load_corpus(corpus_dir: str, pages: int) -> list:
+    if corpus_dir:
+        files = sorted(glob.glob(os.path.join(corpus_dir, '*.html')))[:pages]
+        result = []
+        for path in files:
+            with open(path, 'rb') as f:
+                result.append(f.read())
+        return result
+    rng = random.Random(20260205)
+    return [synthetic_page(rng) for _ in range(pages)]
+
+
+def incremental_extractor(parser: str, charset: str = None, first_chunk: int = CHUNK_SIZE):
+    """
+    以 IncrementalExtractor 分段餵入頁面（結果確定後即停止），模擬 fetch_news 的預設路徑
+    charset 為 Content-Type 標頭的編碼；first_chunk 為第一個網路區塊的大小
+    """
+    def extract(html: bytes, measure=None):
+        extractor = IncrementalExtractor(measure=measure, parser=parser, charset=charset)
+        chunks = [html[:first_chunk]] + [html[start:start + CHUNK_SIZE]
+                                         for start in range(first_chunk, len(html), CHUNK_SIZE)]
+        for chunk in chunks:
+            if extractor.feed(chunk):
+                break
+        return extractor.close()
+    return extract
+
+
+# (名稱, 頁面編碼, <meta> 是否宣告編碼, 標頭編碼, 第一個區塊大小)
+CHARSET_FIXTURES = [
+    ('big5 meta', 'big5', True, None, CHUNK_SIZE),
+    ('big5 meta, split@20', 'big5', True, None, 20),
+    ('big5 header only', 'big5', False, 'big5', CHUNK_SIZE),
+    ('gbk meta, split@20', 'gbk', True, None, 20),
+    ('gbk header only, split@20', 'gbk', False, 'gbk', 20),
+]
+
+
+def check_charsets(parsers: list, pages: int = 5) -> int:
+    """非 UTF-8 頁面經 incr/* 擷取的結果須與 UTF-8 版本一致，回傳不一致的頁數"""
+    rng = random.Random(20260301)
+    originals = [synthetic_page(rng) for _ in range(pages)]
+    expected = [parse_article_content(page, 'zh', extract_bs4) for page in originals]
+    print("Charset fixtures (incremental path):")
+    total = 0
+    for name, encoding, meta, header, first_chunk in CHARSET_FIXTURES:
+        declaration = f'<meta charset="{encoding}">' if meta else ''
+        encoded = [page.decode('utf-8').replace('<meta charset="utf-8">', declaration).encode(encoding)
+                   for page in originals]
+        for parser in parsers:
+            extractor = incremental_extractor(parser, header, first_chunk)
+            mismatches = sum(1 for page, want in zip(encoded, expected)
+                             if parse_article_content(page, 'zh', extractor) != want)
+            total += mismatches
+            print(f"  {name:<26} incr/{parser:<12} mismatches: {mismatches}/{pages}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article extraction backends")
+    parser.add_argument('--corpus', metavar='DIR', help="directory of saved *.html pages")
+    parser.add_argument('--pages', type=int, default=60, help="pages to use (default: 60)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per backend (best is reported)")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.pages)
+    if not corpus:
+        print("No pages found")
+        sys.exit(1)
+    total_kb = sum(map(len, corpus)) / 1024
+    print(f"Pages: {len(corpus)} ({total_kb:.0f} KB, {total_kb / len(corpus):.0f} KB/page)")
+
+    backends = [name for name in ['bs4'] + [n for n in BACKENDS if n != 'bs4']
+                if name in available_backends()]
+    extractors = [(name, BACKENDS[name]) for name in backends]
+    parsers = [parser for parser in INCREMENTAL_PARSERS if parser != 'lxml' or 'lxml' in available_backends()]
+    extractors += [(f'incr/{parser}', incremental_extractor(parser)) for parser in parsers]
+    reference = None
+    baseline_ms = None
+    failed = False
+
+    for name, extractor in extractors:
+        best = float('inf')
+        outputs = None
+        for _ in range(args.repeat):
+            start = time.process_time()
+            outputs = [parse_article_content(page, 'zh', extractor) for page in corpus]
+            best = min(best, time.process_time() - start)
+        per_page_ms = best * 1000 / len(corpus)
+
+        if reference is None:
+            reference = outputs
+            baseline_ms = per_page_ms
+            print(f"  {name:<16} {per_page_ms:8.2f} ms/page  (reference)")
+            continue
+
+        mismatches = sum(1 for a, b in zip(reference, outputs) if a != b)
+        print(f"  {name:<16} {per_page_ms:8.2f} ms/page  {baseline_ms / per_page_ms:5.1f}x  "
+              f"mismatches: {mismatches}/{len(corpus)}")
+        if mismatches and not args.corpus:
+            failed = True
+
+    # 編碼處理與頁面內容無關，一律以模擬頁面檢查
+    if check_charsets(parsers):
+        failed = True
+
+    # 模擬頁面為標準 HTML，各後端輸出必須與 BeautifulSoup 完全一致
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
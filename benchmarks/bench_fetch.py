@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+End-to-End Fetch Benchmark
+以錄製的 fixture（fetch_replay.py record）離線重播，完整執行 fetch_news.fetch_daily_news，
+回報吞吐量、每篇文章延遲 p50 / p95 與各階段 CPU 時間
+
+Usage:
+    python3 benchmarks/bench_fetch.py [--fixtures DIR] [--latency MS] [--failure-rate P]
+                                      [--seed N] [--report FILE] [--feed-order] [--verbose]
+
+未指定 --fixtures 時，以固定亂數種子產生模擬 fixture（Google News RSS、轉址、新聞網頁、
+少量 PDF / 404 / 非科技文章；多數 Google News 連結可離線解碼，其餘需轉址）。重播伺服器在獨立行程執行，不計入量測的 CPU 時間。
+
+另確認網域排序：連結轉址到其他主機且一再失敗的網域（以 entry.source 計）須排到門檻以下不再抓取，
+歷史衰減後再次抓取；不符時以 exit code 1 結束。
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_news  # noqa: E402
+from fetch_priority import DECAY_HALF_LIFE, DOMAIN_WEIGHT, DomainHistory, url_domain  # noqa: E402
+from fetch_replay import FixtureArchive, ReplayEngine, ReplayServer  # noqa: E402
+from run_report import RunReport  # noqa: E402
+
+ZH_WORDS = ['人工智慧', '晶片', '半導體', '雲端', '資安', '量子電腦', '電動車', '自動駕駛', '機器學習',
+            '資料中心', '演算法', '伺服器', '處理器', '軟體', '網路', '手機', '新創', '區塊鏈',
+            '生成式', '模型', '訓練', '推論', '製程', '封裝', '供應鏈', '營收', '市場', '發表',
+            '合作', '投資', '研發', '升級', '突破', '推出', '布局', '擴產', '需求', '成長']
+EN_WORDS = ['AI', 'chip', 'semiconductor', 'cloud', 'security', 'quantum', 'robot', 'software',
+            'startup', 'data', 'model', 'training', 'inference', 'server', 'network', 'smartphone',
+            'battery', 'electric', 'vehicle', 'autonomous', 'platform', 'developers', 'launch',
+            'revenue', 'market', 'growth', 'investment', 'research', 'upgrade', 'breakthrough',
+            'partnership', 'factory', 'demand', 'users', 'device', 'app', 'computing', 'digital']
+FILLER = {'zh': list('的了在是與和及將於也並更已被由從對為其中此年月日'),
+          'en': ['the', 'a', 'of', 'to', 'and', 'in', 'for', 'with', 'on', 'said', 'new', 'its']}
+# 非科技新聞標題用字（不含任何科技關鍵字）
+GENERAL_WORDS = {'zh': ['颱風', '棒球', '選舉', '立法院', '美食', '旅遊', '演唱會', '天氣', '交通', '地震',
+                        '觀光', '房價', '夜市', '電影', '展覽', '市長', '豪雨', '球季', '廟會', '老街'],
+                 'en': ['Election', 'Weather', 'Football', 'Museum', 'Festival', 'Concert', 'Holiday',
+                        'Soccer', 'Tourism', 'Senate', 'Flood', 'Olympic', 'Movie', 'Recipe', 'Wedding',
+                        'Court', 'Budget', 'Votes', 'Storm', 'Mayor', 'Baseball', 'Theater']}
+PUBLISHERS = [f'news{i}.example.com' for i in range(15)]
+
+# 可離線解碼的 Google News 連結比例（其餘為需轉址的新版不透明 id）
+DECODABLE_LINKS = 0.8
+
+# 非科技文章比例：綜合新聞 feed（每種語言的第一個）與科技主題 feed
+GENERAL_SHARE = (0.5, 0.1)
+
+# 網域排序檢查：entry.source 的網域、連結轉址後的主機（頁面皆為 404）與失敗次數
+FAILING_SOURCE = 'https://www.failing.example.com'
+REDIRECT_HOST = 'cdn.redirected.example.net'
+FAILURES = 5
+
+
+def _sentence(rng: random.Random, lang: str) -> str:
+    words = ZH_WORDS if lang == 'zh' else EN_WORDS
+    parts = [rng.choice(words) if rng.random() < 0.5 else rng.choice(FILLER[lang])
+             for _ in range(rng.randint(8, 16))]
+    return ''.join(parts) + '。' if lang == 'zh' else ' '.join(parts).capitalize() + '. '
+
+
+def _google_news_link(rng: random.Random, target: str, decodable: bool) -> str:
+    """Google News 文章連結：id 為 base64url 的 protobuf，舊版於欄位 4 直接帶有文章網址"""
+    value = target.encode('utf-8') if decodable else b'AU_yqL' + rng.randbytes(60).hex().encode('ascii')
+    payload = b'\x08\x13\x22' + bytes([len(value) & 0x7F | 0x80, len(value) >> 7]) + value + b'\xd2\x01\x00'
+    token = base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+    return f'https://news.google.com/rss/articles/{token}?oc=5'
+
+
+def _title(rng: random.Random, lang: str, tech: bool = True) -> str:
+    words = rng.sample(ZH_WORDS if lang == 'zh' else EN_WORDS, 5) if tech else rng.sample(GENERAL_WORDS[lang], 4)
+    return ''.join(words) if lang == 'zh' else ' '.join(words).title()
+
+
+def _page(rng: random.Random, lang: str, tech: bool) -> bytes:
+    if tech:
+        body = ''.join(f'<p>{"".join(_sentence(rng, lang) for _ in range(4))}</p>\n' for _ in range(12))
+    else:
+        body = ''.join(f'<p>{"".join(rng.choice(FILLER[lang]) for _ in range(200))}</p>\n' for _ in range(6))
+    scripts = ''.join(f'<script>var c{i}="{"x" * rng.randint(500, 4000)}";</script>' for i in range(rng.randint(5, 25)))
+    nav = '<nav>' + ''.join(f'<a href="/c/{i}">section {i}</a>' for i in range(60)) + '</nav>'
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8">{scripts}</head><body>{nav}'
+            f'<article>{body}</article><footer>{nav}</footer></body></html>').encode('utf-8')
+
+
+def synthetic_fixtures(path: str, entries_per_feed: int = 150, seed: int = 20260301) -> FixtureArchive:
+    """產生模擬 fixture：RSS_FEEDS 的每個 feed、Google News 轉址與文章頁面"""
+    rng = random.Random(seed)
+    archive = FixtureArchive(path)
+    serial = 0
+    for lang, urls in fetch_news.RSS_FEEDS.items():
+        for position, feed_url in enumerate(urls):
+            general_share = GENERAL_SHARE[min(position, len(GENERAL_SHARE) - 1)]
+            items = []
+            for _ in range(entries_per_feed):
+                serial += 1
+                target = f'https://{rng.choice(PUBLISHERS)}/{lang}/news/{serial}.html'
+                link = _google_news_link(rng, target, rng.random() < DECODABLE_LINKS)
+                archive.add(link, 302, {'Location': target})
+                roll = rng.random()
+                tech = rng.random() >= general_share
+                if roll < 0.03:
+                    archive.add(target, 200, {'Content-Type': 'application/pdf'}, b'%PDF-1.4' + b'0' * 20000)
+                elif roll < 0.06:
+                    archive.add(target, 404, {'Content-Type': 'text/html'}, b'not found')
+                else:
+                    archive.add(target, 200, {'Content-Type': 'text/html; charset=utf-8'},
+                                _page(rng, lang, tech))
+                items.append(f'<item><title>{_title(rng, lang, tech)} - 來源 {serial % 7}</title>'
+                             f'<link>{link}</link></item>')
+            rss = (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{lang}</title>'
+                   + ''.join(items) + '</channel></rss>')
+            archive.add(feed_url, 200, {'Content-Type': 'application/rss+xml; charset=utf-8'}, rss.encode('utf-8'))
+    archive.save(version=1, synthetic=True, seed=seed)
+    return archive
+
+
+def check_domain_recovery(tmp: str) -> list:
+    """
+    以 fetch_single_article 經轉址抓取 FAILURES 篇失敗的文章，確認結果記在排序所用的網域下、
+    該網域的文章隨即排到門檻以下，並在歷史衰減（3 個半衰期）後恢復抓取；回傳不符的說明
+    """
+    rng = random.Random(FAILURES)
+    path = os.path.join(tmp, 'recovery')
+    archive = FixtureArchive(path)
+    entries = []
+    for serial in range(FAILURES):
+        target = f'https://{REDIRECT_HOST}/story/{serial}.html'
+        link = _google_news_link(rng, target, decodable=False)
+        archive.add(link, 302, {'Location': target})
+        archive.add(target, 404, {'Content-Type': 'text/html'}, b'not found')
+        entries.append({'title': f"{_title(rng, 'en', tech=False)} - Failing", 'link': link,
+                        'source': {'href': FAILING_SOURCE}})
+    archive.save(version=1, synthetic=True)
+
+    history_file = os.path.join(tmp, 'domains.json')
+    history = DomainHistory(history_file)
+    domain = url_domain(FAILING_SOURCE)
+    problems = []
+    if fetch_news.rank_entries(entries, 'en', history)[1]:
+        problems.append(f"{domain} skipped before any fetch")
+
+    with ReplayServer(path) as server:
+        engine = ReplayEngine(archive, server.port, timeout=fetch_news.REQUEST_TIMEOUT)
+
+        async def fetch_all():
+            async with engine:
+                for entry in entries:
+                    await fetch_news.fetch_single_article(engine, entry, 'en', history=history)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(fetch_all())
+    history.save()
+
+    if REDIRECT_HOST in history.domains:
+        problems.append(f"outcomes recorded under the redirect target {REDIRECT_HOST}")
+    failed_rate = history.rate(domain)
+    if fetch_news.rank_entries(entries, 'en', history)[1] != len(entries):
+        problems.append(f"{domain} still fetched after {FAILURES} failures (rate {failed_rate:.2f})")
+
+    later = DomainHistory(history_file, now=history.now + 3 * DECAY_HALF_LIFE)
+    if fetch_news.rank_entries(entries, 'en', later)[1]:
+        problems.append(f"{domain} not fetched again after its history decayed (rate {later.rate(domain):.2f})")
+    print(f"Domain recovery: {domain} rate {failed_rate:.2f} after {FAILURES} failed redirects, "
+          f"{later.rate(domain):.2f} {3 * DECAY_HALF_LIFE / 86400:.0f} days later "
+          f"(threshold {fetch_news.PRIORITY_THRESHOLD} on priority = keywords + {DOMAIN_WEIGHT} x rate)")
+    return problems
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of fetch_daily_news")
+    parser.add_argument('--fixtures', metavar='DIR', help="recorded archive (default: synthetic)")
+    parser.add_argument('--entries', type=int, default=150, help="synthetic entries per feed")
+    parser.add_argument('--latency', type=float, default=50.0, help="mean injected latency per request (ms)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--seed', type=int, default=1, help="seed for latency and failure injection")
+    parser.add_argument('--report', metavar='FILE', help="also write the run report (JSON lines)")
+    parser.add_argument('--feed-order', action='store_true', help="fetch in feed order (no prioritization)")
+    parser.add_argument('--verbose', action='store_true', help="show fetch_news output")
+    args = parser.parse_args()
+    fetch_news.PRIORITIZE_FETCHES = not args.feed_order
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            archive = FixtureArchive(args.fixtures)
+            if not len(archive):
+                print(f"No fixtures in {args.fixtures} (record with: python3 fetch_replay.py record)")
+                sys.exit(1)
+            path = args.fixtures
+        else:
+            path = os.path.join(tmp, 'fixtures')
+            archive = synthetic_fixtures(path, args.entries)
+        print(f"Fixtures: {len(archive)} responses ({'recorded' if args.fixtures else 'synthetic'}), "
+              f"latency {args.latency:.0f} ms, failure rate {args.failure_rate:.0%}")
+
+        with ReplayServer(path, args.latency, args.failure_rate, args.seed) as server:
+            report = RunReport()
+            engine = ReplayEngine(archive, server.port, timeout=fetch_news.REQUEST_TIMEOUT, report=report)
+            output = io.StringIO()
+            start, cpu_start = time.perf_counter(), time.process_time()
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                news = fetch_news.fetch_daily_news(include_articles=True, engine=engine, use_cache=False)
+            wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+
+        problems = check_domain_recovery(tmp)
+
+    articles = len(news.get('articles_zh', [])) + len(news.get('articles_en', []))
+    latencies = [r['total_ms'] for r in report.articles if r.get('outcome') != 'cancelled']
+    accepted = [r['total_ms'] for r in report.articles if r.get('outcome') == 'accepted']
+    print(f"Wall {wall:.2f}s, CPU {cpu:.2f}s; {engine.requests} requests ({engine.requests / wall:.0f}/s), "
+          f"{engine.failures} failed")
+    print(f"Articles: {articles} collected ({articles / wall:.1f}/s), "
+          f"{len(news['zh'])} zh / {len(news['en'])} en titles")
+    counters = report.counters
+    print(f"Fetch order: {'feed' if args.feed_order else 'priority'}; "
+          f"{sum(counters.get(f'dispatched_{lang}', 0) for lang in ('zh', 'en'))} articles dispatched, "
+          f"{sum(counters.get(f'skipped_low_priority_{lang}', 0) for lang in ('zh', 'en'))} skipped before fetching")
+    print(f"Per-article latency: p50 {_percentile(latencies, 0.5):.0f} ms, p95 {_percentile(latencies, 0.95):.0f} ms "
+          f"(accepted: p50 {_percentile(accepted, 0.5):.0f} ms, p95 {_percentile(accepted, 0.95):.0f} ms)")
+    print("Stages:")
+    for name, stage in report.stages.items():
+        print(f"  {name:<14} wall {stage['seconds']:7.2f}s  cpu {stage['cpu_seconds']:7.2f}s  calls {stage['calls']}")
+    if args.report:
+        report.write(args.report)
+        print(f"Run report: {args.report}")
+
+    if problems:
+        print("\n[ERROR] Domain prioritization:")
+        for line in problems:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Keyword Classifier Benchmark
+比較逐一 `keyword in text` 掃描與 KeywordMatcher 兩種路徑（scan：逐字搜尋、automaton：Aho-Corasick）
+在關鍵字數增加時的耗時。KeywordMatcher 於 SCAN_THRESHOLD 個關鍵字以下自動採用 scan，
+因此少量關鍵字時不比原本慢，大量時維持線性；auto 欄標示實際採用的路徑。
+
+Usage:
+    python3 benchmarks/bench_keywords.py [--sizes 50,100,500,5000] [--repeat N]
+
+兩種路徑（含 word_boundaries=True）與原本做法的結果任一不符時以 exit code 1 結束。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_news import TECH_KEYWORDS_EN, TECH_KEYWORDS_ZH  # noqa: E402
+from keyword_match import SCAN_THRESHOLD, KeywordMatcher  # noqa: E402
+
+NEWS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'daily_news.json')
+
+
+def load_texts() -> list:
+    """取用 daily_news.json 的標題與文章作為測試資料"""
+    with open(NEWS_FILE, 'r', encoding='utf-8') as f:
+        news = json.load(f)
+    texts = list(news.get('zh', [])) + list(news.get('en', []))
+    for key in ('articles_zh', 'articles_en'):
+        texts.extend(a['title'] + ' ' + a['content'] for a in news.get(key, []))
+    return texts
+
+
+def grow_keywords(size: int) -> list:
+    """以原始關鍵字加上隨機詞彙擴充到 size 個"""
+    rng = random.Random(size)
+    keywords = list(dict.fromkeys(TECH_KEYWORDS_ZH + TECH_KEYWORDS_EN))
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    while len(keywords) < size:
+        keywords.append(''.join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return keywords[:size]
+
+
+def naive_count(keywords: list, text: str) -> int:
+    """原本的做法：每次呼叫都重新 lower 每個關鍵字並逐一搜尋"""
+    text = text.lower()
+    return sum(1 for keyword in keywords if keyword.lower() in text)
+
+
+def best_of(repeat: int, func) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the keyword classifier")
+    parser.add_argument('--sizes', default='50,100,500,5000', help="keyword list sizes")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    texts = load_texts()
+    print(f"Texts: {len(texts)} ({sum(map(len, texts)):,} characters)")
+
+    print(f"SCAN_THRESHOLD: {SCAN_THRESHOLD}")
+
+    failed = False
+    for size in (int(s) for s in args.sizes.split(',')):
+        keywords = grow_keywords(size)
+        scan = KeywordMatcher(keywords, scan=True)
+        automaton = KeywordMatcher(keywords, scan=False)
+        naive = best_of(args.repeat, lambda: [naive_count(keywords, t) for t in texts])
+        scan_time = best_of(args.repeat, lambda: [scan.count(t) for t in texts])
+        automaton_time = best_of(args.repeat, lambda: [automaton.count(t) for t in texts])
+        mismatches = sum(1 for t in texts
+                         if not naive_count(keywords, t) == scan.count(t) == automaton.count(t))
+        # 兩種路徑在整字比對時也須一致
+        bounded = [KeywordMatcher(keywords, word_boundaries=True, scan=s) for s in (True, False)]
+        mismatches += sum(1 for t in texts if bounded[0].matched(t) != bounded[1].matched(t))
+        auto = 'scan' if KeywordMatcher(keywords).scan else 'automaton'
+        print(f"  {size:>6} keywords: naive {naive * 1000:8.1f} ms, scan {scan_time * 1000:8.1f} ms, "
+              f"automaton {automaton_time * 1000:8.1f} ms, auto: {auto:<9} mismatches: {mismatches}")
+        failed = failed or bool(mismatches)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Text Normalization Benchmark
+以 golden 語料驗證 text_normalize.normalize_text 的輸出，並比較舊版多段處理
+（BeautifulSoup 去標籤 + re.sub 空白 + 8 次 str.replace）與單次處理的 CPU 時間
+
+Usage:
+    python3 benchmarks/bench_normalize.py [--golden FILE] [--titles N] [--repeat N]
+
+任一 golden 案例不符時以 exit code 1 結束。
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_normalize import normalize_text  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_GOLDEN = os.path.join(BENCH_DIR, 'golden', 'normalize.json')
+
+TITLES = [
+    '<b>輝達</b>發表新一代AI晶片,效能提升3.5倍!',
+    '台積電(TSMC)公布財報:營收創新高 &amp; 毛利率上升',
+    '蘋果WWDC登場...iOS新功能一次看',
+    'OpenAI執行長:"生成式AI"將改變產業',
+    'Microsoft unveils new Azure AI tools &ndash; developers react',
+    'Google&#39;s quantum chip hits milestone',
+]
+
+
+def legacy_normalize(text: str, lang: str, html: bool = False) -> str:
+    """舊版 fetch_news 的處理流程（僅供計時比較）"""
+    if html:
+        from bs4 import BeautifulSoup
+        text = BeautifulSoup(text, 'html.parser').get_text()
+    if lang == 'zh':
+        for half, full in ((',', '，'), ('.', '。'), ('?', '？'), ('!', '！'),
+                           (':', '：'), (';', '；'), ('(', '（'), (')', '）')):
+            text = text.replace(half, full)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def check_golden(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    failures = 0
+    for case in cases:
+        actual = normalize_text(case['input'], case['lang'], case['html'])
+        if actual != case['expected']:
+            failures += 1
+            print(f"  FAIL {case['note']}: expected {case['expected']!r}, got {actual!r}")
+    print(f"Golden cases: {len(cases) - failures}/{len(cases)} passed")
+    return failures
+
+
+def time_best(func, items, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        for text, lang, html in items:
+            func(text, lang, html)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify and benchmark text normalization")
+    parser.add_argument('--golden', default=DEFAULT_GOLDEN, help="golden corpus (JSON)")
+    parser.add_argument('--titles', type=int, default=2000, help="titles per run (default: 2000)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    failures = check_golden(args.golden)
+
+    rng = random.Random(20260215)
+    titles = [(rng.choice(TITLES), 'zh', True) for _ in range(args.titles)]
+    body = ''.join(rng.choice(TITLES) for _ in range(40))
+    articles = [(re.sub(r'<[^>]+>', '', body), 'zh', False)] * max(1, args.titles // 20)
+
+    for label, items in (('titles (html)', titles), ('article text', articles)):
+        legacy = time_best(legacy_normalize, items, args.repeat)
+        single = time_best(normalize_text, items, args.repeat)
+        print(f"  {label:<14} legacy {legacy * 1e6 / len(items):8.1f} us/item  "
+              f"single-pass {single * 1e6 / len(items):8.1f} us/item  {legacy / single:5.1f}x")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Pinyin Stage Benchmark
+比較逐字呼叫 get_pinyin_with_tone 與批次 resolve_pinyin_bulk 的耗時，並確認輸出一致
+
+Usage:
+    python3 benchmarks/bench_pinyin.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_dict import OUTPUT_FILE, get_pinyin_with_tone, resolve_pinyin_bulk  # noqa: E402
+
+
+def load_chars() -> list:
+    """取用 dictionary.json 中的字元作為測試資料"""
+    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+        return [entry[0] for entry in json.load(f)]
+
+
+def best_of(repeat: int, func):
+    """執行 repeat 次，回傳 (最短耗時, 最後一次結果)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pinyin stage of build_dict.py")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    chars = load_chars()
+
+    # 先各執行一次，排除 pypinyin 首次載入的時間
+    get_pinyin_with_tone(chars[0])
+    resolve_pinyin_bulk(chars[:1])
+
+    per_char_time, per_char = best_of(
+        args.repeat, lambda: {c: get_pinyin_with_tone(c) for c in chars})
+    bulk_time, bulk = best_of(args.repeat, lambda: resolve_pinyin_bulk(chars))
+    heteronym_time, _ = best_of(args.repeat, lambda: resolve_pinyin_bulk(chars, heteronym=True))
+
+    mismatches = [c for c in chars if per_char[c] != bulk[c]]
+
+    print(f"Characters: {len(chars):,}")
+    print(f"  Per-character get_pinyin_with_tone: {per_char_time * 1000:8.1f} ms")
+    print(f"  Bulk resolve_pinyin_bulk:           {bulk_time * 1000:8.1f} ms "
+          f"({per_char_time / bulk_time:.1f}x)")
+    print(f"  Bulk (heteronym):                   {heteronym_time * 1000:8.1f} ms")
+    print(f"  Mismatches: {len(mismatches)}")
+
+    if mismatches:
+        for c in mismatches[:10]:
+            print(f"    {c}: {per_char[c]!r} != {bulk[c]!r}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Build Cache for Dictionary Generator
+字典生成的建置快取
+
+每個快取項目存成一個檔案，依序寫入兩個 pickle：key 與 payload
+- key: 內容雜湊（來源碼表、解析器程式、pypinyin 版本等）
+- payload: 解析結果（如 {char: [code, ...]}、{char: pinyin}）
+
+key 不符時視為失效，但舊的 payload 仍可取回，用於比對哪些字元受影響。
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIR, ".build_cache")
+
+# 快取格式版本，變更 payload 結構時遞增
+CACHE_FORMAT_VERSION = 1
+
+_digest_memo = {}
+
+
+def file_digest(filepath: str) -> str:
+    """計算檔案內容的 SHA-256（同一次建置中只計算一次）"""
+    stat = os.stat(filepath)
+    memo_key = (filepath, stat.st_size, stat.st_mtime_ns)
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def make_key(*parts) -> str:
+    """將多個部分組合成單一快取 key"""
+    h = hashlib.sha256(repr((CACHE_FORMAT_VERSION,) + parts).encode('utf-8'))
+    return h.hexdigest()
+
+
+class BuildCache:
+    """
+    以目錄為單位的建置快取
+
+    enabled=False 時所有讀取皆為 miss、寫入皆忽略，方便以 --no-cache 強制完整重建。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.pickle")
+
+    def load_key(self, name: str) -> Optional[str]:
+        """只讀取快取項目的 key，不載入 payload"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(name), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+
+    def load_entry(self, name: str) -> Tuple[Optional[str], Any]:
+        """讀取快取項目，回傳 (key, payload)；不存在或損毀時回傳 (None, None)"""
+        if not self.enabled:
+            return None, None
+        try:
+            with open(self._path(name), 'rb') as f:
+                key = pickle.load(f)
+                payload = pickle.load(f)
+            return key, payload
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None, None
+
+    def load(self, name: str, key: str) -> Any:
+        """讀取快取項目，key 不符時回傳 None"""
+        stored_key, payload = self.load_entry(name)
+        if stored_key == key:
+            self.hits += 1
+            return payload
+        self.misses += 1
+        return None
+
+    def store(self, name: str, key: str, payload: Any):
+        """寫入快取項目（先寫暫存檔再替換，避免中斷時留下損毀檔案）"""
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
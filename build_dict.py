@@ -13,9 +13,22 @@ Output Format: Array of Arrays (minified JSON)
 [char, zhuyin, cangjie, boshiamy, pinyin]
 """
 
+import argparse
+import gzip
 import json
 import os
-from pypinyin import pinyin, Style
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from importlib import metadata
+
+import table_reader
+from build_cache import DEFAULT_CACHE_DIR, BuildCache, file_digest, make_key
+from code_index import build_code_index, encode_code_index
+from charset_bitmap import CHARSETS, DEFAULT_CHARSET, CharsetBitmap, load_charset
+from packed_dict import FIELDS, PINYIN_HETERONYM_SEP, build_pool, pack_dictionary
+from table_reader import collect_char_codes, iter_records
 
 # ========================================
 # 檔案路徑設定
@@ -32,6 +45,58 @@ BOPOMOFO_FILE = os.path.join(CIN_DIR, "bopomofo.cin")
 BOSHIAMY_FILE = os.path.join(CIN_DIR, "boshiamy.txt")  # Fcitx5 格式
 
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "dictionary.json")
+PACKED_OUTPUT_FILE = os.path.join(SCRIPT_DIR, "dictionary.bin")  # 前端用二進位格式
+JS_OUTPUT_FILE = os.path.join(SCRIPT_DIR, "dictionary-data.js")  # 前端預載入用
+CODE_INDEX_FILE = os.path.join(SCRIPT_DIR, "code-index.json")  # 字碼 → 字反向索引
+
+# 分層字典：常用字 (hot) 先載入，其餘依字碼點範圍切成冷門分片按需載入
+SHARD_DIR = os.path.join(SCRIPT_DIR, "dict-shards")
+SHARD_MANIFEST = "manifest.json"
+HOT_SHARD_FILE = "hot.json"
+HOT_SHARD_SIZE = 3000
+COLD_SHARD_COUNT = 4
+
+# 計算字頻的語料（預設為每日新聞）
+DEFAULT_CORPUS_FILES = [os.path.join(SCRIPT_DIR, "daily_news.json")]
+
+# daily_news.json 中屬於新聞文字的欄位（encodings 等輸入法編碼表不是語料）
+NEWS_TEXT_KEYS = ('zh', 'en')
+NEWS_ARTICLE_PREFIX = 'articles_'
+NEWS_ARTICLE_FIELDS = ('title', 'content')
+
+# Big5 常用字區 (A440–C67E)，語料未出現的字以此為次要排序
+BIG5_COMMON_RANGE = (0xA440, 0xC67E)
+
+# 各產出檔 gzip 後的大小上限 (bytes)，可用 --budget NAME=BYTES 覆寫
+SIZE_BUDGETS = {
+    "dictionary.json": 200 * 1024,
+    "dictionary.bin": 180 * 1024,
+    "dictionary-data.js": 160 * 1024,
+    "code-index.json": 224 * 1024,
+    "hot.json": 64 * 1024,
+}
+
+# --pinyin-heteronyms 時拼音欄位多出其他讀音，含拼音的產出檔改用以下上限（約多 10%）
+HETERONYM_SIZE_BUDGETS = {
+    "dictionary.json": 224 * 1024,
+    "dictionary.bin": 224 * 1024,
+    "dictionary-data.js": 192 * 1024,
+}
+
+
+def size_budgets(heteronym: bool = False, overrides=()) -> dict:
+    """各產出檔的 gzip 大小上限：預設值、多音字模式的上限，再套用 --budget 覆寫"""
+    budgets = dict(SIZE_BUDGETS)
+    if heteronym:
+        budgets.update(HETERONYM_SIZE_BUDGETS)
+    budgets.update(overrides)
+    return budgets
+
+# pypinyin 版本（拼音快取的 key）
+try:
+    PYPINYIN_VERSION = metadata.version('pypinyin')
+except metadata.PackageNotFoundError:
+    PYPINYIN_VERSION = 'unknown'
 
 # ========================================
 # 鍵盤碼到注音符號對照表
@@ -88,6 +153,7 @@ def is_big5_compatible(char: str) -> bool:
     """
     Rule A: Big5 Filtering
     檢查字元是否存在於 Big5 編碼標準中。
+    （建置流程改用 charset_bitmap 預先計算的點陣圖，結果相同）
     """
     try:
         char.encode('big5')
@@ -119,42 +185,7 @@ def parse_cin_file(filepath: str) -> dict:
     - %chardef begin ... %chardef end 之間為字碼定義
     - 每行格式: code char
     """
-    char_codes = {}
-    in_chardef = False
-    
-    if not os.path.exists(filepath):
-        print(f"    [Warning] File not found: {os.path.basename(filepath)}")
-        return char_codes
-    
-    print(f"  Parsing: {os.path.basename(filepath)}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            
-            if line == '%chardef begin':
-                in_chardef = True
-                continue
-            if line == '%chardef end':
-                in_chardef = False
-                continue
-            
-            if not in_chardef:
-                continue
-            if not line or line.startswith('#'):
-                continue
-            
-            parts = line.split(maxsplit=1)
-            if len(parts) >= 2:
-                code = parts[0]
-                char = parts[1]
-                if len(char) == 1:
-                    if char not in char_codes:
-                        char_codes[char] = []
-                    char_codes[char].append(code)
-    
-    print(f"    Found {len(char_codes)} unique characters")
-    return char_codes
+    return parse_table(filepath, 'cin')
 
 
 def parse_fcitx_table(filepath: str) -> dict:
@@ -165,43 +196,21 @@ def parse_fcitx_table(filepath: str) -> dict:
     - [数据] 或 [資料] 之後為字碼定義
     - 每行格式: code char (code 在前，char 在後)
     """
-    char_codes = {}
-    in_data = False
-    
+    return parse_table(filepath, 'fcitx')
+
+
+def parse_table(filepath: str, fmt: str = None) -> dict:
+    """
+    使用 table_reader 解析輸入法碼表，回傳 {char: [code, ...]}
+    fmt 為 'cin' 或 'fcitx'；未指定時自動判斷。
+    """
     if not os.path.exists(filepath):
         print(f"    [Warning] File not found: {os.path.basename(filepath)}")
-        return char_codes
+        return {}
     
     print(f"  Parsing: {os.path.basename(filepath)}")
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            
-            # 進入資料區塊
-            if line in ['[数据]', '[資料]', '[Data]']:
-                in_data = True
-                continue
-            
-            # 離開資料區塊（遇到其他區塊標記）
-            if line.startswith('[') and line.endswith(']'):
-                in_data = False
-                continue
-            
-            if not in_data:
-                continue
-            if not line or line.startswith('#'):
-                continue
-            
-            parts = line.split(maxsplit=1)
-            if len(parts) >= 2:
-                code = parts[0]
-                char = parts[1]
-                # 只取單一字元
-                if len(char) == 1:
-                    if char not in char_codes:
-                        char_codes[char] = []
-                    char_codes[char].append(code)
+    char_codes = collect_char_codes(iter_records(filepath, fmt))
     
     print(f"    Found {len(char_codes)} unique characters")
     return char_codes
@@ -220,7 +229,9 @@ def get_shortest_code(codes: list) -> str:
 def get_pinyin_with_tone(char: str) -> str:
     """
     使用 pypinyin 取得拼音（Style.TONE3 = 數字聲調，如 guang3）
+    pypinyin 載入字典資料較慢，延遲到第一次查詢時才 import。
     """
+    from pypinyin import pinyin, Style
     try:
         result = pinyin(char, style=Style.TONE3)
         if result and result[0]:
@@ -230,6 +241,45 @@ def get_pinyin_with_tone(char: str) -> str:
     return ""
 
 
+def resolve_pinyin_bulk(chars, heteronym: bool = False) -> dict:
+    """
+    批次取得拼音：直接查 pypinyin 的單字拼音表 (pinyin_dict)，整批只載入一次
+    
+    預設只取第一個讀音，結果與逐字呼叫 get_pinyin_with_tone 相同；
+    heteronym=True 時輸出所有讀音，以 PINYIN_HETERONYM_SEP 分隔（如 xing2/hang2）。
+    查無拼音的字元沿用 pypinyin 的預設行為，回傳字元本身。
+    """
+    from pypinyin import Style
+    from pypinyin.pinyin_dict import pinyin_dict
+    from pypinyin.style import convert
+    
+    # 同一個帶調拼音只轉換一次 (約 1,500 種)
+    tone3 = {}
+    
+    def to_tone3(syllable: str) -> str:
+        value = tone3.get(syllable)
+        if value is None:
+            value = convert(syllable, Style.TONE3, strict=True)
+            tone3[syllable] = value
+        return value
+    
+    result = {}
+    for char in chars:
+        readings = pinyin_dict.get(ord(char))
+        if readings is None:
+            result[char] = char
+        elif heteronym:
+            converted = []
+            for syllable in readings.split(','):
+                value = to_tone3(syllable)
+                if value not in converted:
+                    converted.append(value)
+            result[char] = PINYIN_HETERONYM_SEP.join(converted)
+        else:
+            result[char] = to_tone3(readings.split(',', 1)[0])
+    return result
+
+
 def find_first_existing_file(file_list: list) -> str:
     """從檔案列表中找到第一個存在的檔案"""
     for f in file_list:
@@ -238,73 +288,165 @@ def find_first_existing_file(file_list: list) -> str:
     return None
 
 
-def build_dictionary() -> list:
+def source_key(filepath: str, fmt: str) -> str:
+    """碼表的快取 key：碼表內容與解析器程式的雜湊"""
+    if not filepath or not os.path.exists(filepath):
+        return make_key('source', fmt, None)
+    return make_key('source', fmt, file_digest(filepath), file_digest(table_reader.__file__))
+
+
+def table_sources(cangjie_file: str) -> list:
+    """字典使用的碼表：倉頡、注音、無蝦米 (Fcitx5 格式)，格式同 load_sources 的 sources"""
+    return [
+        ('cangjie', cangjie_file, 'cin'),
+        ('bopomofo', BOPOMOFO_FILE, 'cin'),
+        ('boshiamy', BOSHIAMY_FILE, 'fcitx'),
+    ]
+
+
+def _parse_source(filepath: str, fmt: str) -> dict:
+    """解析單一碼表（可於子行程中執行，不輸出訊息）"""
+    return collect_char_codes(iter_records(filepath, fmt))
+
+
+def load_sources(sources: list, cache: BuildCache = None, executor=None) -> list:
     """
-    主要 ETL 流程：建構字典
+    載入多個碼表 [(name, filepath, fmt), ...]，命中快取時略過解析
+    回傳 [(char_codes, changed_chars), ...]；changed_chars 為 None 表示無法比對（需全部重建）
+    提供 executor 時，未命中快取的碼表同時在多個行程中解析。
     """
-    print("\n[Step 1] Parsing input method tables")
+    results = [None] * len(sources)
+    to_parse = []
     
-    # 找到倉頡碼表（優先使用 OpenVanilla）
-    cangjie_file = find_first_existing_file(CANGJIE_FILES)
-    if cangjie_file:
-        cj_data = parse_cin_file(cangjie_file)
-    else:
-        print("  [ERROR] No Cangjie table found!")
-        cj_data = {}
+    for i, (name, filepath, fmt) in enumerate(sources):
+        if not filepath:
+            results[i] = ({}, None)
+            continue
+        if not os.path.exists(filepath):
+            print(f"    [Warning] File not found: {os.path.basename(filepath)}")
+            results[i] = ({}, None)
+            continue
+        
+        key = old_codes = None
+        if cache is not None:
+            key = source_key(filepath, fmt)
+            old_key, old_codes = cache.load_entry(f"source-{name}")
+            if old_key == key:
+                cache.hits += 1
+                print(f"  Cached:  {os.path.basename(filepath)} ({len(old_codes)} unique characters)")
+                results[i] = (old_codes, set())
+                continue
+            cache.misses += 1
+        to_parse.append((i, name, filepath, fmt, key, old_codes))
     
-    # 注音碼表
-    zhuyin_data = parse_cin_file(BOPOMOFO_FILE)
+    paths = [item[2] for item in to_parse]
+    fmts = [item[3] for item in to_parse]
+    parsed = executor.map(_parse_source, paths, fmts) if executor else map(_parse_source, paths, fmts)
     
-    # 無蝦米碼表 (Fcitx5 格式)
-    boshiamy_data = parse_fcitx_table(BOSHIAMY_FILE)
+    # 依原本順序輸出訊息與寫入快取，與單行程結果一致
+    for (i, name, filepath, fmt, key, old_codes), char_codes in zip(to_parse, parsed):
+        print(f"  Parsing: {os.path.basename(filepath)}")
+        print(f"    Found {len(char_codes)} unique characters")
+        
+        changed = None
+        if cache is not None:
+            cache.store(f"source-{name}", key, char_codes)
+            if old_codes is not None:
+                changed = {c for c in old_codes.keys() | char_codes.keys()
+                           if old_codes.get(c) != char_codes.get(c)}
+                print(f"    Changed characters since last build: {len(changed)}")
+        results[i] = (char_codes, changed)
     
-    # 收集所有字元
-    all_chars = set(cj_data.keys()) | set(zhuyin_data.keys()) | set(boshiamy_data.keys())
+    return results
+
+
+def split_shards(items: list, count: int) -> list:
+    """將已排序的列表切成 count 段連續區間，合併時只需依序串接"""
+    count = max(1, min(count, len(items)))
+    size, extra = divmod(len(items), count)
+    shards = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(items[start:end])
+        start = end
+    return shards
+
+
+def filter_reason(char: str, charset: CharsetBitmap = None) -> str:
+    """
+    回傳字元被過濾的原因 ('non_cjk' / 'outside_charset')，通過過濾時回傳 None
+    charset 未指定時使用 Big5（Rule A）。
+    """
+    # 檢查是否為 CJK 漢字
+    if not is_cjk_character(char):
+        return 'non_cjk'
     
-    print(f"\n[Step 2] Building dictionary")
-    print(f"  Total unique characters: {len(all_chars)}")
+    # Rule A: 字元集過濾（預設 Big5）
+    if charset is None:
+        return None if is_big5_compatible(char) else 'outside_charset'
+    return None if char in charset else 'outside_charset'
+
+
+def build_entry(char: str, cj_data: dict, zhuyin_data: dict, boshiamy_data: dict,
+                pinyin_str: str) -> list:
+    """建構單一字元的字典列"""
+    # Rule B: 取最短碼
+    # 倉頡
+    cj_codes = cj_data.get(char, [])
+    cangjie_raw = get_shortest_code(cj_codes)
+    cangjie = cangjie_to_display(cangjie_raw)
     
-    # 建構字典
-    dictionary = []
-    non_cjk_count = 0
-    non_big5_count = 0
-    
-    for char in sorted(all_chars):
-        # 檢查是否為 CJK 漢字
-        if not is_cjk_character(char):
-            non_cjk_count += 1
-            continue
-        
-        # Rule A: Big5 過濾
-        if not is_big5_compatible(char):
-            non_big5_count += 1
-            continue
-        
-        # Rule B: 取最短碼
-        # 倉頡
-        cj_codes = cj_data.get(char, [])
-        cangjie_raw = get_shortest_code(cj_codes)
-        cangjie = cangjie_to_display(cangjie_raw)
-        
-        # 注音
-        zy_codes = zhuyin_data.get(char, [])
-        zhuyin_raw = get_shortest_code(zy_codes)
-        zhuyin = keyboard_to_zhuyin(zhuyin_raw)
-        
-        # 無蝦米
-        bs_codes = boshiamy_data.get(char, [])
-        boshiamy = get_shortest_code(bs_codes).upper()  # 無蝦米通常大寫顯示
-        
-        # 拼音 (TONE3 格式)
-        pinyin_str = get_pinyin_with_tone(char)
-        
-        # Rule C: 組合各欄位
-        entry = [char, zhuyin, cangjie, boshiamy, pinyin_str]
-        dictionary.append(entry)
+    # 注音
+    zy_codes = zhuyin_data.get(char, [])
+    zhuyin_raw = get_shortest_code(zy_codes)
+    zhuyin = keyboard_to_zhuyin(zhuyin_raw)
     
+    # 無蝦米
+    bs_codes = boshiamy_data.get(char, [])
+    boshiamy = get_shortest_code(bs_codes).upper()  # 無蝦米通常大寫顯示
+    
+    # Rule C: 組合各欄位 (拼音為 TONE3 格式)
+    return [char, zhuyin, cangjie, boshiamy, pinyin_str]
+
+
+def _filter_shard(chars: list, charset: CharsetBitmap) -> tuple:
+    """過濾一段字元，回傳 (通過的字元, non_cjk 數, 不在字元集內的數)"""
+    return charset.split(chars)
+
+
+def _build_shard(chars: list, cj_data: dict, zhuyin_data: dict, boshiamy_data: dict,
+                 pinyin_map: dict) -> list:
+    """建構一段字元的字典列"""
+    return [build_entry(char, cj_data, zhuyin_data, boshiamy_data, pinyin_map[char])
+            for char in chars]
+
+
+def resolve_pinyin(chars: list, cache: BuildCache = None, heteronym: bool = False) -> dict:
+    """
+    取得整批字元的拼音，優先查快取，其餘以 resolve_pinyin_bulk 一次解析
+    快取 key 為 pypinyin 版本與讀音模式，升級 pypinyin 時自動失效。
+    """
+    if cache is None:
+        return resolve_pinyin_bulk(chars, heteronym)
+    
+    name = 'pinyin-heteronym' if heteronym else 'pinyin'
+    key = make_key('pinyin', PYPINYIN_VERSION, heteronym, PINYIN_HETERONYM_SEP)
+    known = cache.load(name, key) or {}
+    missing = [char for char in chars if char not in known]
+    if missing:
+        known.update(resolve_pinyin_bulk(missing, heteronym))
+        cache.store(name, key, known)
+        print(f"  Pinyin cache: {len(missing)} characters resolved, "
+              f"{len(chars) - len(missing)} reused")
+    return known
+
+
+def print_statistics(dictionary: list, non_cjk_count: int, outside_count: int, charset_name: str):
+    """顯示過濾結果與覆蓋率"""
     print(f"\n[Step 3] Filtering results")
     print(f"  Non-CJK characters filtered: {non_cjk_count}")
-    print(f"  Non-Big5 characters filtered: {non_big5_count}")
+    print(f"  Characters outside {charset_name} filtered: {outside_count}")
     print(f"  Characters in final dictionary: {len(dictionary)}")
     
     # 統計覆蓋率
@@ -318,33 +460,457 @@ def build_dictionary() -> list:
     print(f"  With Cangjie:  {chars_with_cangjie:,} ({chars_with_cangjie*100/len(dictionary):.1f}%)")
     print(f"  With Boshiamy: {chars_with_boshiamy:,} ({chars_with_boshiamy*100/len(dictionary):.1f}%)")
     print(f"  With Pinyin:   {chars_with_pinyin:,} ({chars_with_pinyin*100/len(dictionary):.1f}%)")
+
+
+def build_dictionary(cache: BuildCache = None, heteronym: bool = False, jobs: int = 1,
+                     charset: CharsetBitmap = None, tables: dict = None) -> list:
+    """
+    主要 ETL 流程：建構字典
+    提供 cache 時，只重新解析內容有變動的碼表，並只重建受影響的字元列；
+    所有輸入皆未變動時直接取用上次的結果。
+    heteronym=True 時拼音欄位輸出所有讀音。
+    jobs > 1 時以多個行程平行解析碼表，並將逐字處理切成連續區段分給各行程；
+    各區段依序合併，輸出與單行程完全相同。
+    charset 為過濾用的字元集點陣圖，未指定時使用 Big5。
+    提供 tables（dict）時填入本次載入的碼表 {'cangjie': ..., 'zhuyin': ..., 'boshiamy': ...}，
+    供 save_code_index 使用，不必再次解析。
+    """
+    if charset is None:
+        charset = load_charset(DEFAULT_CHARSET, cache)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return _build_dictionary(cache, heteronym, jobs, charset, executor, tables)
+    return _build_dictionary(cache, heteronym, 1, charset, None, tables)
+
+
+def _build_dictionary(cache: BuildCache, heteronym: bool, jobs: int, charset: CharsetBitmap,
+                      executor, tables: dict = None) -> list:
+    """build_dictionary 的實作；executor 為 None 時於目前行程內執行"""
+    print("\n[Step 1] Parsing input method tables")
+    
+    # 找到倉頡碼表（優先使用 OpenVanilla）
+    cangjie_file = find_first_existing_file(CANGJIE_FILES)
+    
+    # 程式本身、pypinyin 版本或字元集變動時，上次的字元列全部失效
+    code_key = None
+    rows_key = None
+    if cache is not None:
+        code_key = make_key('code', file_digest(__file__), PYPINYIN_VERSION, heteronym, charset.digest())
+        rows_key = make_key('rows', code_key,
+                            source_key(cangjie_file, 'cin'),
+                            source_key(BOPOMOFO_FILE, 'cin'),
+                            source_key(BOSHIAMY_FILE, 'fcitx'))
+        if cache.load_key('rows') == rows_key:
+            _, cached = cache.load_entry('rows')
+            cache.hits += 1
+            print("  All tables unchanged, reusing previous build")
+            if tables is not None:
+                # 碼表未變動，解析結果都在快取中
+                (cj_data, _), (zhuyin_data, _), (boshiamy_data, _) = load_sources(
+                    table_sources(cangjie_file), cache)
+                tables.update(cangjie=cj_data, zhuyin=zhuyin_data, boshiamy=boshiamy_data)
+            print_statistics(cached['dictionary'], cached['non_cjk'], cached['outside_charset'], charset.name)
+            return cached['dictionary']
+    
+    if not cangjie_file:
+        print("  [ERROR] No Cangjie table found!")
+    
+    (cj_data, cj_changed), (zhuyin_data, zy_changed), (boshiamy_data, bs_changed) = load_sources(
+        table_sources(cangjie_file), cache, executor)
+    if tables is not None:
+        tables.update(cangjie=cj_data, zhuyin=zhuyin_data, boshiamy=boshiamy_data)
+    
+    # 收集所有字元
+    all_chars = set(cj_data.keys()) | set(zhuyin_data.keys()) | set(boshiamy_data.keys())
+    
+    print(f"\n[Step 2] Building dictionary")
+    print(f"  Total unique characters: {len(all_chars)}")
+    
+    # 上次建置的字元列，移除碼表有變動的字元
+    rows = {}
+    if cache is not None and None not in (cj_changed, zy_changed, bs_changed):
+        _, previous = cache.load_entry('rows')
+        if previous and previous.get('code_key') == code_key:
+            rows = {entry[0]: entry for entry in previous['dictionary']}
+            for char in cj_changed | zy_changed | bs_changed:
+                rows.pop(char, None)
+            print(f"  Reusing {len(rows)} rows from cache")
+    
+    # 建構字典：先過濾，再一次解析所有需要重建的字元拼音
+    candidates = [char for char in sorted(all_chars) if char not in rows]
+    shards = split_shards(candidates, jobs)
+    
+    if executor:
+        filtered = list(executor.map(_filter_shard, shards, [charset] * len(shards)))
+    else:
+        filtered = [_filter_shard(shard, charset) for shard in shards]
+    pending_shards = [passed for passed, _, _ in filtered]
+    pending = [char for shard in pending_shards for char in shard]
+    non_cjk_count = sum(count for _, count, _ in filtered)
+    outside_count = sum(count for _, _, count in filtered)
+    
+    pinyin_map = resolve_pinyin(pending, cache, heteronym)
+    
+    if executor:
+        # 每個區段只傳送該段字元的資料，減少行程間的序列化成本
+        def subset(data, chars):
+            return {char: data[char] for char in chars if char in data}
+        
+        built = executor.map(_build_shard, pending_shards,
+                             [subset(cj_data, shard) for shard in pending_shards],
+                             [subset(zhuyin_data, shard) for shard in pending_shards],
+                             [subset(boshiamy_data, shard) for shard in pending_shards],
+                             [subset(pinyin_map, shard) for shard in pending_shards])
+    else:
+        built = [_build_shard(shard, cj_data, zhuyin_data, boshiamy_data, pinyin_map)
+                 for shard in pending_shards]
+    for entries in built:
+        for entry in entries:
+            rows[entry[0]] = entry
+    
+    dictionary = [rows[char] for char in sorted(rows)]
+    
+    if cache is not None:
+        cache.store('rows', rows_key, {
+            'code_key': code_key,
+            'dictionary': dictionary,
+            'non_cjk': non_cjk_count,
+            'outside_charset': outside_count,
+        })
+        print(f"  Rows rebuilt: {len(pending)}")
+    
+    print_statistics(dictionary, non_cjk_count, outside_count, charset.name)
     
     return dictionary
 
 
+def write_if_changed(filepath: str, data: bytes) -> bool:
+    """內容與現有檔案不同時才寫入，回傳是否有寫入"""
+    if os.path.exists(filepath) and os.path.getsize(filepath) == len(data):
+        with open(filepath, 'rb') as f:
+            if f.read() == data:
+                return False
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    return True
+
+
 def save_dictionary(dictionary: list, filepath: str):
-    """將字典儲存為 Minified JSON"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(dictionary, f, ensure_ascii=False, separators=(',', ':'))
+    """將字典儲存為 Minified JSON（內容未變動時不重寫檔案）"""
+    data = json.dumps(dictionary, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
     
-    size = os.path.getsize(filepath)
     print(f"\n[Output]")
-    print(f"  Saved to: {filepath}")
+    if write_if_changed(filepath, data):
+        print(f"  Saved to: {filepath}")
+    else:
+        print(f"  Up to date: {filepath}")
+    
+    size = len(data)
     print(f"  File size: {size:,} bytes ({size/1024:.1f} KB)")
 
 
-def main():
+# dictionary-data.js 欄位字串的分隔符號
+JS_FIELD_SEP = '|'
+
+# dictionary-data.js 載入時還原為 { char: { zhuyin, cangjie, boshiamy, pinyin } }
+JS_DECODER = """var dictionaryData = (function (chars, fields) {
+    var names = %s;
+    var columns = names.map(function (name) {
+        var field = fields[name];
+        var pool = field.pool.split(%s);
+        return field.refs ? field.refs.map(function (i) { return pool[i]; }) : pool;
+    });
+    var data = {};
+    Array.from(chars).forEach(function (char, i) {
+        var entry = {};
+        names.forEach(function (name, f) { entry[name] = columns[f][i]; });
+        data[char] = entry;
+    });
+    return data;
+})(%s, %s);
+"""
+
+
+def encode_dictionary_js(dictionary: list) -> bytes:
+    """
+    產生 dictionary-data.js（欄位式編碼）
+    
+    - 所有字元串成一個字串
+    - 重複度高的欄位 (注音、拼音) 每個不同的值只存一次，以索引參照
+    - 幾乎不重複的欄位 (倉頡、無蝦米) 直接依序串接
+    """
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    
+    fields = {}
+    for field_index, name in enumerate(FIELDS):
+        values = [entry[field_index + 1] for entry in dictionary]
+        if any(JS_FIELD_SEP in value for value in values):
+            raise ValueError(f"{name} values must not contain {JS_FIELD_SEP!r}")
+        pool, refs = build_pool(values)
+        if len(pool) * 2 <= len(values):
+            fields[name] = {'pool': JS_FIELD_SEP.join(pool), 'refs': refs}
+        else:
+            fields[name] = {'pool': JS_FIELD_SEP.join(values)}
+    
+    chars = ''.join(entry[0] for entry in dictionary)
+    header = (f"// Auto-generated by build_dict.py from dictionary.json - do not edit\n"
+              f"// Contains {len(dictionary)} characters\n")
+    body = JS_DECODER % (dumps(list(FIELDS)), dumps(JS_FIELD_SEP), dumps(chars), dumps(fields))
+    return (header + body).encode('utf-8')
+
+
+def save_packed_dictionary(dictionary: list, filepath: str):
+    """寫出二進位格式的 dictionary.bin（內容未變動時不重寫檔案）"""
+    data = pack_dictionary(dictionary)
+    if write_if_changed(filepath, data):
+        print(f"  Packed: {filepath}")
+    else:
+        print(f"  Up to date: {filepath}")
+    print(f"  Packed size: {len(data):,} bytes ({len(data)/1024:.1f} KB)")
+
+
+def save_dictionary_js(dictionary: list, filepath: str):
+    """產生前端預載入用的 dictionary-data.js（內容未變動時不重寫檔案）"""
+    data = encode_dictionary_js(dictionary)
+    if write_if_changed(filepath, data):
+        print(f"  Saved to: {filepath}")
+    else:
+        print(f"  Up to date: {filepath}")
+
+
+def iter_corpus_text(filepath: str):
+    """
+    依序產生語料檔中的文字，其他檔案視為純文字
+    JSON 檔為 daily_news.json 格式時只取新聞文字（zh / en 標題與 articles_* 的 title / content），
+    為陣列時取其中的字串
+    """
+    if filepath.endswith('.json'):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            yield from (value for value in data if isinstance(value, str))
+            return
+        for key, value in data.items():
+            if key in NEWS_TEXT_KEYS:
+                yield from (text for text in value if isinstance(text, str))
+            elif key.startswith(NEWS_ARTICLE_PREFIX):
+                for article in value:
+                    yield from (article[field] for field in NEWS_ARTICLE_FIELDS
+                                if isinstance(article.get(field), str))
+    else:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            yield f.read()
+
+
+def char_frequency(corpus_files: list) -> Counter:
+    """統計語料中各字元的出現次數"""
+    frequency = Counter()
+    for filepath in corpus_files:
+        if not os.path.exists(filepath):
+            print(f"    [Warning] Corpus not found: {os.path.basename(filepath)}")
+            continue
+        for text in iter_corpus_text(filepath):
+            frequency.update(text)
+    return frequency
+
+
+def big5_rank(char: str) -> tuple:
+    """次要排序：Big5 常用字在前，依 Big5 碼（筆畫）順序"""
+    try:
+        code = int.from_bytes(char.encode('big5'), 'big')
+    except UnicodeEncodeError:
+        return (2, ord(char))
+    low, high = BIG5_COMMON_RANGE
+    return (0 if low <= code <= high else 1, code)
+
+
+def save_dictionary_shards(dictionary: list, shard_dir: str, corpus_files: list,
+                           hot_size: int = HOT_SHARD_SIZE,
+                           cold_count: int = COLD_SHARD_COUNT) -> list:
+    """
+    依字頻輸出分層字典與 manifest，回傳寫出的檔案路徑
+    
+    - hot.json: 字頻最高的 hot_size 個字（語料未出現的字依 Big5 常用字順序補足）
+    - cold-XXXX-YYYY.json: 其餘字元依字碼點排序，切成 cold_count 段連續範圍
+    - manifest.json: 各分片的檔名、字數與字碼點範圍
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    
+    frequency = char_frequency(corpus_files)
+    ranked = sorted(dictionary, key=lambda entry: (-frequency[entry[0]], big5_rank(entry[0])))
+    hot = sorted(ranked[:hot_size], key=lambda entry: entry[0])
+    cold = sorted(ranked[hot_size:], key=lambda entry: entry[0])
+    seen_in_corpus = sum(1 for entry in hot if frequency[entry[0]])
+    
+    def dump(entries):
+        return json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    written = []
+    
+    def write(name, data):
+        filepath = os.path.join(shard_dir, name)
+        write_if_changed(filepath, data)
+        written.append(filepath)
+    
+    write(HOT_SHARD_FILE, dump(hot))
+    
+    cold_manifest = []
+    for shard in split_shards(cold, cold_count) if cold else []:
+        first, last = ord(shard[0][0]), ord(shard[-1][0])
+        name = f"cold-{first:04x}-{last:04x}.json"
+        write(name, dump(shard))
+        cold_manifest.append({'file': name, 'from': first, 'to': last, 'count': len(shard)})
+    
+    manifest = {
+        'version': 1,
+        'total': len(dictionary),
+        'corpus': [os.path.basename(path) for path in corpus_files],
+        'hot': {'file': HOT_SHARD_FILE, 'count': len(hot), 'in_corpus': seen_in_corpus},
+        'cold': cold_manifest,
+    }
+    write(SHARD_MANIFEST, (json.dumps(manifest, ensure_ascii=False, indent=2) + '\n').encode('utf-8'))
+    
+    # 移除上次建置留下、已不在 manifest 中的冷門分片
+    current = {os.path.basename(path) for path in written}
+    for name in os.listdir(shard_dir):
+        if name.startswith('cold-') and name.endswith('.json') and name not in current:
+            os.remove(os.path.join(shard_dir, name))
+    
+    print(f"  Shards: {shard_dir}")
+    print(f"    Hot: {len(hot):,} characters ({seen_in_corpus:,} seen in corpus)")
+    print(f"    Cold: {len(cold):,} characters in {len(cold_manifest)} shards")
+    return written
+
+
+def save_code_index(dictionary: list, filepath: str, tables: dict) -> str:
+    """
+    輸出各輸入法「字碼 → 字」的反向索引（保留碼表中的所有字碼，格式見 code_index.py）
+    tables 為 build_dictionary 載入的碼表，只收錄字典中的字。
+    """
+    print("\n[Code Index]")
+    index = build_code_index(tables, (entry[0] for entry in dictionary), rank=big5_rank)
+    write_if_changed(filepath, encode_code_index(index))
+    print(f"  Saved to: {filepath}")
+    for ime, entry in index['ims'].items():
+        ambiguous = sum(1 for chars in entry['chars'] if len(chars) > 1)
+        print(f"    {ime:<9} {len(entry['codes']):,} codes ({ambiguous:,} with multiple characters)")
+    return filepath
+
+
+def compressed_sizes(data: bytes) -> tuple:
+    """回傳 (gzip 大小, brotli 大小)；未安裝 brotli 時 brotli 大小為 None"""
+    gzip_size = len(gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return gzip_size, None
+    return gzip_size, len(brotli.compress(data, quality=11))
+
+
+def report_artifact_sizes(filepaths: list, budgets: dict) -> list:
+    """
+    顯示各產出檔的原始、gzip、brotli 大小與 gzip 預算，回傳超出預算的檔名
+    """
+    def kb(size):
+        return "n/a" if size is None else f"{size/1024:.1f} KB"
+    
+    print("\n[Size Budget] (budget applies to gzip size)")
+    print(f"  {'Artifact':<20} {'Raw':>10} {'Gzip':>10} {'Brotli':>10} {'Budget':>10}")
+    over_budget = []
+    for filepath in filepaths:
+        name = os.path.basename(filepath)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        gzip_size, brotli_size = compressed_sizes(data)
+        budget = budgets.get(name)
+        status = ""
+        if budget is not None and gzip_size > budget:
+            status = "  OVER BUDGET"
+            over_budget.append(name)
+        print(f"  {name:<20} {kb(len(data)):>10} {kb(gzip_size):>10} {kb(brotli_size):>10} "
+              f"{kb(budget):>10}{status}")
+    return over_budget
+
+
+def parse_budget(value: str) -> tuple:
+    """解析 --budget NAME=BYTES"""
+    name, sep, size = value.partition('=')
+    if not sep or not size.isdigit():
+        raise argparse.ArgumentTypeError(f"expected NAME=BYTES, got {value!r}")
+    return name, int(size)
+
+
+def parse_args(argv=None):
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description="Dictionary Generator (ETL) for Typing Game")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore the build cache and rebuild everything")
+    parser.add_argument('--charset', default=DEFAULT_CHARSET, metavar='NAME[,NAME]',
+                        help=f"characters to keep: {', '.join(CHARSETS)} or file:PATH; "
+                             f"comma-separated names are combined (default: {DEFAULT_CHARSET})")
+    parser.add_argument('--pinyin-heteronyms', action='store_true',
+                        help="emit every pinyin reading (e.g. xing2/hang2) instead of only the first")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes for parsing and per-character work (0 = all CPUs)")
+    parser.add_argument('--corpus', action='append', metavar='PATH',
+                        help="text or JSON corpus for hot-shard character frequency "
+                             "(repeatable, default: daily_news.json)")
+    parser.add_argument('--hot-size', type=int, default=HOT_SHARD_SIZE,
+                        help=f"characters in the hot shard (default: {HOT_SHARD_SIZE})")
+    parser.add_argument('--cold-shards', type=int, default=COLD_SHARD_COUNT,
+                        help=f"number of cold shards split by codepoint range (default: {COLD_SHARD_COUNT})")
+    parser.add_argument('--budget', type=parse_budget, action='append', default=[],
+                        metavar='NAME=BYTES',
+                        help="override the gzip size budget of an artifact (repeatable)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"build cache directory (default: {DEFAULT_CACHE_DIR})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """主程式進入點"""
+    args = parse_args(argv)
+    
     print("=" * 60)
     print("Dictionary Generator (ETL) for Typing Game")
     print("=" * 60)
     
+    cache = BuildCache(args.cache_dir, enabled=not args.no_cache)
+    
+    try:
+        charset = load_charset(args.charset, cache)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(2)
+    
     # 建構字典
-    dictionary = build_dictionary()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    tables = {}
+    dictionary = build_dictionary(cache, heteronym=args.pinyin_heteronyms, jobs=jobs, charset=charset,
+                                  tables=tables)
     
     # 儲存為 JSON
     save_dictionary(dictionary, OUTPUT_FILE)
     
+    # 儲存為二進位格式 (可依字碼點直接查詢)
+    save_packed_dictionary(dictionary, PACKED_OUTPUT_FILE)
+    
+    # 前端預載入用的 dictionary-data.js
+    save_dictionary_js(dictionary, JS_OUTPUT_FILE)
+    
+    # 各輸入法的字碼反向索引
+    save_code_index(dictionary, CODE_INDEX_FILE, tables)
+    
+    # 依字頻分層的字典分片
+    shard_files = save_dictionary_shards(dictionary, SHARD_DIR, args.corpus or DEFAULT_CORPUS_FILES,
+                                         args.hot_size, args.cold_shards)
+    
+    # 大小預算檢查
+    budgets = size_budgets(args.pinyin_heteronyms, args.budget)
+    over_budget = report_artifact_sizes(
+        [OUTPUT_FILE, PACKED_OUTPUT_FILE, JS_OUTPUT_FILE, CODE_INDEX_FILE, shard_files[0]], budgets)
+    
     # 顯示範例輸出
     print("\n[Sample Output] (first 20 entries)")
     print("-" * 70)
@@ -353,6 +919,10 @@ def main():
     for entry in dictionary[:20]:
         char, zy, cj, bs, py = entry
         print(f"{char:<4} {zy:<8} {cj:<10} {bs:<8} {py:<8}")
+    
+    if over_budget:
+        print(f"\n[ERROR] Artifacts over size budget: {', '.join(over_budget)}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Charset Membership Bitmaps
+字元集成員點陣圖：以 BMP 的 CJK 區段（擴展A + 基本區，U+3400–U+9FFF）為範圍，
+每個字元集預先計算一次、每字 1 bit（約 3.4 KB），查詢為 O(1) 的位元運算，
+不必對每個字元嘗試編碼並處理例外。
+
+內建字元集：
+- cjk:          所有 CJK 漢字（不限制字元集）
+- big5:         Big5
+- big5-level1:  Big5 常用字區 (A440–C67E)
+- big5-hkscs:   Big5-HKSCS
+- gb2312:       GB2312
+- file:PATH:    自訂字表（UTF-8 文字檔，檔案中的所有 CJK 字元），如常用國字標準字體表：
+                file:common-4808.txt（字表不隨 repo 附帶）
+
+多個字元集以逗號組合（聯集），如 big5,big5-hkscs。
+點陣圖依字元集定義（Python 版本的編碼表、字表檔內容）存入建置快取。
+"""
+
+import hashlib
+import os
+import sys
+from typing import Iterable, List, Tuple
+
+from build_cache import BuildCache, file_digest, make_key
+
+# 點陣圖範圍：CJK 擴展A (3400–4DBF) 與基本區 (4E00–9FFF)，中間的易經卦象符號不屬於 CJK
+BITMAP_BASE = 0x3400
+BITMAP_SIZE = 0x9FFF - BITMAP_BASE + 1
+CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF))
+
+DEFAULT_CHARSET = 'big5'
+
+# 名稱 -> (類型, 參數)
+CHARSETS = {
+    'cjk': ('all', None),
+    'big5': ('codec', 'big5'),
+    'big5-level1': ('codec-range', ('big5', 0xA440, 0xC67E)),
+    'big5-hkscs': ('codec', 'big5hkscs'),
+    'gb2312': ('codec', 'gb2312'),
+}
+
+
+def _cjk_codes():
+    for low, high in CJK_RANGES:
+        yield from range(low, high + 1)
+
+
+class CharsetBitmap:
+    """單一（或聯集後的）字元集在 CJK 範圍內的成員點陣圖"""
+
+    def __init__(self, name: str, bits: bytes):
+        self.name = name
+        self.bits = bytes(bits)
+
+    @classmethod
+    def from_codes(cls, name: str, codes: Iterable[int]) -> 'CharsetBitmap':
+        bits = bytearray((BITMAP_SIZE + 7) // 8)
+        for code in codes:
+            offset = code - BITMAP_BASE
+            if 0 <= offset < BITMAP_SIZE and is_cjk_code(code):
+                bits[offset >> 3] |= 1 << (offset & 7)
+        return cls(name, bits)
+
+    @classmethod
+    def from_codec(cls, name: str, codec: str, low: int = None, high: int = None) -> 'CharsetBitmap':
+        """可用 codec 編碼的字元；指定 low/high 時只取編碼值在範圍內的字元"""
+        def encodable(code: int) -> bool:
+            try:
+                encoded = chr(code).encode(codec)
+            except UnicodeEncodeError:
+                return False
+            return low is None or low <= int.from_bytes(encoded, 'big') <= high
+        return cls.from_codes(name, (code for code in _cjk_codes() if encodable(code)))
+
+    @classmethod
+    def from_chars(cls, name: str, chars: Iterable[str]) -> 'CharsetBitmap':
+        return cls.from_codes(name, (ord(char) for char in chars))
+
+    def __contains__(self, char: str) -> bool:
+        offset = ord(char) - BITMAP_BASE
+        return 0 <= offset < BITMAP_SIZE and bool(self.bits[offset >> 3] >> (offset & 7) & 1)
+
+    def __len__(self) -> int:
+        return bin(int.from_bytes(self.bits, 'little')).count('1')
+
+    def __or__(self, other: 'CharsetBitmap') -> 'CharsetBitmap':
+        merged = int.from_bytes(self.bits, 'little') | int.from_bytes(other.bits, 'little')
+        return CharsetBitmap(f"{self.name},{other.name}", merged.to_bytes(len(self.bits), 'little'))
+
+    def digest(self) -> str:
+        """點陣圖內容的雜湊（作為建置快取 key 的一部分）"""
+        return hashlib.sha256(self.bits).hexdigest()
+
+    def split(self, chars: Iterable[str]) -> Tuple[List[str], int, int]:
+        """過濾字元，回傳 (通過的字元, 非 CJK 數, 不在字元集內的數)"""
+        bits = self.bits
+        passed = []
+        non_cjk = 0
+        outside = 0
+        for char in chars:
+            code = ord(char)
+            if not (0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF):
+                non_cjk += 1
+                continue
+            offset = code - BITMAP_BASE
+            if bits[offset >> 3] >> (offset & 7) & 1:
+                passed.append(char)
+            else:
+                outside += 1
+        return passed, non_cjk, outside
+
+
+def is_cjk_code(code: int) -> bool:
+    return any(low <= code <= high for low, high in CJK_RANGES)
+
+
+def _definition(name: str) -> Tuple[str, object]:
+    """字元集名稱 -> (類型, 參數)；file:PATH 為自訂字表"""
+    if name.startswith('file:'):
+        return 'file', os.path.abspath(name[len('file:'):])
+    if name not in CHARSETS:
+        raise ValueError(f"unknown charset {name!r} (choose from {', '.join(CHARSETS)} or file:PATH)")
+    return CHARSETS[name]
+
+
+def _build(name: str, kind: str, arg) -> CharsetBitmap:
+    if kind == 'all':
+        return CharsetBitmap.from_codes(name, _cjk_codes())
+    if kind == 'codec':
+        return CharsetBitmap.from_codec(name, arg)
+    if kind == 'codec-range':
+        codec, low, high = arg
+        return CharsetBitmap.from_codec(name, codec, low, high)
+    with open(arg, 'r', encoding='utf-8') as f:
+        return CharsetBitmap.from_chars(name, f.read())
+
+
+def _cache_key(name: str, kind: str, arg) -> str:
+    # 編碼表隨 Python 版本而定；字表檔依內容
+    if kind == 'file':
+        return make_key('charset', kind, file_digest(arg))
+    return make_key('charset', kind, arg, sys.version_info[:2])
+
+
+def load_charset(spec: str = DEFAULT_CHARSET, cache: BuildCache = None) -> CharsetBitmap:
+    """
+    載入字元集點陣圖（逗號分隔的多個字元集取聯集），優先取用建置快取
+    未知的名稱或找不到字表檔時丟出 ValueError。
+    """
+    result = None
+    for name in (part.strip() for part in spec.split(',')):
+        if not name:
+            continue
+        kind, arg = _definition(name)
+        if kind == 'file' and not os.path.exists(arg):
+            raise ValueError(f"charset {name!r}: character list not found: {arg}")
+        key = _cache_key(name, kind, arg)
+        label = hashlib.sha256(arg.encode('utf-8')).hexdigest()[:16] if kind == 'file' else name
+        entry_name = f"charset-{label}"
+        bits = cache.load(entry_name, key) if cache is not None else None
+        if bits is None:
+            bitmap = _build(name, kind, arg)
+            if cache is not None:
+                cache.store(entry_name, key, bitmap.bits)
+        else:
+            bitmap = CharsetBitmap(name, bits)
+        result = bitmap if result is None else result | bitmap
+    if result is None:
+        raise ValueError("empty charset specification")
+    return result
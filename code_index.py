@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Reverse Code Index
+各輸入法「字碼 → 字」的反向索引 (code-index.json)，保留碼表中每個字的所有字碼，
+不只字典中顯示的最短碼，供「下一鍵提示」、重碼練習等逐鍵查詢使用
+
+格式（JSON）：
+
+    {
+      "version": 1,
+      "ims": {
+        "cangjie":  {"codes": ["a", "aa", ...], "chars": ["日曰", "昌", ...]},
+        "zhuyin":   {...},
+        "boshiamy": {...}
+      }
+    }
+
+- codes: 依字典序排序的原始按鍵序列（碼表中的鍵盤碼，非顯示用字根／注音）
+- chars: 與 codes 同位置的候選字（依 Big5 常用字順序串接）
+
+codes 已排序，同一前綴的字碼必為連續區間。CodeIndex 載入時一次建立
+「前綴 → 區間」表，之後完整字碼與前綴查詢都只需對前綴做一次雜湊查表，
+與字碼長度成正比，不必掃描整份字典。
+"""
+
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+FORMAT_VERSION = 1
+
+# 碼表名稱（與字典欄位名稱相同）
+IMES = ('cangjie', 'zhuyin', 'boshiamy')
+
+
+def build_code_index(tables: Dict[str, Dict[str, List[str]]], chars: Iterable[str],
+                     rank: Optional[Callable[[str], object]] = None) -> Dict:
+    """
+    由碼表 {ime: {char: [code, ...]}} 建立反向索引，只收錄 chars 中的字
+    rank 為候選字的排序 key（未指定時依字碼點）。
+    """
+    allowed = set(chars)
+    sort_key = rank or ord
+    ims = {}
+    for ime, char_codes in tables.items():
+        by_code: Dict[str, List[str]] = {}
+        for char, codes in char_codes.items():
+            if char not in allowed:
+                continue
+            for code in dict.fromkeys(codes):
+                by_code.setdefault(code, []).append(char)
+        codes = sorted(by_code)
+        ims[ime] = {
+            'codes': codes,
+            'chars': [''.join(sorted(by_code[code], key=sort_key)) for code in codes],
+        }
+    return {'version': FORMAT_VERSION, 'ims': ims}
+
+
+def encode_code_index(index: Dict) -> bytes:
+    return json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class ImeIndex:
+    """單一輸入法的反向索引"""
+
+    def __init__(self, codes: List[str], chars: List[str]):
+        self.codes = codes
+        self.chars = chars
+        # 每個前綴（含完整字碼與空字串）對應的 codes 區間 [lo, hi)，以及其後可接的按鍵
+        self._ranges: Dict[str, Tuple[int, int]] = {}
+        next_keys: Dict[str, Dict[str, None]] = {}
+        for i, code in enumerate(codes):
+            for length in range(len(code) + 1):
+                prefix = code[:length]
+                lo_hi = self._ranges.get(prefix)
+                self._ranges[prefix] = (i, i + 1) if lo_hi is None else (lo_hi[0], i + 1)
+                if length < len(code):
+                    next_keys.setdefault(prefix, {})[code[length]] = None
+        self._next_keys = {prefix: ''.join(keys) for prefix, keys in next_keys.items()}
+        self._exact = {code: i for i, code in enumerate(codes)}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def lookup(self, code: str) -> str:
+        """完整字碼的候選字（無此碼時為空字串）"""
+        i = self._exact.get(code)
+        return '' if i is None else self.chars[i]
+
+    def has_prefix(self, prefix: str) -> bool:
+        return prefix in self._ranges
+
+    def next_keys(self, prefix: str) -> str:
+        """prefix 之後可接的按鍵（依字典序），已是最長字碼時為空字串"""
+        return self._next_keys.get(prefix, '')
+
+    def count(self, prefix: str) -> int:
+        """以 prefix 開頭的字碼數"""
+        lo, hi = self._ranges.get(prefix, (0, 0))
+        return hi - lo
+
+    def completions(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """以 prefix 開頭的 (字碼, 候選字)，依字碼排序，最多 limit 筆"""
+        lo, hi = self._ranges.get(prefix, (0, 0))
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return list(zip(self.codes[lo:hi], self.chars[lo:hi]))
+
+
+class CodeIndex:
+    """讀取 code-index.json：index['cangjie'].lookup('a')"""
+
+    def __init__(self, data: Dict):
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported code index version: {data.get('version')}")
+        self._data = data['ims']
+        self._imes: Dict[str, ImeIndex] = {}
+
+    @classmethod
+    def load(cls, filepath: str) -> 'CodeIndex':
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __contains__(self, ime: str) -> bool:
+        return ime in self._data
+
+    def __getitem__(self, ime: str) -> ImeIndex:
+        # 前綴表在第一次使用該輸入法時才建立
+        index = self._imes.get(ime)
+        if index is None:
+            entry = self._data[ime]
+            index = self._imes[ime] = ImeIndex(entry['codes'], entry['chars'])
+        return index
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Dictionary Query API
+建置產出的字典查詢介面，供新聞處理、基準測試等 Python 工具使用
+
+不載入 dictionary.json（約 13k 個 Python list），而是：
+- dictionary.bin：以 mmap 開啟（packed_dict.PackedDictionary），依字碼點 O(1) 查詢，
+  字串在查詢時才解碼
+- code-index.json：字碼 → 字的反向索引（code_index.CodeIndex），第一次 by_code 時才載入
+- 拼音索引：第一次 by_pinyin 時由 dictionary.bin 的拼音欄位建立
+
+Usage:
+    from dictionary import Dictionary
+    with Dictionary() as d:
+        d.lookup('字')                 # Entry(char='字', zhuyin='ㄗˋ', cangjie='十弓木', ...)
+        d.by_code('cangjie', 'jnd')    # '字…'（也接受字根：'十弓木'）
+        d.by_pinyin('zi4')             # 不含聲調時列出所有聲調：d.by_pinyin('zi')
+        d.encode('打字', 'zhuyin')     # ['ㄉㄚˇ', 'ㄗˋ']，字典外的字為 None
+"""
+
+import os
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+from code_index import IMES, CodeIndex, ImeIndex
+from packed_dict import FIELDS, PINYIN_HETERONYM_SEP, PackedDictionary
+
+# 與 build_dict.py 的輸出路徑相同（不 import build_dict，避免載入建置相依套件）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKED_FILE = os.path.join(SCRIPT_DIR, "dictionary.bin")
+CODE_INDEX_FILE = os.path.join(SCRIPT_DIR, "code-index.json")
+
+_PINYIN_TONES = '012345'
+
+
+class Entry(NamedTuple):
+    char: str
+    zhuyin: str
+    cangjie: str
+    boshiamy: str
+    pinyin: str
+
+
+def _display_to_keys(method: str) -> Dict[str, str]:
+    """顯示用字根／注音 -> 鍵盤碼（只在查詢使用顯示字碼時載入 build_dict 的對照表）"""
+    from build_dict import CANGJIE_MAP, KEYBOARD_TO_ZHUYIN
+    mapping = {'cangjie': CANGJIE_MAP, 'zhuyin': KEYBOARD_TO_ZHUYIN}.get(method, {})
+    return {symbol: key for key, symbol in mapping.items()}
+
+
+class Dictionary:
+    """
+    字典的唯讀查詢介面；各索引在第一次使用時才建立，
+    只查字元時常駐記憶體只有 dictionary.bin 的索引區段
+    """
+
+    def __init__(self, packed_file: str = PACKED_FILE, code_index_file: str = CODE_INDEX_FILE):
+        self._packed = PackedDictionary(packed_file)
+        self._field_index = {name: i for i, name in enumerate(self._packed.fields)}
+        self._code_index_file = code_index_file
+        self._code_index: Optional[CodeIndex] = None
+        self._pinyin: Optional[Dict[str, str]] = None
+
+    def close(self):
+        self._packed.close()
+
+    def __enter__(self) -> 'Dictionary':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._packed)
+
+    def __contains__(self, char: str) -> bool:
+        return char in self._packed
+
+    def lookup(self, char: str) -> Optional[Entry]:
+        """字元的所有欄位，查無此字時回傳 None"""
+        entry = self._packed.lookup(char)
+        return Entry(*entry) if entry is not None else None
+
+    def by_code(self, method: str, code: str) -> str:
+        """
+        輸入法字碼的候選字（Big5 常用字在前），method 為 cangjie / zhuyin / boshiamy
+        code 可為鍵盤碼（'jnd'）或顯示用字根／注音（'十弓木'）；包含所有字碼，不只最短碼。
+        """
+        if method not in IMES:
+            raise ValueError(f"unknown input method {method!r} (choose from {', '.join(IMES)})")
+        if not code.isascii():
+            display = _display_to_keys(method)
+            code = ''.join(display.get(symbol, symbol) for symbol in code)
+        return self.code_index(method).lookup(code.lower())
+
+    def code_index(self, method: str) -> ImeIndex:
+        """輸入法的完整反向索引，可做前綴查詢與下一鍵提示"""
+        if self._code_index is None:
+            self._code_index = CodeIndex.load(self._code_index_file)
+        return self._code_index[method]
+
+    def by_pinyin(self, syllable: str) -> str:
+        """
+        拼音的所有字（依字碼點順序）。帶聲調（'zi4'，TONE3 格式）時只取該聲調，
+        不帶聲調（'zi'）時包含所有聲調；多音字模式建置的每個讀音都會列入。
+        """
+        if self._pinyin is None:
+            self._pinyin = self._build_pinyin_index()
+        return self._pinyin.get(syllable.lower(), '')
+
+    def _build_pinyin_index(self) -> Dict[str, str]:
+        packed = self._packed
+        field_index = self._field_index['pinyin']
+        chars: Dict[str, List[str]] = {}
+        for row in range(len(packed)):
+            value = packed.field(row, field_index)
+            if not value:
+                continue
+            char = chr(packed.codepoint(row))
+            keys = {}
+            for reading in value.split(PINYIN_HETERONYM_SEP):
+                keys[reading] = None
+                keys[reading.rstrip(_PINYIN_TONES)] = None
+            for key in keys:
+                chars.setdefault(key, []).append(char)
+        return {key: ''.join(value) for key, value in chars.items()}
+
+    def encode(self, text: str, field: str = 'cangjie') -> List[Optional[str]]:
+        """
+        逐字取出 field（zhuyin / cangjie / boshiamy / pinyin）的值，字典外的字元為 None
+        重複的字只查詢一次，適合一次處理整篇文章。
+        """
+        if field not in self._field_index:
+            raise ValueError(f"unknown field {field!r} (choose from {', '.join(FIELDS)})")
+        packed = self._packed
+        field_index = self._field_index[field]
+        memo: Dict[str, Optional[str]] = {}
+        result = []
+        for char in text:
+            if char in memo:
+                result.append(memo[char])
+                continue
+            row = packed.row_of(char)
+            value = packed.field(row, field_index) if row is not None else None
+            memo[char] = value
+            result.append(value)
+        return result
+
+
+if __name__ == '__main__':
+    with Dictionary() as dictionary:
+        print(f"{len(dictionary):,} characters")
+        for char in sys.argv[1:]:
+            print(dictionary.lookup(char))
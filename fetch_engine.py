@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Async Fetch Engine for the News Pipeline
+One pooled aiohttp session shared by every feed, redirect and article request.
+
+- Keep-alive connections are reused across requests (TCPConnector pool)
+- Concurrency is capped globally and per host
+- A token bucket limits the overall request rate
+- Counters report requests, failures, bytes and sockets opened
+- An optional HttpCache (http_cache.py) makes feed GETs conditional and
+  skips redirects resolved on earlier runs
+- stream() reads a body in chunks with a byte cap, rejects unwanted content
+  types before downloading and lets the consumer stop early
+- gather_until() feeds work to a bounded set of tasks and stops at a target
+- An optional RunReport (run_report.py) receives per-request phase timings
+  (pool wait, DNS, connect, time to first byte, download) and pool usage
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import aiohttp
+import feedparser
+
+from http_cache import HttpCache
+from run_report import RunReport
+
+# Total simultaneous connections
+DEFAULT_CONCURRENCY = 20
+
+# Simultaneous connections to the same host (news.google.com sees every redirect)
+DEFAULT_PER_HOST = 6
+
+# Requests per second across all hosts (0 disables rate limiting)
+DEFAULT_RATE = 20.0
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_CHUNK_SIZE = 16 * 1024
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+class FetchResult(NamedTuple):
+    """A completed response: final URL after redirects, status, headers and body."""
+    url: str
+    status: int
+    headers: Mapping[str, str]    # case-insensitive
+    body: bytes
+
+
+class StreamResult(NamedTuple):
+    """Outcome of stream(): how much was read and why reading ended."""
+    url: str
+    status: int
+    received: int
+    stopped: bool      # the consumer had enough
+    truncated: bool    # the byte cap was reached first
+
+
+class ContentRejected(Exception):
+    """The response's Content-Type is not one the caller accepts."""
+
+
+def _trace_phase(phase: str):
+    """aiohttp trace callbacks adding the duration of `phase` to the request's marks (ms)."""
+    async def on_start(session, context, params):
+        marks = context.trace_request_ctx
+        if marks is not None:
+            marks[phase + '_start'] = time.perf_counter()
+
+    async def on_end(session, context, params):
+        marks = context.trace_request_ctx
+        if marks is not None and phase + '_start' in marks:
+            elapsed = (time.perf_counter() - marks.pop(phase + '_start')) * 1000
+            # Summed over redirect hops
+            marks[phase] = marks.get(phase, 0.0) + elapsed
+
+    return on_start, on_end
+
+
+async def _on_response_headers(session, context, params):
+    if context.trace_request_ctx is not None:
+        context.trace_request_ctx['headers_at'] = time.perf_counter()
+
+
+class RateLimiter:
+    """Token bucket shared by all requests: `rate` tokens per second, up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchEngine:
+    """
+    Async HTTP client for the news pipeline.
+
+    Use as `async with FetchEngine() as engine:`; all requests made through the
+    engine share one connection pool, so the run opens a handful of sockets per
+    host instead of one per request.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+                 rate: float = DEFAULT_RATE, timeout: float = DEFAULT_TIMEOUT,
+                 user_agent: str = DEFAULT_USER_AGENT, cache: Optional[HttpCache] = None,
+                 report: Optional[RunReport] = None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.limiter = RateLimiter(rate)
+        self.cache = cache
+        self.report = report
+        self.session = None
+
+        self.requests = 0
+        self.failures = 0
+        self.bytes = 0
+        self.connections = 0
+        self.streamed = 0
+        self.stopped_early = 0
+        self.truncated = 0
+        self.rejected = 0
+
+    async def __aenter__(self) -> 'FetchEngine':
+        self.session = aiohttp.ClientSession(
+            connector=self._make_connector(),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': self.user_agent},
+            trace_configs=[self._make_trace_config()],
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    # Hooks for engines that redirect traffic elsewhere (fetch_replay.py)
+
+    def _make_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                    ttl_dns_cache=300)
+
+    def _request_url(self, url: str) -> str:
+        """URL actually requested for `url`."""
+        return url
+
+    def _response_url(self, url: str) -> str:
+        """Inverse of _request_url for final URLs after redirects."""
+        return url
+
+    def _make_trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_connection)
+        if self.report:
+            self.report.pool_limit = self.concurrency
+            for phase, start, end in (
+                    ('queued', trace.on_connection_queued_start, trace.on_connection_queued_end),
+                    ('dns', trace.on_dns_resolvehost_start, trace.on_dns_resolvehost_end),
+                    ('connect', trace.on_connection_create_start, trace.on_connection_create_end)):
+                on_start, on_end = _trace_phase(phase)
+                start.append(on_start)
+                end.append(on_end)
+            trace.on_request_end.append(_on_response_headers)
+        return trace
+
+    async def _on_connection(self, session, context, params):
+        self.connections += 1
+
+    def _begin_request(self) -> Optional[Dict]:
+        """Trace marks for one request (None when no report is attached)."""
+        if self.report is None:
+            return None
+        self.report.request_started()
+        return {'started_at': time.perf_counter()}
+
+    def _end_request(self, url: str, marks: Optional[Dict], received: int, failed: bool,
+                     timing: Optional[Dict] = None):
+        """Turn trace marks into phase timings (ms) and hand them to the report."""
+        if marks is None:
+            return
+        now = time.perf_counter()
+        phases = {phase: round(marks[phase], 1) for phase in ('queued', 'dns', 'connect') if phase in marks}
+        if 'headers_at' in marks:
+            phases['ttfb'] = round((marks['headers_at'] - marks['started_at']) * 1000, 1)
+            phases['download'] = round((now - marks['headers_at']) * 1000, 1)
+        phases['total'] = round((now - marks['started_at']) * 1000, 1)
+        phases['bytes'] = received
+        self.report.request_finished(url, phases, failed)
+        if timing is not None:
+            timing.update(phases)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET a URL, following redirects; raises on network errors and HTTP 4xx/5xx."""
+        await self.limiter.acquire()
+        self.requests += 1
+        marks = self._begin_request()
+        try:
+            async with self.session.get(self._request_url(url), headers=headers,
+                                        trace_request_ctx=marks) as response:
+                response.raise_for_status()
+                body = await response.read()
+        except Exception:
+            self.failures += 1
+            self._end_request(url, marks, 0, True)
+            raise
+        self.bytes += len(body)
+        self._end_request(url, marks, len(body), False)
+        return FetchResult(self._response_url(str(response.url)), response.status,
+                           response.headers.copy(), body)
+
+    async def stream(self, url: str, consume: Callable[[bytes], bool], max_bytes: int,
+                     content_types: Optional[Iterable[str]] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     timing: Optional[Dict] = None,
+                     on_charset: Optional[Callable[[Optional[str]], None]] = None) -> StreamResult:
+        """
+        GET a URL and pass its body to consume() chunk by chunk.
+
+        Reading stops when consume() returns True or max_bytes have been read; the
+        rest of the body is never downloaded. Raises ContentRejected (before any
+        body is read) if content_types is given and the response declares another type.
+        on_charset receives the Content-Type charset (or None) before the first chunk.
+        With a report attached, the request's phase timings are also copied into `timing`.
+        """
+        await self.limiter.acquire()
+        self.requests += 1
+        self.streamed += 1
+        received = 0
+        stopped = truncated = False
+        failed = True
+        marks = self._begin_request()
+        try:
+            async with self.session.get(self._request_url(url), trace_request_ctx=marks) as response:
+                response.raise_for_status()
+                if content_types and 'Content-Type' in response.headers \
+                        and response.content_type not in content_types:
+                    self.rejected += 1
+                    raise ContentRejected(f"{response.content_type} ({url})")
+                if on_charset is not None:
+                    on_charset(response.charset)
+
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if received + len(chunk) > max_bytes:
+                        chunk = chunk[:max_bytes - received]
+                    received += len(chunk)
+                    if consume(chunk):
+                        stopped = True
+                        break
+                    if received >= max_bytes:
+                        truncated = True
+                        break
+                # Leaving the block with unread data closes the connection
+                # instead of draining the rest of the page
+                final_url, status = self._response_url(str(response.url)), response.status
+            failed = False
+        except ContentRejected:
+            failed = False
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.bytes += received
+            self._end_request(url, marks, received, failed, timing)
+
+        self.stopped_early += stopped
+        self.truncated += truncated
+        return StreamResult(final_url, status, received, stopped, truncated)
+
+    async def resolve_redirect(self, url: str, timing: Optional[Dict] = None) -> str:
+        """Follow redirects with HEAD requests and return the final URL."""
+        if self.cache:
+            final_url = self.cache.get_redirect(url)
+            if final_url:
+                return final_url
+
+        await self.limiter.acquire()
+        self.requests += 1
+        marks = self._begin_request()
+        try:
+            async with self.session.head(self._request_url(url), allow_redirects=True,
+                                         trace_request_ctx=marks) as response:
+                final_url = self._response_url(str(response.url))
+        except Exception:
+            self.failures += 1
+            self._end_request(url, marks, 0, True, timing)
+            raise
+        self._end_request(url, marks, 0, False, timing)
+
+        if self.cache:
+            self.cache.store_redirect(url, final_url)
+        return final_url
+
+    async def fetch_feed(self, url: str):
+        """Download and parse one RSS feed (conditional GET when cached)."""
+        if self.cache:
+            result = await self.get(url, headers=self.cache.feed_validators(url))
+            body = self.cache.feed_body(url) if result.status == 304 else None
+            if body is None:
+                if result.status == 304:
+                    result = await self.get(url)
+                self.cache.store_feed(url, result.headers, result.body)
+                body = result.body
+            return self._parse_feed(body)
+
+        result = await self.get(url)
+        return self._parse_feed(result.body)
+
+    def _parse_feed(self, body: bytes):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        feed = feedparser.parse(body)
+        if self.report:
+            self.report.add_time('feed_parse', time.perf_counter() - start, time.process_time() - cpu_start)
+        return feed
+
+    async def fetch_feeds(self, urls: List[str]) -> list:
+        """Fetch several feeds concurrently; failed feeds come back as exceptions."""
+        return await asyncio.gather(*(self.fetch_feed(url) for url in urls),
+                                    return_exceptions=True)
+
+    def summary(self) -> str:
+        text = (f"{self.requests} requests, {self.failures} failed, "
+                f"{self.bytes / 1024:.0f} KB, {self.connections} connections opened")
+        if self.streamed:
+            text += (f"; {self.streamed} streamed ({self.stopped_early} stopped early, "
+                     f"{self.truncated} hit byte cap, {self.rejected} rejected)")
+        return text
+
+
+class ScheduleStats:
+    """Outcome counters for gather_until(): useful results versus wasted work."""
+
+    __slots__ = ('dispatched', 'useful', 'rejected', 'failed', 'surplus', 'cancelled')
+
+    def __init__(self):
+        self.dispatched = 0
+        self.useful = 0
+        self.rejected = 0    # finished but returned None
+        self.failed = 0      # raised an exception
+        self.surplus = 0     # finished after the target was already met
+        self.cancelled = 0   # aborted while in flight
+
+    @property
+    def completed(self) -> int:
+        return self.useful + self.rejected + self.failed + self.surplus
+
+    @property
+    def wasted(self) -> int:
+        return self.dispatched - self.useful
+
+    def summary(self) -> str:
+        return (f"{self.dispatched} dispatched, {self.useful} useful, {self.wasted} wasted "
+                f"({self.rejected} rejected, {self.failed} failed, "
+                f"{self.surplus} surplus, {self.cancelled} cancelled)")
+
+
+async def gather_until(items: Iterable, worker: Callable[..., Awaitable], target: int,
+                       concurrency: int,
+                       on_complete: Optional[Callable[[object, ScheduleStats], None]] = None):
+    """
+    Run worker(item) over items with at most `concurrency` tasks in flight.
+
+    A new item is dispatched only when a running task finishes, and dispatching
+    stops as soon as `target` non-None results have been collected; tasks still
+    in flight are then cancelled. Returns (results, stats).
+    """
+    results = []
+    stats = ScheduleStats()
+    remaining = iter(items)
+    pending = set()
+
+    def dispatch():
+        while len(pending) < concurrency and len(results) < target:
+            item = next(remaining, _END)
+            if item is _END:
+                return
+            pending.add(asyncio.create_task(worker(item)))
+            stats.dispatched += 1
+
+    dispatch()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = None
+                if task.exception() is not None:
+                    stats.failed += 1
+                else:
+                    result = task.result()
+                    if result is None:
+                        stats.rejected += 1
+                    elif len(results) < target:
+                        results.append(result)
+                        stats.useful += 1
+                    else:
+                        stats.surplus += 1
+                        result = None
+                if on_complete:
+                    on_complete(result, stats)
+            if len(results) >= target:
+                break
+            dispatch()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        stats.cancelled += len(pending)
+
+    return results, stats
+
+
+_END = object()
@@ -6,16 +6,29 @@ Supports both title-only mode and full article mode.
 Enhanced to fetch 100 technology articles per language with 2026 focus.
 """
 
-import feedparser
-from bs4 import BeautifulSoup
+import asyncio
+import hashlib
 import json
+import os
 import re
-import requests
+from contextlib import nullcontext
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dictionary import PACKED_FILE, Dictionary
+from fetch_engine import ContentRejected, FetchEngine, gather_until
+from fetch_priority import DomainHistory, entry_domain, priority
+import html_extract
+import text_normalize
+from html_extract import CONTENT_BUDGET, INCREMENTAL_PARSER, IncrementalExtractor, get_extractor
+from http_cache import HttpCache
+from keyword_match import KeywordMatcher
+from near_dup import FingerprintStore, NearDuplicateFilter, body_filter, title_filter
+from news_url import UrlResolver
+from run_report import RunReport
+from text_normalize import normalize_text
 
 # RSS Feed URLs - Multiple sources for better coverage
 RSS_FEEDS = {
@@ -38,12 +51,68 @@ ARTICLE_COUNT = 100
 # Maximum articles to attempt (since some will fail)
 MAX_ATTEMPTS = 250
 
+# Articles downloaded at the same time (new ones start only as others finish)
+ARTICLE_CONCURRENCY = 10
+
+# Fetch entries in order of their pre-fetch priority (title/summary keywords plus the
+# publisher's past acceptance rate, see fetch_priority.py) instead of feed order
+PRIORITIZE_FETCHES = True
+
+# Entries scoring below this are never fetched. An entry without keyword hits from an
+# unseen domain scores 0.6, so only domains that keep failing fall below it (until
+# their history decays back towards the prior, see fetch_priority.DECAY_HALF_LIFE).
+PRIORITY_THRESHOLD = 0.5
+
+# HTML extraction backend. Unset: article pages are streamed through the incremental
+# extractor (tokenized by lxml when installed), which stops the download once enough
+# text is found. Set to a backend name (selectolax, lxml, stream, bs4) to parse the
+# capped body in one go instead.
+EXTRACTOR_NAME = os.environ.get('NEWS_HTML_EXTRACTOR') or None
+EXTRACTOR = get_extractor(EXTRACTOR_NAME)
+
+# Bytes read per article page at most (the rest of the page is never downloaded)
+ARTICLE_MAX_BYTES = 1024 * 1024
+
+# Bump when finalize_article_content changes the text it returns
+ARTICLE_TEXT_FORMAT = 1
+
+
+def article_cache_version() -> str:
+    """Version of the cached article text: extraction settings and the extractor/normalizer code."""
+    h = hashlib.sha256(repr((ARTICLE_TEXT_FORMAT, EXTRACTOR_NAME or INCREMENTAL_PARSER, CONTENT_BUDGET,
+                             ARTICLE_MAX_BYTES)).encode('utf-8'))
+    for module in (html_extract, text_normalize):
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+# Cached text from another version is re-extracted
+ARTICLE_CACHE_VERSION = article_cache_version()
+
+# Article responses with another declared Content-Type are rejected unread
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Run report (JSON lines), written next to the news output
+REPORT_FILE = 'fetch_report.jsonl'
+
 # Request timeout
 REQUEST_TIMEOUT = 10
 
 # User agent for requests
 USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
 
+# Built dictionary used to precompute encodings for the day's content (the packed
+# dictionary.bin, opened through dictionary.Dictionary instead of parsing dictionary.json)
+DICTIONARY_FILE = PACKED_FILE
+
+# Encoding bundle layout: each table value joins these fields with ENCODING_SEP
+ENCODING_FIELDS = ['zhuyin', 'cangjie', 'boshiamy', 'pinyin']
+ENCODING_SEP = '|'
+
+# Characters the frontend treats as Chinese (same range as isChinese in encoding-data.js)
+CJK_CHAR_RE = re.compile(r'[\u4e00-\u9fff]')
+
 # Technology keywords for filtering
 TECH_KEYWORDS_ZH = [
     '科技', 'AI', '人工智慧', '機器學習', '深度學習', '神經網路',
@@ -72,174 +141,249 @@ TECH_KEYWORDS_EN = [
 ]
 
 
-def normalize_punctuation(text: str) -> str:
-    """Convert half-width punctuation to full-width."""
-    replacements = {
-        ',': '，',
-        '.': '。',
-        '?': '？',
-        '!': '！',
-        ':': '：',
-        ';': '；',
-        '(': '（',
-        ')': '）',
-    }
-    
-    for half, full in replacements.items():
-        text = text.replace(half, full)
-    
-    return text
+# Per-keyword weights for the tech score (keywords not listed weigh 1.0)
+TECH_KEYWORD_WEIGHTS: Dict[str, float] = {}
+
+# Minimum keyword score for an article to count as tech-related
+TECH_SCORE_THRESHOLD = 2
 
+# Match ASCII keywords as whole words only ("AR" no longer hits "Architecture").
+# Off by default: today's threshold relies on some of those substring hits.
+TECH_WORD_BOUNDARIES = False
+
+# Keyword matchers, compiled once per language
+TECH_MATCHERS = {
+    'zh': KeywordMatcher(TECH_KEYWORDS_ZH, TECH_KEYWORD_WEIGHTS, TECH_WORD_BOUNDARIES),
+    'en': KeywordMatcher(TECH_KEYWORDS_EN, TECH_KEYWORD_WEIGHTS, TECH_WORD_BOUNDARIES),
+}
 
-def strip_html(html_text: str) -> str:
-    """Remove all HTML tags and get clean text."""
-    soup = BeautifulSoup(html_text, 'html.parser')
-    return soup.get_text()
 
+def timed(engine: FetchEngine, name: str):
+    """Stage timer on the engine's run report (no-op without one)."""
+    return engine.report.stage(name) if engine.report else nullcontext()
 
-def clean_whitespace(text: str) -> str:
-    """Remove excessive whitespace and newlines."""
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
-    return text
+
+def tech_matcher(lang: str) -> KeywordMatcher:
+    """Keyword matcher for a language."""
+    return TECH_MATCHERS['zh' if lang == 'zh' else 'en']
 
 
 def is_tech_related(title: str, content: str, lang: str) -> bool:
     """Check if article is technology-related based on keywords."""
-    text = (title + ' ' + content).lower()
-    keywords = TECH_KEYWORDS_ZH if lang == 'zh' else TECH_KEYWORDS_EN
-
-    # Count keyword matches
-    matches = sum(1 for keyword in keywords if keyword.lower() in text)
+    # Distinct keyword hits, weighted; one pass over the text
+    _, score = tech_matcher(lang).classify(title + ' ' + content)
 
     # Consider it tech-related if at least 2 keywords match
-    return matches >= 2
+    return score >= TECH_SCORE_THRESHOLD
 
 
-def follow_google_news_redirect(google_url: str) -> Optional[str]:
-    """Follow Google News redirect to get the actual article URL."""
-    try:
-        headers = {'User-Agent': USER_AGENT}
-        response = requests.head(google_url, headers=headers, allow_redirects=True, timeout=REQUEST_TIMEOUT)
-        return response.url
-    except Exception as e:
-        print(f"  ⚠ Redirect failed: {e}")
-        return None
+def entry_priority(entry: Dict, lang: str, history: Optional[DomainHistory] = None) -> float:
+    """Pre-fetch priority of a feed entry from its title, summary and publisher domain."""
+    text = clean_title(entry.get('title', ''), lang) + ' ' + normalize_text(entry.get('summary', ''), lang, html=True)
+    return priority(text, entry_domain(entry), tech_matcher(lang), history)
 
 
-def extract_article_content(url: str, lang: str) -> Optional[str]:
-    """Extract main article content from a news URL."""
-    try:
-        headers = {'User-Agent': USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Remove unwanted elements
-        for tag in soup.find_all(['script', 'style', 'nav', 'header', 'footer',
-                                   'aside', 'iframe', 'noscript', 'form']):
-            tag.decompose()
-
-        # Try to find article content using common selectors
-        content = None
-
-        # Common article content selectors
-        selectors = [
-            'article',
-            '[class*="article-content"]',
-            '[class*="article-body"]',
-            '[class*="story-body"]',
-            '[class*="post-content"]',
-            '[class*="entry-content"]',
-            '.content',
-            'main',
-        ]
+def rank_entries(entries: List[Dict], lang: str, history: Optional[DomainHistory] = None,
+                 threshold: float = PRIORITY_THRESHOLD) -> Tuple[List[Tuple[float, Dict]], int]:
+    """(priority, entry) by descending priority (ties keep feed order), and the number below threshold."""
+    scored = [(entry_priority(entry, lang, history), entry) for entry in entries]
+    ranked = [item for item in scored if item[0] >= threshold]
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return ranked, len(scored) - len(ranked)
 
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                # Get all paragraph text
-                paragraphs = element.find_all('p')
-                if paragraphs:
-                    content = ' '.join(p.get_text().strip() for p in paragraphs if p.get_text().strip())
-                    if len(content) > 200:  # Minimum content length
-                        break
-
-        if not content:
-            # Fallback: get all paragraphs from body
-            paragraphs = soup.find_all('p')
-            content = ' '.join(p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > 50)
-
-        if content:
-            content = clean_whitespace(content)
-            if lang == 'zh':
-                content = normalize_punctuation(content)
-
-            # Limit content length for typing practice (around 500-1000 chars)
-            if len(content) > 1000:
-                # Try to cut at sentence boundary
-                cut_point = content.rfind('。', 0, 1000)
-                if cut_point == -1:
-                    cut_point = content.rfind('. ', 0, 1000)
-                if cut_point == -1:
-                    cut_point = 1000
-                content = content[:cut_point + 1]
-
-            return content if len(content) >= 100 else None
 
-        return None
+def normalized_length(lang: str):
+    """Length of a paragraph after normalize_text (lets extractors stop at the budget)."""
+    return lambda text: len(normalize_text(text, lang))
+
+
+def parse_article_content(html: bytes, lang: str, extractor=None) -> Optional[str]:
+    """Extract main article content from a downloaded news page."""
+    content = (extractor or EXTRACTOR)(html, measure=normalized_length(lang))
+    return finalize_article_content(content, lang)
 
+
+def finalize_article_content(content: Optional[str], lang: str) -> Optional[str]:
+    """Normalize and trim extracted text; None if too short."""
+    if content:
+        content = normalize_text(content, lang)
+
+        # Limit content length for typing practice (around 500-1000 chars)
+        if len(content) > CONTENT_BUDGET:
+            # Try to cut at sentence boundary
+            cut_point = content.rfind('。', 0, CONTENT_BUDGET)
+            if cut_point == -1:
+                cut_point = content.rfind('. ', 0, CONTENT_BUDGET)
+            if cut_point == -1:
+                cut_point = CONTENT_BUDGET
+            content = content[:cut_point + 1]
+
+        return content if len(content) >= 100 else None
+
+    return None
+
+
+async def extract_article_content(engine: FetchEngine, url: str, lang: str,
+                                  record: Optional[Dict] = None) -> Optional[str]:
+    """
+    Download a news URL and extract its main article content.
+
+    record, if given, receives the request timings, parse time, sizes and the
+    reason when no content comes back.
+    """
+    record = {} if record is None else record
+    cache = engine.cache
+    if cache:
+        cached = cache.get_article(url, ARTICLE_CACHE_VERSION)
+        if cached is not None:
+            record['cached'] = True
+            if cached is cache.MISSING:
+                record['reason'] = 'no_content'
+                return None
+            return cached
+
+    timing = record.setdefault('fetch_ms', {})
+    try:
+        if EXTRACTOR_NAME is None:
+            extractor = IncrementalExtractor(measure=normalized_length(lang))
+            parse_seconds = 0.0
+
+            def feed(chunk: bytes) -> bool:
+                nonlocal parse_seconds
+                start = time.perf_counter()
+                try:
+                    return extractor.feed(chunk)
+                finally:
+                    parse_seconds += time.perf_counter() - start
+
+            result = await engine.stream(url, feed, ARTICLE_MAX_BYTES, HTML_CONTENT_TYPES, timing=timing,
+                                         on_charset=extractor.set_charset)
+            start = time.perf_counter()
+            content = finalize_article_content(extractor.close(), lang)
+            record['parse_ms'] = round((parse_seconds + time.perf_counter() - start) * 1000, 1)
+            record['encoding'] = extractor.encoding
+        else:
+            chunks = []
+            result = await engine.stream(url, chunks.append, ARTICLE_MAX_BYTES, HTML_CONTENT_TYPES,
+                                         timing=timing)
+            start = time.perf_counter()
+            # Parsing is CPU-bound; keep the event loop free for in-flight downloads
+            content = await asyncio.to_thread(parse_article_content, b''.join(chunks), lang)
+            record['parse_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        record.update(bytes=result.received, stopped_early=result.stopped, truncated=result.truncated)
+        if content is None:
+            record['reason'] = 'no_content'
+        if cache:
+            cache.store_article(url, content, ARTICLE_CACHE_VERSION)
+        return content
+    except ContentRejected as e:
+        print(f"  ⚠ Skipped non-HTML page: {e}")
+        record['reason'] = 'non_html'
+        if cache:
+            cache.store_article(url, None, ARTICLE_CACHE_VERSION)
+        return None
     except Exception as e:
         print(f"  ⚠ Content extraction failed: {e}")
+        record['reason'] = 'fetch_failed'
+        record['error'] = f"{type(e).__name__}: {e}"[:200]
         return None
 
 
-def fetch_single_article(entry: Dict, lang: str) -> Optional[Dict]:
-    """Fetch a single article (for parallel processing)."""
-    try:
-        title = entry.get('title', '')
-        link = entry.get('link', '')
-
-        if not title or not link:
-            return None
-
-        # Clean title
-        title = strip_html(title)
-        title = title.split(' - ')[0].strip()
-        if lang == 'zh':
-            title = normalize_punctuation(title)
-        title = clean_whitespace(title)
-
-        if len(title) < 10:
-            return None
-
-        # Follow redirect to get actual URL
-        actual_url = follow_google_news_redirect(link)
-        if not actual_url:
-            return None
-
-        # Extract article content
-        content = extract_article_content(actual_url, lang)
-        if not content:
-            return None
-
-        # Check if tech-related
-        if not is_tech_related(title, content, lang):
-            return None
-
-        return {
-            'title': title,
-            'content': content,
-            'url': actual_url
-        }
+def clean_title(title: str, lang: str) -> str:
+    """Drop the ' - Source' suffix, strip HTML and normalize a feed title."""
+    return normalize_text(title.split(' - ')[0], lang, html=True)
 
-    except Exception as e:
-        return None
 
+async def fetch_single_article(engine: FetchEngine, entry: Dict, lang: str,
+                               bodies: Optional[NearDuplicateFilter] = None,
+                               resolver: Optional[UrlResolver] = None,
+                               history: Optional[DomainHistory] = None,
+                               rank: Optional[float] = None) -> Optional[Dict]:
+    """
+    Fetch a single article (runs concurrently with the others).
 
-def fetch_full_articles(lang: str, count: int = ARTICLE_COUNT) -> List[Dict]:
-    """Fetch full article content from multiple RSS feeds with parallel processing."""
+    history receives the outcome under entry_domain(entry), the key the entry
+    was ranked by (not the host it redirected to); rank is the entry's
+    pre-fetch priority (kept in the run report).
+    """
+    record = {'lang': lang}
+    if rank is not None:
+        record['priority'] = round(rank, 2)
+    start = time.perf_counter()
+    try:
+        article, record['outcome'] = await _fetch_single_article(
+            engine, entry, lang, bodies, resolver or UrlResolver(engine), record)
+        return article
+    except asyncio.CancelledError:
+        # Still in flight when the target was reached
+        record['outcome'] = 'cancelled'
+        raise
+    except Exception as e:
+        record['outcome'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"[:200]
+        return None
+    finally:
+        record['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        if history is not None:
+            history.record(entry_domain(entry), record['outcome'])
+        if engine.report:
+            engine.report.article(record)
+
+
+async def _fetch_single_article(engine: FetchEngine, entry: Dict, lang: str,
+                                bodies: Optional[NearDuplicateFilter], resolver: UrlResolver,
+                                record: Dict):
+    """fetch_single_article's steps; returns (article or None, outcome)."""
+    title = entry.get('title', '')
+    link = entry.get('link', '')
+
+    if not title or not link:
+        return None, 'missing_fields'
+
+    title = clean_title(title, lang)
+    record['title'] = title
+
+    if len(title) < 10:
+        return None, 'short_title'
+
+    # Publisher URL: decoded from the entry when possible, otherwise by following the redirect
+    timing = {}
+    actual_url, record['url_source'] = await resolver.resolve(entry, timing)
+    if timing:
+        record['redirect_ms'] = timing
+    if not actual_url:
+        return None, 'redirect_failed'
+    record['url'] = actual_url
+    record['host'] = urlparse(actual_url).netloc.lower()
+
+    # Extract article content
+    content = await extract_article_content(engine, actual_url, lang, record)
+    if not content:
+        return None, record.pop('reason', 'no_content')
+    record['chars'] = len(content)
+
+    # Check if tech-related
+    start = time.perf_counter()
+    tech = is_tech_related(title, content, lang)
+    record['classify_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    if not tech:
+        return None, 'not_tech'
+
+    # Same story already collected under another URL (or on a previous day)
+    if bodies is not None:
+        duplicate = bodies.check(content)
+        if duplicate:
+            return None, f'duplicate_body_{duplicate}'
+
+    return {
+        'title': title,
+        'content': content,
+        'url': actual_url
+    }, 'accepted'
+
+
+def get_feed_urls(lang: str) -> List[str]:
+    """RSS feed URLs for a language."""
     feed_urls = RSS_FEEDS.get(lang, [])
     if not feed_urls:
         raise ValueError(f"Unknown language: {lang}")
@@ -247,80 +391,159 @@ def fetch_full_articles(lang: str, count: int = ARTICLE_COUNT) -> List[Dict]:
     # Convert single URL to list for backward compatibility
     if isinstance(feed_urls, str):
         feed_urls = [feed_urls]
+    return feed_urls
 
-    print(f"  Fetching from {len(feed_urls)} RSS feeds...")
 
-    # Collect all entries from all feeds
-    all_entries = []
-    for feed_url in feed_urls:
-        try:
-            feed = feedparser.parse(feed_url)
-            all_entries.extend(feed.entries)
-            print(f"    Found {len(feed.entries)} entries")
-        except Exception as e:
-            print(f"    ⚠ Feed error: {e}")
-            continue
+async def fetch_feed_snapshot(engine: FetchEngine, langs=('zh', 'en')) -> Dict[str, list]:
+    """
+    Download and parse every feed of every language once, concurrently.
 
-    print(f"  Total entries collected: {len(all_entries)}")
-    print(f"  Processing up to {MAX_ATTEMPTS} articles to get {count} tech articles...")
+    Returns {lang: [parsed feed or exception, ...]} in feed order; titles and
+    articles both read from this snapshot instead of fetching the feeds again.
+    """
+    urls = {lang: get_feed_urls(lang) for lang in langs}
+    unique = list(dict.fromkeys(url for lang_urls in urls.values() for url in lang_urls))
+    with timed(engine, 'feeds'):
+        parsed = dict(zip(unique, await engine.fetch_feeds(unique)))
+    return {lang: [parsed[url] for url in lang_urls] for lang, lang_urls in urls.items()}
 
-    # Limit to MAX_ATTEMPTS
-    entries_to_process = all_entries[:MAX_ATTEMPTS]
-
-    # Use ThreadPoolExecutor for parallel fetching
-    articles = []
-    completed = 0
-
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        # Submit all tasks
-        future_to_entry = {
-            executor.submit(fetch_single_article, entry, lang): entry
-            for entry in entries_to_process
-        }
-
-        # Process completed tasks
-        for future in as_completed(future_to_entry):
-            completed += 1
-            if len(articles) >= count:
-                # Cancel remaining tasks
-                for f in future_to_entry:
-                    f.cancel()
-                break
 
-            try:
-                result = future.result()
-                if result:
-                    articles.append(result)
-                    print(f"    ✓ [{len(articles)}/{count}] {result['title'][:50]}... ({len(result['content'])} chars)")
-            except Exception as e:
-                pass
+def feed_entries(feeds: list, lang: str) -> List[Dict]:
+    """Entries of a language's parsed feeds in feed order (failed feeds are skipped)."""
+    all_entries = []
+    for feed in feeds:
+        if isinstance(feed, Exception):
+            print(f"    ⚠ {lang} feed error: {feed}")
+            continue
+        all_entries.extend(feed.entries)
+        print(f"    {lang}: found {len(feed.entries)} entries")
+    return all_entries
 
-            # Progress update every 20 articles
-            if completed % 20 == 0:
-                print(f"    Progress: {completed}/{len(entries_to_process)} processed, {len(articles)} tech articles found")
 
-    print(f"  Final: {len(articles)} tech articles collected")
-    return articles[:count]
+async def fetch_feed_entries(engine: FetchEngine, feed_urls: List[str], lang: str = '') -> List[Dict]:
+    """Fetch all feeds concurrently and return their entries in feed order."""
+    return feed_entries(await engine.fetch_feeds(feed_urls), lang)
 
 
-def fetch_news_titles(lang: str, count: int = NEWS_COUNT) -> List[str]:
-    """Fetch and clean news titles from RSS feeds."""
-    feed_urls = RSS_FEEDS.get(lang, [])
-    if not feed_urls:
-        raise ValueError(f"Unknown language: {lang}")
-
-    # Convert single URL to list for backward compatibility
-    if isinstance(feed_urls, str):
-        feed_urls = [feed_urls]
+def dedupe_entries(entries: List[Dict], lang: str, titles: NearDuplicateFilter) -> List[Dict]:
+    """Drop entries whose title repeats an earlier entry or a previous day's article."""
+    unique = []
+    for entry in entries:
+        title = clean_title(entry.get('title', ''), lang)
+        if title and titles.check(title):
+            continue
+        unique.append(entry)
+    return unique
+
+
+async def fetch_full_articles(engine: FetchEngine, lang: str, count: int = ARTICLE_COUNT,
+                              feed_urls: Optional[List[str]] = None,
+                              store: Optional[FingerprintStore] = None,
+                              feeds: Optional[list] = None,
+                              history: Optional[DomainHistory] = None) -> List[Dict]:
+    """
+    Fetch full article content from multiple RSS feeds concurrently.
+
+    feeds are already parsed feeds (from fetch_feed_snapshot); without them
+    the language's feeds are fetched here. history holds the per-domain
+    acceptance rates used to rank entries (and is updated with the results).
+    """
+    if feeds is None:
+        feed_urls = feed_urls or get_feed_urls(lang)
+        print(f"  Fetching from {len(feed_urls)} RSS feeds...")
+        with timed(engine, f'feeds_{lang}'):
+            all_entries = await fetch_feed_entries(engine, feed_urls, lang)
+    else:
+        all_entries = feed_entries(feeds, lang)
+
+    print(f"  {lang}: total entries collected: {len(all_entries)}")
+
+    # Near-duplicate stories are dropped by title before any fetch, by body after extraction
+    titles = title_filter(lang, store.history(f'article_titles_{lang}') if store else ())
+    bodies = body_filter(lang, store.history(f'bodies_{lang}') if store else ())
+    with timed(engine, f'dedupe_{lang}'):
+        all_entries = dedupe_entries(all_entries, lang, titles)
+    if engine.report:
+        engine.report.count(f'duplicate_titles_{lang}', titles.duplicates)
+    print(f"  {lang}: duplicate titles skipped: {titles.stats['run']} repeated across feeds, "
+          f"{titles.stats['history']} seen on previous days")
+
+    print(f"  {lang}: processing up to {MAX_ATTEMPTS} articles to get {count} tech articles...")
+    resolver = UrlResolver(engine)
+
+    # Most promising entries first; hopeless ones are not fetched at all
+    if PRIORITIZE_FETCHES:
+        with timed(engine, f'rank_{lang}'):
+            ranked, skipped = rank_entries(all_entries, lang, history)
+        print(f"  {lang}: {skipped} low-priority entries skipped before fetching")
+    else:
+        ranked, skipped = [(None, entry) for entry in all_entries], 0
 
+    # Limit to MAX_ATTEMPTS
+    entries_to_process = ranked[:MAX_ATTEMPTS]
+
+    def report(result, stats):
+        if result:
+            print(f"    ✓ {lang} [{stats.useful}/{count}] {result['title'][:50]}... ({len(result['content'])} chars)")
+
+        # Progress update every 20 articles
+        if stats.completed % 20 == 0:
+            print(f"    {lang} progress: {stats.completed}/{len(entries_to_process)} processed, "
+                  f"{stats.useful} tech articles found")
+
+    # Entries are dispatched only as workers free up; stops once count is reached
+    with timed(engine, f'articles_{lang}'):
+        articles, stats = await gather_until(
+            entries_to_process,
+            lambda item: fetch_single_article(engine, item[1], lang, bodies, resolver, history, item[0]),
+            target=count,
+            concurrency=ARTICLE_CONCURRENCY,
+            on_complete=report,
+        )
+    if engine.report:
+        engine.report.count(f'redirects_avoided_{lang}', resolver.avoided)
+        engine.report.count(f'redirects_followed_{lang}', resolver.stats['network'])
+        engine.report.count(f'skipped_low_priority_{lang}', skipped)
+        engine.report.count(f'dispatched_{lang}', stats.dispatched)
+        engine.report.count(f'useful_{lang}', stats.useful)
+
+    articles = articles[:count]
+    if store:
+        store.record(f'article_titles_{lang}', titles.encoded(a['title'] for a in articles))
+        store.record(f'bodies_{lang}', bodies.encoded(a['content'] for a in articles))
+
+    print(f"  {lang} fetches: {stats.summary()}")
+    print(f"  {lang} URLs: {resolver.summary()}")
+    print(f"  {lang} dedup: {titles.duplicates} fetches avoided by title, "
+          f"{bodies.duplicates} near-duplicate bodies dropped")
+    print(f"  {lang} final: {len(articles)} tech articles collected")
+    return articles
+
+
+async def fetch_news_titles(engine: FetchEngine, lang: str, count: int = NEWS_COUNT,
+                            feed_urls: Optional[List[str]] = None,
+                            store: Optional[FingerprintStore] = None,
+                            feeds: Optional[list] = None) -> List[str]:
+    """
+    Fetch and clean news titles from RSS feeds (near-duplicates are skipped).
+
+    feeds are already parsed feeds (from fetch_feed_snapshot); without them
+    the language's feeds are fetched here.
+    """
     titles = []
+    seen = title_filter(lang, store.history(f'titles_{lang}') if store else ())
 
     try:
-        for feed_url in feed_urls:
+        if feeds is None:
+            feeds = await engine.fetch_feeds(feed_urls or get_feed_urls(lang))
+
+        for feed in feeds:
             if len(titles) >= count:
                 break
 
-            feed = feedparser.parse(feed_url)
+            if isinstance(feed, Exception):
+                print(f"Error fetching {lang} feed: {feed}")
+                continue
 
             for entry in feed.entries:
                 if len(titles) >= count:
@@ -330,21 +553,18 @@ def fetch_news_titles(lang: str, count: int = NEWS_COUNT) -> List[str]:
                 if not title:
                     continue
 
-                title = strip_html(title)
-                title = title.split(' - ')[0].strip()
-
-                if lang == 'zh':
-                    title = normalize_punctuation(title)
-
-                title = clean_whitespace(title)
+                title = clean_title(title, lang)
 
                 # Basic tech filtering for titles
-                keywords = TECH_KEYWORDS_ZH if lang == 'zh' else TECH_KEYWORDS_EN
-                has_tech_keyword = any(keyword.lower() in title.lower() for keyword in keywords)
+                has_tech_keyword = tech_matcher(lang).contains_any(title)
 
-                if len(title) >= 15 and has_tech_keyword:
+                if len(title) >= 15 and has_tech_keyword and not seen.check(title):
                     titles.append(title)
 
+        if seen.duplicates:
+            print(f"  {lang}: {seen.duplicates} duplicate titles skipped")
+        if store:
+            store.record(f'titles_{lang}', seen.encoded(titles))
         return titles
 
     except Exception as e:
@@ -352,14 +572,125 @@ def fetch_news_titles(lang: str, count: int = NEWS_COUNT) -> List[str]:
         return []
 
 
-def fetch_daily_news(include_articles: bool = True) -> Dict:
-    """Fetch news for both languages and return as JSON-ready dict."""
+async def gather_news(include_articles: bool = True, engine: Optional[FetchEngine] = None,
+                      use_cache: bool = True, report: Optional[RunReport] = None) -> Dict:
+    """Fetch titles (and optionally articles) for both languages through one engine."""
+    if engine is None:
+        engine = FetchEngine(timeout=REQUEST_TIMEOUT, user_agent=USER_AGENT,
+                             cache=HttpCache(enabled=use_cache), report=report)
+    # Fingerprints of previous days' output, so repeated stories are skipped
+    store = FingerprintStore(enabled=use_cache)
+    # Per-domain acceptance rates from previous runs, for fetch prioritization
+    history = DomainHistory(enabled=use_cache)
+    async with engine:
+        # Every feed is downloaded and parsed once, for both titles and articles
+        print("\n📡 Fetching RSS feeds...")
+        snapshot = await fetch_feed_snapshot(engine)
+
+        print("\n📰 Collecting news titles...")
+        with timed(engine, 'titles'):
+            zh_news, en_news = await asyncio.gather(
+                fetch_news_titles(engine, 'zh', store=store, feeds=snapshot['zh']),
+                fetch_news_titles(engine, 'en', store=store, feeds=snapshot['en']),
+            )
+        gathered = {'zh': zh_news, 'en': en_news}
+
+        if include_articles:
+            # Both languages share the engine's connection pool and run concurrently
+            print("\n📄 Fetching full articles (Chinese and English)...")
+            gathered['articles_zh'], gathered['articles_en'] = await asyncio.gather(
+                fetch_full_articles(engine, 'zh', store=store, feeds=snapshot['zh'], history=history),
+                fetch_full_articles(engine, 'en', store=store, feeds=snapshot['en'], history=history),
+            )
+
+        print(f"\n🌐 Network: {engine.summary()}")
+        if engine.report:
+            print(f"   Timing: {engine.report.summary()}")
+        if engine.cache:
+            print(f"   Cache: {engine.cache.summary()}")
+            engine.cache.close()
+    store.save()
+    history.save()
+    return gathered
+
+
+def load_dictionary(filepath: str = DICTIONARY_FILE) -> Optional[Dictionary]:
+    """Open the packed dictionary for lookups (None if it is missing or unreadable)."""
+    try:
+        return Dictionary(filepath)
+    except (OSError, ValueError) as e:
+        print(f"  ⚠ Dictionary not available: {e}")
+        return None
+
+
+def collect_chinese_chars(news_data: Dict) -> List[str]:
+    """Collect the distinct Chinese characters in all zh titles and articles."""
+    texts = list(news_data.get('zh', []))
+    for article in news_data.get('articles_zh', []):
+        texts.append(article.get('title', ''))
+        texts.append(article.get('content', ''))
+    return sorted(set(CJK_CHAR_RE.findall(''.join(texts))))
+
+
+def build_encoding_bundle(news_data: Dict, dictionary: Dictionary) -> Dict:
+    """
+    Resolve every Chinese character in the day's content against the dictionary.
+
+    Returns a shared table {char: 'zhuyin|cangjie|boshiamy|pinyin'} plus the
+    characters that could not be resolved, so the frontend needs no per-character
+    lookups or network fallbacks for this content.
+    """
+    chars = ''.join(collect_chinese_chars(news_data))
+    columns = [dictionary.encode(chars, field) for field in ENCODING_FIELDS]
+    table = {}
+    unresolved = []
+    for char, *fields in zip(chars, *columns):
+        if fields[0] is None:
+            unresolved.append(char)
+        else:
+            table[char] = ENCODING_SEP.join(fields)
+
+    return {
+        'fields': ENCODING_FIELDS,
+        'sep': ENCODING_SEP,
+        'table': table,
+        'unresolved': unresolved,
+    }
+
+
+def attach_encodings(news_data: Dict, dictionary_file: str = DICTIONARY_FILE) -> Dict:
+    """Embed the encoding bundle in news_data (skipped if the dictionary is missing)."""
+    dictionary = load_dictionary(dictionary_file)
+    if dictionary is None:
+        return news_data
+
+    with dictionary:
+        bundle = build_encoding_bundle(news_data, dictionary)
+    news_data['encodings'] = bundle
+
+    print(f"\n🔤 Encodings: {len(bundle['table'])} characters resolved, "
+          f"{len(bundle['unresolved'])} unresolved")
+    if bundle['unresolved']:
+        print(f"  Unresolved: {''.join(bundle['unresolved'])}")
+    return news_data
+
+
+def fetch_daily_news(include_articles: bool = True, report: Optional[RunReport] = None,
+                     engine: Optional[FetchEngine] = None, use_cache: bool = True) -> Dict:
+    """
+    Fetch news for both languages and return as JSON-ready dict.
+
+    engine replaces the default live FetchEngine (e.g. a replay engine from
+    fetch_replay.py); use_cache=False ignores the fetch cache, fingerprint
+    history and domain acceptance rates.
+    """
     today = datetime.now().strftime('%Y-%m-%d')
 
-    # Fetch titles (for sentence mode)
-    print("\n📰 Fetching news titles...")
-    zh_news = fetch_news_titles('zh')
-    en_news = fetch_news_titles('en')
+    # Fetch titles (for sentence mode) and articles (for article mode) concurrently
+    gathered = asyncio.run(gather_news(include_articles, engine=engine, use_cache=use_cache,
+                                       report=report))
+    zh_news = gathered['zh']
+    en_news = gathered['en']
 
     if not zh_news:
         zh_news = [
@@ -395,13 +726,10 @@ def fetch_daily_news(include_articles: bool = True) -> Dict:
         'en': en_news
     }
 
-    # Fetch full articles (for article mode)
+    # Full articles (for article mode)
     if include_articles:
-        print("\n📄 Fetching full articles (Chinese)...")
-        zh_articles = fetch_full_articles('zh')
-
-        print("\n📄 Fetching full articles (English)...")
-        en_articles = fetch_full_articles('en')
+        zh_articles = gathered['articles_zh']
+        en_articles = gathered['articles_en']
 
         # Fallback articles (tech-focused for 2026)
         if not zh_articles or len(zh_articles) < 5:
@@ -464,17 +792,23 @@ def main():
     """Main function: fetch news and save to JSON file."""
     print("🚀 Fetching 2026 technology news...")
     print(f"   Target: {ARTICLE_COUNT} articles per language")
-    print(f"   This may take 10-30 minutes depending on network speed...\n")
+    print("   Requests share one pooled async session...\n")
 
     start_time = time.time()
-    news_data = fetch_daily_news(include_articles=True)
+    report = RunReport()
+    news_data = fetch_daily_news(include_articles=True, report=report)
+    with report.stage('encodings'):
+        attach_encodings(news_data)
     elapsed = time.time() - start_time
 
     output_file = 'daily_news.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(news_data, f, ensure_ascii=False, indent=2)
+    with report.stage('save'):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(news_data, f, ensure_ascii=False, indent=2)
+    report_file = report.write(os.path.join(os.path.dirname(os.path.abspath(output_file)), REPORT_FILE))
 
     print(f"\n✅ Saved to {output_file}")
+    print(f"  Run report: {report_file}")
     print(f"  Date: {news_data['date']}")
     print(f"  Time elapsed: {elapsed:.1f} seconds")
     print(f"  Chinese titles: {len(news_data['zh'])} items")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pre-Fetch Prioritization for Article Candidates
+Scores feed entries before anything is downloaded, so likely tech articles
+are fetched first and hopeless ones not at all.
+
+priority = keyword score of title + summary
+         + DOMAIN_WEIGHT * smoothed acceptance rate of the publisher domain
+
+- Keyword score: the same weighted keyword matcher used on full articles
+- Domain: the publisher host from the entry (decoded Google News link,
+  direct link, or entry.source), without "www.". Outcomes are recorded under
+  the same key, even when the link redirects to another host.
+- Acceptance rate: accepted / fetched for the domain over recent runs,
+  smoothed towards PRIOR_RATE so unseen domains get a neutral score
+- DomainHistory: per-domain counts kept on disk; the counts are halved once
+  a domain reaches MAX_DOMAIN_SAMPLES so the rate follows recent behaviour,
+  and they decay with a half-life of DECAY_HALF_LIFE since the domain was
+  last fetched. A domain whose entries fall below the fetch threshold (and
+  so are no longer fetched) drifts back to PRIOR_RATE and is tried again.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from http_cache import DEFAULT_CACHE_DIR
+from keyword_match import KeywordMatcher
+from news_url import offline_url
+
+DEFAULT_HISTORY_FILE = os.path.join(DEFAULT_CACHE_DIR, 'domains.json')
+
+# Rate assumed for a domain without history, and how many fetches it counts as
+PRIOR_RATE = 0.3
+PRIOR_WEIGHT = 4
+
+# Weight of the domain's acceptance rate relative to one keyword hit
+DOMAIN_WEIGHT = 2.0
+
+# Fetches per domain kept before the counts are halved
+MAX_DOMAIN_SAMPLES = 50
+
+# Counts lose half their weight every 3 days without new fetches. A domain skipped after
+# five straight failures is fetched again about a week later; even one that failed
+# MAX_DOMAIN_SAMPLES times in a row is retried within three weeks.
+DECAY_HALF_LIFE = 3 * 24 * 3600
+
+# Article outcomes that count as a useful fetch / a wasted one (others are ignored:
+# duplicates and cancellations say nothing about the domain)
+ACCEPTED_OUTCOMES = frozenset({'accepted'})
+REJECTED_OUTCOMES = frozenset({'not_tech', 'no_content', 'non_html', 'fetch_failed'})
+
+
+def url_domain(url: str) -> str:
+    """Lower-case host of a URL without a leading 'www.'."""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def entry_domain(entry: Dict) -> str:
+    """Publisher host of a feed entry, or '' when it cannot be told without a fetch."""
+    url, _ = offline_url(entry)
+    if url:
+        return url_domain(url)
+    source = entry.get('source') or {}
+    return url_domain(source['href']) if source.get('href') else ''
+
+
+class DomainHistory:
+    """Per-domain fetched/accepted counts from previous runs."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_FILE, enabled: bool = True,
+                 now: Optional[float] = None):
+        self.path = path
+        self.enabled = enabled
+        # One timestamp per run, so every entry of the run is scored alike
+        self.now = time.time() if now is None else now
+        self.domains: Dict[str, Dict[str, float]] = {}
+        if enabled:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.domains = json.load(f).get('domains', {})
+            except (OSError, ValueError):
+                self.domains = {}
+
+    def _decayed(self, counts: Dict[str, float]) -> Tuple[float, float]:
+        """(fetched, accepted) weighted by the time since the domain was last updated."""
+        age = max(0.0, self.now - counts.get('updated', self.now))
+        weight = 0.5 ** (age / DECAY_HALF_LIFE)
+        return counts['fetched'] * weight, counts['accepted'] * weight
+
+    def rate(self, domain: str) -> float:
+        """Smoothed acceptance rate (PRIOR_RATE for unknown domains, and the limit as counts decay)."""
+        counts = self.domains.get(domain)
+        if not counts:
+            return PRIOR_RATE
+        fetched, accepted = self._decayed(counts)
+        return (accepted + PRIOR_RATE * PRIOR_WEIGHT) / (fetched + PRIOR_WEIGHT)
+
+    def record(self, domain: str, outcome: str):
+        """Count one finished article for the domain (outcomes outside both sets are ignored)."""
+        if not domain or outcome not in ACCEPTED_OUTCOMES and outcome not in REJECTED_OUTCOMES:
+            return
+        counts = self.domains.setdefault(domain, {'fetched': 0, 'accepted': 0})
+        fetched, accepted = self._decayed(counts)
+        counts['fetched'] = fetched + 1
+        counts['accepted'] = accepted + (outcome in ACCEPTED_OUTCOMES)
+        counts['updated'] = self.now
+        if counts['fetched'] >= MAX_DOMAIN_SAMPLES:
+            counts['fetched'] /= 2
+            counts['accepted'] /= 2
+
+    def save(self):
+        if not self.enabled:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'domains': self.domains}, f)
+
+
+def priority(text: str, domain: str, matcher: KeywordMatcher,
+             history: Optional[DomainHistory] = None) -> float:
+    """Pre-fetch priority of an entry from its title/summary text and publisher domain."""
+    _, score = matcher.classify(text)
+    rate = history.rate(domain) if history is not None else PRIOR_RATE
+    return score + DOMAIN_WEIGHT * rate
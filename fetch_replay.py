@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Record / Replay for the News Pipeline
+Captures every response fetch_news.py receives (feeds, redirect hops, article
+HTML) into a fixture archive, and replays the archive from a local stub
+server so the pipeline can be measured offline and reproducibly.
+
+- FixtureArchive: directory with manifest.json (status and headers per URL)
+  and gzip'd bodies under bodies/
+- RecordingEngine: a live FetchEngine that also writes what it receives to an
+  archive. Article pages are read to the byte cap even when the extractor
+  stops early, so replays with a different budget still have the full page.
+- ReplayServer: aiohttp server in a child process serving the archive, with
+  injected latency and failure rate
+- ReplayEngine: FetchEngine whose requests go to the stub server. Every host
+  resolves to the loopback address, so the connection pool still keys its
+  per-host limits on the original hosts.
+
+Usage:
+    python3 fetch_replay.py record [--out DIR]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import socket
+import time
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+import aiohttp
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from yarl import URL
+
+from fetch_engine import FetchEngine, StreamResult
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURE_DIR = os.path.join(SCRIPT_DIR, 'benchmarks', 'fixtures', 'news')
+
+# Response headers worth replaying
+KEPT_HEADERS = ('Content-Type', 'Location', 'ETag', 'Last-Modified')
+
+
+def fixture_key(url) -> str:
+    """Archive key for a URL: host plus raw path and query (scheme and port dropped)."""
+    url = URL(str(url))
+    return f"{(url.host or '').lower()}{url.raw_path_qs}"
+
+
+class FixtureArchive:
+    """Recorded responses keyed by fixture_key()."""
+
+    def __init__(self, path: str = DEFAULT_FIXTURE_DIR):
+        self.path = path
+        self.responses: Dict[str, Dict] = {}
+        self.meta: Dict = {}
+        manifest = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest):
+            with open(manifest, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.responses = data.get('responses', {})
+            self.meta = {k: v for k, v in data.items() if k != 'responses'}
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def get(self, url) -> Optional[Dict]:
+        return self.responses.get(fixture_key(url))
+
+    def add(self, url, status: int, headers=None, body: Optional[bytes] = None):
+        """Record (or update) the response for url; body=None keeps an earlier body."""
+        key = fixture_key(url)
+        entry = self.responses.setdefault(key, {'url': str(url)})
+        entry['status'] = status
+        if headers is not None:
+            entry['headers'] = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+            if 'Location' in entry['headers']:
+                entry['headers']['Location'] = urljoin(str(url), entry['headers']['Location'])
+        if body is not None:
+            name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.gz'
+            os.makedirs(os.path.join(self.path, 'bodies'), exist_ok=True)
+            with gzip.open(os.path.join(self.path, 'bodies', name), 'wb') as f:
+                f.write(body)
+            entry['body'] = name
+
+    def body(self, entry: Dict) -> bytes:
+        if not entry.get('body'):
+            return b''
+        with gzip.open(os.path.join(self.path, 'bodies', entry['body']), 'rb') as f:
+            return f.read()
+
+    def save(self, **meta):
+        self.meta.update(meta)
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({**self.meta, 'responses': self.responses}, f, ensure_ascii=False, indent=1)
+
+
+class RecordingEngine(FetchEngine):
+    """Live FetchEngine that writes every response it receives to an archive."""
+
+    def __init__(self, archive: FixtureArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def _make_trace_config(self) -> aiohttp.TraceConfig:
+        trace = super()._make_trace_config()
+        trace.on_request_redirect.append(self._on_response)
+        trace.on_request_end.append(self._on_response)
+        return trace
+
+    async def _on_response(self, session, context, params):
+        self.archive.add(params.url, params.response.status, params.response.headers)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None):
+        result = await super().get(url, headers)
+        # A 304 has no body to replay (recording runs without the fetch cache anyway)
+        if result.status != 304:
+            self.archive.add(result.url, result.status, body=result.body)
+        return result
+
+    async def stream(self, url, consume, max_bytes, content_types=None, **kwargs) -> StreamResult:
+        chunks = []
+        stopped = False
+
+        def record(chunk: bytes) -> bool:
+            nonlocal stopped
+            chunks.append(chunk)
+            if not stopped:
+                stopped = bool(consume(chunk))
+            return False
+
+        result = await super().stream(url, record, max_bytes, content_types, **kwargs)
+        self.archive.add(result.url, result.status, body=b''.join(chunks))
+        return result._replace(stopped=stopped, truncated=result.truncated and not stopped)
+
+
+class _LoopbackResolver(AbstractResolver):
+    """Resolves every host name to 127.0.0.1."""
+
+    async def resolve(self, host: str, port: int = 0, family=socket.AF_INET):
+        return [{'hostname': host, 'host': '127.0.0.1', 'port': port, 'family': socket.AF_INET,
+                 'proto': 0, 'flags': socket.AI_NUMERICHOST}]
+
+    async def close(self):
+        pass
+
+
+class ReplayEngine(FetchEngine):
+    """FetchEngine that sends every request to a ReplayServer on `port`."""
+
+    def __init__(self, archive: FixtureArchive, port: int, **kwargs):
+        kwargs.setdefault('rate', 0)
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.port = port
+
+    def _make_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                    resolver=_LoopbackResolver())
+
+    def _request_url(self, url: str) -> str:
+        return str(URL(url).with_scheme('http').with_port(self.port))
+
+    def _response_url(self, url: str) -> str:
+        entry = self.archive.get(url)
+        return entry['url'] if entry else url
+
+
+def _replay_app(archive: FixtureArchive, port: int, latency_ms: float, failure_rate: float,
+                seed: int) -> web.Application:
+    rng = random.Random(seed)
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        # Latency is drawn uniformly from 0.5x to 1.5x the mean
+        if latency_ms:
+            await asyncio.sleep(latency_ms * rng.uniform(0.5, 1.5) / 1000)
+        if failure_rate and rng.random() < failure_rate:
+            return web.Response(status=503, text='injected failure')
+        entry = archive.responses.get(f"{request.host.split(':')[0].lower()}{request.raw_path}")
+        if entry is None:
+            return web.Response(status=404, text='not recorded')
+        headers = dict(entry.get('headers', {}))
+        if 'Location' in headers:
+            headers['Location'] = str(URL(headers['Location']).with_scheme('http').with_port(port))
+        headers.pop('Content-Type', None)
+        body = archive.body(entry)
+        content_type = entry.get('headers', {}).get('Content-Type')
+        response = web.Response(status=entry['status'], headers=headers, body=body)
+        if content_type:
+            response.headers['Content-Type'] = content_type
+        return response
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    return app
+
+
+def _serve(path: str, latency_ms: float, failure_rate: float, seed: int, ready):
+    archive = FixtureArchive(path)
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+
+    async def main():
+        runner = web.AppRunner(_replay_app(archive, port, latency_ms, failure_rate, seed),
+                               access_log=None)
+        await runner.setup()
+        await web.SockSite(runner, sock).start()
+        ready.put(port)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+class ReplayServer:
+    """
+    Stub server for an archive, run in a child process so its CPU time does not
+    count against the pipeline being measured. Use as a context manager; `port`
+    is set once it is listening.
+    """
+
+    def __init__(self, path: str = DEFAULT_FIXTURE_DIR, latency_ms: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0):
+        self.args = (path, latency_ms, failure_rate, seed)
+        self.port: Optional[int] = None
+        self._process = None
+
+    def __enter__(self) -> 'ReplayServer':
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(*self.args, ready), daemon=True)
+        self._process.start()
+        self.port = ready.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
+
+
+def record(out_dir: str = DEFAULT_FIXTURE_DIR) -> FixtureArchive:
+    """Run fetch_daily_news against the live sites and save everything it receives."""
+    import fetch_news
+
+    archive = FixtureArchive(out_dir)
+    engine = RecordingEngine(archive, timeout=fetch_news.REQUEST_TIMEOUT, user_agent=fetch_news.USER_AGENT)
+    start = time.time()
+    news_data = fetch_news.fetch_daily_news(include_articles=True, engine=engine, use_cache=False)
+    archive.save(version=1, recorded_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 articles={'zh': len(news_data.get('articles_zh', [])),
+                           'en': len(news_data.get('articles_en', []))})
+    print(f"\n📼 Recorded {len(archive)} responses to {out_dir} in {time.time() - start:.0f}s")
+    return archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record fetch_news.py traffic into a fixture archive")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help="fetch live news and save every response")
+    rec.add_argument('--out', default=DEFAULT_FIXTURE_DIR, help="archive directory")
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.out)
+
+
+if __name__ == '__main__':
+    main()
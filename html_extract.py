@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Article Text Extraction Backends
+Pluggable replacements for the BeautifulSoup(html.parser) pass in fetch_news.py.
+
+Every backend implements the same rule:
+1. Drop UNWANTED_TAGS and everything inside them.
+2. For each CONTENT_SELECTORS entry in order, take the first matching element
+   and join the text of its non-empty <p> descendants; stop at the first one
+   longer than MIN_SELECTOR_CONTENT characters (otherwise the last selector
+   that had any <p> wins).
+3. If nothing was found, join every <p> longer than MIN_FALLBACK_PARAGRAPH.
+
+Backends:
+- selectolax: C parser (Lexbor), used when installed
+- lxml:       C parser (libxml2), used when installed
+- stream:     html.parser driven directly; collects paragraphs in one pass and
+              stops reading once the winning container exceeds the text budget
+- bs4:        the original BeautifulSoup implementation, kept as the reference
+
+IncrementalExtractor runs the stream backend on a page as it downloads. The
+page is tokenized by libxml2 (lxml's feed parser driving the same handlers)
+when lxml is installed, by html.parser otherwise. selectolax has no
+incremental API, so it is only used for whole pages.
+
+Backends take an optional `measure(text) -> int`, the length of a paragraph
+after the caller's normalization; the stream backend uses it to decide when
+the budget is met (other backends read the whole page and ignore it).
+"""
+
+import codecs
+import importlib.util
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+# Elements removed before looking for content
+UNWANTED_TAGS = ('script', 'style', 'nav', 'header', 'footer',
+                 'aside', 'iframe', 'noscript', 'form')
+
+# Common article content selectors, in priority order
+CONTENT_SELECTORS = [
+    'article',
+    '[class*="article-content"]',
+    '[class*="article-body"]',
+    '[class*="story-body"]',
+    '[class*="post-content"]',
+    '[class*="entry-content"]',
+    '.content',
+    'main',
+]
+
+# Minimum content length for a selector match to win
+MIN_SELECTOR_CONTENT = 200
+
+# Minimum paragraph length for the whole-page fallback
+MIN_FALLBACK_PARAGRAPH = 50
+
+# Characters kept after whitespace cleanup (fetch_news cuts articles to this)
+CONTENT_BUDGET = 1000
+
+# Backends tried in order when none is requested
+DEFAULT_ORDER = ('selectolax', 'lxml', 'stream')
+
+_CHARSET_RE = re.compile(rb'''<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)''', re.IGNORECASE)
+_XML_ENCODING_RE = re.compile(rb'''^<\?xml[^>]+encoding\s*=\s*["']([\w.:-]+)''')
+
+# Elements that never have an end tag
+_VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                        'link', 'meta', 'param', 'source', 'track', 'wbr'))
+
+
+# Bytes of a page searched for a charset declaration
+SNIFF_BYTES = 4096
+
+
+def sniff_charset(html: bytes) -> Optional[str]:
+    """Encoding declared by a BOM, XML declaration or <meta> tag near the top of the page."""
+    if html.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if html.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return 'utf-16'
+    head = html[:SNIFF_BYTES]
+    match = _XML_ENCODING_RE.match(head) or _CHARSET_RE.search(head)
+    return match.group(1).decode('ascii').lower() if match else None
+
+
+def _head_encoding(head: bytes, declared: Optional[str] = None, final: bool = False) -> str:
+    """
+    Encoding for a page from its first bytes, in decode_html's order: the charset
+    declared by the server, then the page's own declaration, then UTF-8, then
+    Windows-1252. A candidate is skipped if it is unknown or cannot decode head
+    (final=False tolerates a multi-byte character cut off at the end of head).
+    """
+    for encoding in (declared, sniff_charset(head), 'utf-8', 'cp1252'):
+        if not encoding:
+            continue
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(head, final)
+        except (LookupError, UnicodeDecodeError):
+            continue
+        return encoding
+    return 'utf-8'
+
+
+def decode_html(html: bytes) -> str:
+    """Decode a page using its declared charset, then UTF-8, then Windows-1252."""
+    for encoding in (sniff_charset(html), 'utf-8', 'cp1252'):
+        if not encoding:
+            continue
+        try:
+            return html.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return html.decode('utf-8', errors='replace')
+
+
+def _cleaned_length(text: str) -> int:
+    """Length of text after collapsing whitespace (default measure)."""
+    return len(' '.join(text.split()))
+
+
+def _choose_content(containers: List[Optional[List[str]]], paragraphs: List[str]) -> Optional[str]:
+    """
+    Apply the selection rule to per-selector paragraph lists.
+
+    containers[i] is None when selector i matched nothing, otherwise the stripped
+    text of every <p> inside its first match (empty strings included).
+    """
+    content = None
+    for texts in containers:
+        if texts:
+            content = ' '.join(text for text in texts if text)
+            if len(content) > MIN_SELECTOR_CONTENT:
+                return content
+    if not content:
+        content = ' '.join(text for text in paragraphs if len(text) > MIN_FALLBACK_PARAGRAPH)
+    return content
+
+
+# ========================================
+# selectolax
+# ========================================
+
+def extract_selectolax(html: bytes, measure: Optional[Callable[[str], int]] = None) -> Optional[str]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(decode_html(html))
+    tree.strip_tags(list(UNWANTED_TAGS))
+    containers = []
+    for selector in CONTENT_SELECTORS:
+        node = tree.css_first(selector)
+        containers.append(None if node is None else
+                          [p.text(deep=True).strip() for p in node.css('p')])
+    return _choose_content(containers, [p.text(deep=True).strip() for p in tree.css('p')])
+
+
+# ========================================
+# lxml
+# ========================================
+
+def _class_contains(fragment: str) -> str:
+    return f'//*[contains(@class, "{fragment}")]'
+
+
+# CONTENT_SELECTORS as XPath (lxml's CSS support needs the extra cssselect package)
+_LXML_SELECTORS = [
+    '//article',
+    _class_contains('article-content'),
+    _class_contains('article-body'),
+    _class_contains('story-body'),
+    _class_contains('post-content'),
+    _class_contains('entry-content'),
+    '//*[contains(concat(" ", normalize-space(@class), " "), " content ")]',
+    '//main',
+]
+
+
+def extract_lxml(html: bytes, measure: Optional[Callable[[str], int]] = None) -> Optional[str]:
+    import lxml.html
+    from lxml.etree import ParserError
+
+    try:
+        try:
+            parser = lxml.html.HTMLParser(encoding=sniff_charset(html) or 'utf-8')
+            root = lxml.html.document_fromstring(html, parser=parser)
+        except LookupError:
+            # Declared charset unknown to libxml2
+            parser = lxml.html.HTMLParser(encoding='utf-8')
+            root = lxml.html.document_fromstring(decode_html(html).encode('utf-8'), parser=parser)
+    except ParserError:
+        # Empty document
+        return None
+    for element in root.xpath('|'.join(f'//{tag}' for tag in UNWANTED_TAGS)):
+        if element.getparent() is not None:
+            element.drop_tree()
+
+    containers = []
+    for xpath in _LXML_SELECTORS:
+        found = root.xpath(xpath)
+        containers.append([p.text_content().strip() for p in found[0].iter('p')]
+                          if found else None)
+    return _choose_content(containers, [p.text_content().strip() for p in root.iter('p')])
+
+
+# ========================================
+# stream (html.parser, single pass)
+# ========================================
+
+class _Done(Exception):
+    """Raised inside the parser once the result can no longer change."""
+
+
+def _selector_matchers() -> List[Callable[[str, str], bool]]:
+    """CONTENT_SELECTORS as (tag, class attribute) predicates."""
+    matchers = []
+    for selector in CONTENT_SELECTORS:
+        if selector.startswith('[class*="'):
+            fragment = selector[len('[class*="'):-2]
+            matchers.append(lambda tag, cls, f=fragment: f in cls)
+        elif selector.startswith('.'):
+            name = selector[1:]
+            matchers.append(lambda tag, cls, n=name: n in cls.split())
+        else:
+            matchers.append(lambda tag, cls, t=selector: tag == t)
+    return matchers
+
+
+_MATCHERS = _selector_matchers()
+
+
+class _StreamExtractor(HTMLParser):
+    """
+    Collects every <p> and the paragraphs of each selector's first match in one
+    pass over the document, without building a tree.
+    """
+
+    def __init__(self, budget: int, measure: Optional[Callable[[str], int]] = None):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget
+        self.measure = measure or _cleaned_length
+        self.stack = []                      # [tag, selector indexes, paragraph index or None]
+        self.skip_depth = 0
+        self.paragraphs = []                 # stripped text of every <p>, in start-tag order
+        self.buffers = {}                    # open paragraph index -> list of text chunks
+        self.containers = [None] * len(CONTENT_SELECTORS)
+        self.closed = [False] * len(CONTENT_SELECTORS)
+        self.open_selectors = []
+        self.lengths = [0] * len(CONTENT_SELECTORS)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        frame = [tag, (), None]
+        self.stack.append(frame)
+        if self.skip_depth or tag in UNWANTED_TAGS:
+            self.skip_depth += 1
+            return
+
+        cls = ''
+        for name, value in attrs:
+            if name == 'class' and value:
+                cls = value
+                break
+        matched = tuple(i for i, match in enumerate(_MATCHERS)
+                        if self.containers[i] is None and match(tag, cls))
+        if matched:
+            frame[1] = matched
+            for i in matched:
+                self.containers[i] = []
+                self.open_selectors.append(i)
+
+        if tag == 'p':
+            index = len(self.paragraphs)
+            self.paragraphs.append('')
+            self.buffers[index] = []
+            frame[2] = index
+            # find_all('p') on a matched <p> does not include the element itself
+            for i in self.open_selectors:
+                if i not in matched:
+                    self.containers[i].append(index)
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> never has content
+        pass
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > depth:
+            self._close(self.stack.pop())
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            for chunks in self.buffers.values():
+                chunks.append(data)
+
+    def _close(self, frame):
+        tag, matched, index = frame
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        if index is not None:
+            text = ''.join(self.buffers.pop(index)).strip()
+            self.paragraphs[index] = text
+            if text:
+                added = self.measure(text)
+                for i in self.open_selectors:
+                    if i not in matched:
+                        self.lengths[i] += added + 1
+        for i in matched:
+            self.open_selectors.remove(i)
+            self.closed[i] = True
+        if index is not None or matched:
+            self._check_done()
+
+    def _check_done(self):
+        """Stop once the highest-priority undecided selector has won."""
+        for i, indexes in enumerate(self.containers):
+            if indexes is None:
+                return
+            if self.closed[i]:
+                if indexes and self._raw_length(indexes) > MIN_SELECTOR_CONTENT:
+                    raise _Done()
+                continue
+            if self.lengths[i] - 1 > self.budget:
+                raise _Done()
+            return
+
+    def _raw_length(self, indexes: List[int]) -> int:
+        texts = [self.paragraphs[j] for j in indexes if self.paragraphs[j]]
+        return sum(map(len, texts)) + len(texts) - 1
+
+    def result(self) -> Optional[str]:
+        # Paragraphs still open at the end of input keep what they collected
+        for index, chunks in self.buffers.items():
+            self.paragraphs[index] = ''.join(chunks).strip()
+        containers = [None if indexes is None else [self.paragraphs[j] for j in indexes]
+                      for indexes in self.containers]
+        return _choose_content(containers, self.paragraphs)
+
+
+def extract_stream(html: bytes, measure: Optional[Callable[[str], int]] = None,
+                   budget: int = CONTENT_BUDGET) -> Optional[str]:
+    parser = _StreamExtractor(budget, measure)
+    try:
+        parser.feed(decode_html(html))
+        parser.close()
+    except _Done:
+        pass
+    return parser.result()
+
+
+class _LxmlTarget:
+    """lxml parser target forwarding libxml2's events to a _StreamExtractor."""
+
+    def __init__(self, handler: _StreamExtractor):
+        self.handler = handler
+
+    def start(self, tag, attrib):
+        self.handler.handle_starttag(tag, attrib.items())
+
+    def end(self, tag):
+        self.handler.handle_endtag(tag)
+
+    def data(self, data):
+        self.handler.handle_data(data)
+
+    def close(self):
+        return None
+
+
+# Tokenizer for IncrementalExtractor: libxml2 when available (about 2x faster)
+INCREMENTAL_PARSERS = ('lxml', 'html.parser')
+INCREMENTAL_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+
+class IncrementalExtractor:
+    """
+    The stream backend fed chunk by chunk while a page downloads.
+
+    feed() returns True once the result is decided, so the caller can stop
+    reading; close() returns the extracted text. parser is 'lxml' or
+    'html.parser' (default: INCREMENTAL_PARSER). charset is the encoding from
+    the Content-Type header, if any (also settable with set_charset() until
+    the first SNIFF_BYTES have arrived); it takes precedence over the page's
+    own declaration.
+    """
+
+    def __init__(self, budget: int = CONTENT_BUDGET, measure: Optional[Callable[[str], int]] = None,
+                 parser: Optional[str] = None, charset: Optional[str] = None):
+        parser = parser or INCREMENTAL_PARSER
+        if parser not in INCREMENTAL_PARSERS:
+            raise ValueError(f"Unknown incremental parser: {parser}")
+        self._handler = _StreamExtractor(budget, measure)
+        if parser == 'lxml':
+            from lxml import etree
+
+            self._parser = etree.HTMLParser(target=_LxmlTarget(self._handler))
+        else:
+            self._parser = self._handler
+        self.charset = charset
+        self.encoding: Optional[str] = None
+        self._head = bytearray()
+        self._decoder = None
+        self._fed = False
+        self.done = False
+
+    def set_charset(self, charset: Optional[str]):
+        """Content-Type charset of the response (ignored once decoding has started)."""
+        if self._decoder is None:
+            self.charset = charset
+
+    def _start(self, final: bool = False) -> str:
+        """Pick the encoding from the buffered head and return the head decoded."""
+        head = bytes(self._head)
+        self._head = bytearray()
+        self.encoding = _head_encoding(head, self.charset, final)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        return self._decoder.decode(head, final)
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done:
+            return True
+        if self._decoder is None:
+            # The <meta charset> may sit past the first network chunk; sniff once
+            # SNIFF_BYTES are buffered (or at the end of the page)
+            self._head += chunk
+            if len(self._head) < SNIFF_BYTES:
+                return False
+            text = self._start()
+        else:
+            text = self._decoder.decode(chunk)
+        try:
+            if text:
+                self._parser.feed(text)
+                self._fed = True
+        except _Done:
+            self.done = True
+        return self.done
+
+    def close(self) -> Optional[str]:
+        if not self.done:
+            text = self._start(final=True) if self._decoder is None else self._decoder.decode(b'', final=True)
+            try:
+                if text:
+                    self._parser.feed(text)
+                    self._fed = True
+                # Nothing fed: libxml2 rejects an empty document
+                if self._fed:
+                    self._parser.close()
+            except _Done:
+                pass
+        self.done = True
+        return self._handler.result()
+
+
+# ========================================
+# bs4 (reference)
+# ========================================
+
+def extract_bs4(html: bytes, measure: Optional[Callable[[str], int]] = None) -> Optional[str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove unwanted elements
+    for tag in soup.find_all(list(UNWANTED_TAGS)):
+        tag.decompose()
+
+    content = None
+    for selector in CONTENT_SELECTORS:
+        element = soup.select_one(selector)
+        if element:
+            # Get all paragraph text
+            paragraphs = element.find_all('p')
+            if paragraphs:
+                content = ' '.join(p.get_text().strip() for p in paragraphs if p.get_text().strip())
+                if len(content) > MIN_SELECTOR_CONTENT:
+                    break
+
+    if not content:
+        # Fallback: get all paragraphs from body
+        paragraphs = soup.find_all('p')
+        content = ' '.join(p.get_text().strip() for p in paragraphs
+                           if len(p.get_text().strip()) > MIN_FALLBACK_PARAGRAPH)
+    return content
+
+
+BACKENDS: Dict[str, Callable[..., Optional[str]]] = {
+    'selectolax': extract_selectolax,
+    'lxml': extract_lxml,
+    'stream': extract_stream,
+    'bs4': extract_bs4,
+}
+
+_REQUIRES = {'selectolax': 'selectolax', 'lxml': 'lxml', 'bs4': 'bs4'}
+
+
+def available_backends() -> List[str]:
+    """Backends whose parser library is importable."""
+    return [name for name in BACKENDS
+            if name not in _REQUIRES or importlib.util.find_spec(_REQUIRES[name]) is not None]
+
+
+def get_extractor(name: Optional[str] = None) -> Callable[..., Optional[str]]:
+    """Extraction function for a backend name (default: fastest available)."""
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown extractor backend: {name}")
+        return BACKENDS[name]
+    available = available_backends()
+    for candidate in DEFAULT_ORDER:
+        if candidate in available:
+            return BACKENDS[candidate]
+    return extract_stream
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP Cache for the News Pipeline
+On-disk cache (SQLite) that lets repeat runs of fetch_news.py skip work.
+
+- feeds:     ETag / Last-Modified and the last body, for conditional GETs
+- redirects: Google News URL -> final article URL, expiring after a TTL
+- articles:  extracted article text keyed by canonical URL, LRU-evicted
+             once the total size or entry count exceeds its limit; each row
+             carries the version of the code that extracted it (rows from
+             another version are misses), and "no usable article" markers
+             expire after a TTL so transient failures are retried
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIR, '.fetch_cache')
+
+# Redirect resolutions are trusted for a week
+REDIRECT_TTL = 7 * 24 * 3600
+
+# Pages without a usable article are retried after a day
+MISSING_TTL = 24 * 3600
+
+# Article store limits (least recently used entries are evicted first)
+ARTICLE_MAX_BYTES = 32 * 1024 * 1024
+ARTICLE_MAX_ENTRIES = 5000
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'ocid', 'cmpid')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS redirects (
+    url TEXT PRIMARY KEY,
+    final_url TEXT NOT NULL,
+    resolved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_text (
+    url TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    content TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS article_text_lru ON article_text (accessed_at);
+'''
+
+# Marker for "this page was downloaded but had no usable article"
+_MISSING = object()
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for cache keys: lowercase host, no fragment or tracking params."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/',
+                       urlencode(query), ''))
+
+
+class HttpCache:
+    """
+    SQLite-backed cache shared by one fetch run.
+
+    enabled=False turns every lookup into a miss and every store into a no-op.
+    """
+
+    MISSING = _MISSING
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, enabled: bool = True,
+                 redirect_ttl: float = REDIRECT_TTL, max_bytes: int = ARTICLE_MAX_BYTES,
+                 max_entries: int = ARTICLE_MAX_ENTRIES, missing_ttl: float = MISSING_TTL):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.redirect_ttl = redirect_ttl
+        self.missing_ttl = missing_ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stats: Dict[str, int] = {
+            'feed_not_modified': 0, 'feed_fetched': 0,
+            'redirect_hits': 0, 'redirect_misses': 0,
+            'article_hits': 0, 'article_misses': 0, 'article_evicted': 0,
+        }
+        self._db = None
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(cache_dir, 'http_cache.sqlite3'))
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        if self._db is not None:
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> 'HttpCache':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----- feeds -----
+
+    def feed_validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a feed (empty if never fetched)."""
+        if self._db is None:
+            return {}
+        row = self._db.execute('SELECT etag, last_modified FROM feeds WHERE url = ?',
+                               (url,)).fetchone()
+        if row is None:
+            return {}
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def feed_body(self, url: str) -> Optional[bytes]:
+        """Body stored with the feed's validators (used on 304 Not Modified)."""
+        if self._db is None:
+            return None
+        row = self._db.execute('SELECT body FROM feeds WHERE url = ?', (url,)).fetchone()
+        if row is not None:
+            self.stats['feed_not_modified'] += 1
+            return row[0]
+        return None
+
+    def store_feed(self, url: str, headers: Mapping[str, str], body: bytes):
+        self.stats['feed_fetched'] += 1
+        if self._db is None:
+            return
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        self._db.execute('INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)',
+                         (url, etag, last_modified, body, time.time()))
+        self._db.commit()
+
+    # ----- redirects -----
+
+    def get_redirect(self, url: str) -> Optional[str]:
+        """Final URL for a redirecting link, if resolved within the TTL."""
+        row = None
+        if self._db is not None:
+            row = self._db.execute('SELECT final_url, resolved_at FROM redirects WHERE url = ?',
+                                   (url,)).fetchone()
+        if row is None or time.time() - row[1] > self.redirect_ttl:
+            self.stats['redirect_misses'] += 1
+            return None
+        self.stats['redirect_hits'] += 1
+        return row[0]
+
+    def store_redirect(self, url: str, final_url: str):
+        if self._db is None:
+            return
+        self._db.execute('INSERT OR REPLACE INTO redirects VALUES (?, ?, ?)',
+                         (url, final_url, time.time()))
+        self._db.commit()
+
+    # ----- articles -----
+
+    def get_article(self, url: str, version: str = ''):
+        """
+        Cached extracted text for a page, as produced by extraction code version.
+
+        Returns None on a miss (including rows from another version and expired
+        MISSING markers), MISSING if the page was fetched recently but had no
+        usable article, or the text itself.
+        """
+        row = None
+        key = canonical_url(url)
+        now = time.time()
+        if self._db is not None:
+            row = self._db.execute('SELECT content, version, stored_at FROM article_text WHERE url = ?',
+                                   (key,)).fetchone()
+        if row is not None and (row[1] != version or row[0] is None and now - row[2] > self.missing_ttl):
+            self._db.execute('DELETE FROM article_text WHERE url = ?', (key,))
+            row = None
+        if row is None:
+            self.stats['article_misses'] += 1
+            return None
+        self.stats['article_hits'] += 1
+        self._db.execute('UPDATE article_text SET accessed_at = ? WHERE url = ?', (now, key))
+        return _MISSING if row[0] is None else row[0]
+
+    def store_article(self, url: str, content: Optional[str], version: str = ''):
+        """Store extracted text (None records a page with no usable article, for missing_ttl)."""
+        if self._db is None:
+            return
+        size = len(content.encode('utf-8')) if content else 0
+        now = time.time()
+        self._db.execute('INSERT OR REPLACE INTO article_text VALUES (?, ?, ?, ?, ?, ?)',
+                         (canonical_url(url), version, content, size, now, now))
+        self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used articles until both limits are met."""
+        count, total = self._db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM article_text').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evict = []
+        for key, size in self._db.execute('SELECT url, size FROM article_text ORDER BY accessed_at'):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evict.append((key,))
+            count -= 1
+            total -= size
+        self._db.executemany('DELETE FROM article_text WHERE url = ?', evict)
+        self.stats['article_evicted'] += len(evict)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"feeds {s['feed_not_modified']} not modified / {s['feed_fetched']} fetched, "
+                f"redirects {s['redirect_hits']} hits / {s['redirect_misses']} misses, "
+                f"articles {s['article_hits']} hits / {s['article_misses']} misses"
+                + (f", {s['article_evicted']} evicted" if s['article_evicted'] else ''))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Multi-Keyword Matcher
+Aho-Corasick automaton that finds every keyword in a text in one linear pass,
+so classification cost does not grow with the size of the keyword list.
+
+- Below SCAN_THRESHOLD keywords a per-keyword `in` scan (C string search) is
+  faster than walking the automaton in Python, so small lists use that
+  instead; both paths give the same results
+- Matching is case-insensitive (keywords and text are lowercased once)
+- With word_boundaries=True, ASCII keywords such as "AR" or "app" only match
+  whole words ("are" and "happen" no longer count); a plural "s"/"es" suffix
+  is still accepted ("chips", "robots"). CJK keywords match anywhere.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Keyword count from which the automaton beats the per-keyword scan
+# (bench_keywords: about even at 100 keywords on ~100-character texts)
+SCAN_THRESHOLD = 100
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class KeywordMatcher:
+    """Precompiled matcher for a fixed keyword list with optional per-keyword weights."""
+
+    def __init__(self, keywords: Iterable[str], weights: Optional[Dict[str, float]] = None,
+                 word_boundaries: bool = False, scan: Optional[bool] = None):
+        """scan=None picks the per-keyword scan below SCAN_THRESHOLD keywords, the automaton above."""
+        weights = {k.lower(): w for k, w in (weights or {}).items()}
+        self.keywords: List[str] = []
+        self.weights: List[float] = []
+        self.bounded: List[bool] = []
+        self.word_boundaries = word_boundaries
+
+        seen = {}
+        for keyword in keywords:
+            key = keyword.lower()
+            if not key or key in seen:
+                continue
+            seen[key] = len(self.keywords)
+            self.keywords.append(keyword)
+            self.weights.append(weights.get(key, 1.0))
+            self.bounded.append(word_boundaries and key.isascii()
+                                and _is_word_char(key[0]) and _is_word_char(key[-1]))
+        self._lengths = [len(k) for k in self.keywords]
+        self._lowered = list(seen)
+        self.scan = len(self.keywords) < SCAN_THRESHOLD if scan is None else scan
+        if self.scan:
+            self._iter_hits = self._scan_hits
+        else:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        # goto[state] maps a character to the next state; out[state] lists keyword ids
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[int]] = [[]]
+        for kid, key in enumerate(self._lowered):
+            state = 0
+            for char in key:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(kid)
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        goto, out = self._goto, self._out
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._fail = fail
+
+    def _iter_hits(self, text: str):
+        """Yield (keyword id, end index) for every occurrence, honouring boundaries."""
+        goto, fail, out = self._goto, self._fail, self._out
+        bounded, lengths = self.bounded, self._lengths
+        root = goto[0]
+        text = text.lower()
+        size = len(text)
+        state = 0
+        for i, char in enumerate(text):
+            if state:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+            else:
+                state = root.get(char, 0)
+                if not state:
+                    continue
+            hits = out[state]
+            if hits:
+                for kid in hits:
+                    if bounded[kid] and not self._at_boundary(text, size, i + 1 - lengths[kid], i + 1):
+                        continue
+                    yield kid, i + 1
+
+    def _scan_hits(self, text: str):
+        """Like _iter_hits, but searches for each keyword in turn (first valid occurrence only)."""
+        bounded, lengths = self.bounded, self._lengths
+        text = text.lower()
+        for kid in [kid for kid, key in enumerate(self._lowered) if key in text]:
+            if not bounded[kid]:
+                yield kid, text.find(self._lowered[kid]) + lengths[kid]
+                continue
+            key, size = self._lowered[kid], len(text)
+            start = text.find(key)
+            while start >= 0 and not self._at_boundary(text, size, start, start + lengths[kid]):
+                start = text.find(key, start + 1)
+            if start >= 0:
+                yield kid, start + lengths[kid]
+
+    @staticmethod
+    def _at_boundary(text: str, size: int, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        # Accept a plural suffix: chip -> chips, process -> processes
+        for suffix in ('', 's', 'es'):
+            stop = end + len(suffix)
+            if text.startswith(suffix, end) and (stop >= size or not _is_word_char(text[stop])):
+                return True
+        return False
+
+    def matched(self, text: str) -> Set[str]:
+        """Distinct keywords found in text."""
+        return {self.keywords[kid] for kid, _ in self._iter_hits(text)}
+
+    def classify(self, text: str) -> Tuple[int, float]:
+        """(number of distinct keywords found, sum of their weights) in one pass."""
+        found = {kid for kid, _ in self._iter_hits(text)}
+        return len(found), sum(self.weights[kid] for kid in found)
+
+    def count(self, text: str) -> int:
+        """Number of distinct keywords found in text."""
+        return self.classify(text)[0]
+
+    def score(self, text: str) -> float:
+        """Sum of the weights of the distinct keywords found in text."""
+        return self.classify(text)[1]
+
+    def contains_any(self, text: str) -> bool:
+        """True at the first keyword hit (stops scanning there)."""
+        for _ in self._iter_hits(text):
+            return True
+        return False
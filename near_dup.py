@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection for News Items
+Fingerprints for titles and article bodies, so the same story syndicated
+under different URLs or feeds is fetched and kept only once.
+
+- Titles: MinHash (64 permutations) with LSH banding; two titles match when
+  their estimated Jaccard similarity reaches TITLE_MIN_SIMILARITY. Short
+  titles differ by a few words, which SimHash handles poorly.
+- Bodies: 64-bit SimHash; two bodies match within BODY_MAX_DISTANCE bits,
+  found by splitting fingerprints into max_distance + 1 bands (fingerprints
+  that close always share at least one band exactly).
+- Features: CJK character bigrams plus lowercased ASCII words (zh); word
+  unigrams and bigrams (en)
+- FingerprintStore: rolling per-day fingerprints of published items, kept on
+  disk so stories already used on previous days are skipped
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from http_cache import DEFAULT_CACHE_DIR
+
+# Title matching: estimated Jaccard similarity of the shingle sets
+TITLE_MIN_SIMILARITY = 0.7
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+
+# Body matching: Hamming distance between 64-bit SimHash fingerprints
+SIMHASH_BITS = 64
+BODY_MAX_DISTANCE = 6
+
+# Days of published fingerprints kept for cross-day checks
+HISTORY_DAYS = 7
+
+DEFAULT_STORE_FILE = os.path.join(DEFAULT_CACHE_DIR, 'fingerprints.json')
+
+_CJK_RUN = re.compile(r'[一-鿿]+')
+_WORD = re.compile(r'[0-9a-z]+')
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20260301)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+_MINHASH_FORMAT = f'>{MINHASH_PERMUTATIONS}I'
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    # Stable across processes (the built-in hash() is salted per run)
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def features(text: str, lang: str) -> List[str]:
+    """Shingles used for fingerprinting."""
+    lowered = text.lower()
+    words = _WORD.findall(lowered)
+    if lang == 'zh':
+        result = words
+        for run in _CJK_RUN.findall(lowered):
+            if len(run) == 1:
+                result.append(run)
+            result.extend(run[i:i + 2] for i in range(len(run) - 1))
+        return result
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+def minhash(text: str, lang: str) -> Optional[Tuple[int, ...]]:
+    """MinHash signature (32-bit values) of a text, or None without features."""
+    hashes = {_feature_hash(f) for f in features(text, lang)}
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) & 0xFFFFFFFF
+                 for a, b in _PERMUTATIONS)
+
+
+def simhash(text: str, lang: str) -> Optional[int]:
+    """64-bit SimHash of a text, or None without features."""
+    hashes = [_feature_hash(f) for f in features(text, lang)]
+    if not hashes:
+        return None
+    counts = [0] * SIMHASH_BITS
+    for h in hashes:
+        for bit in range(SIMHASH_BITS):
+            if h >> bit & 1:
+                counts[bit] += 1
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class _BandedIndex:
+    """Fingerprints bucketed by band; candidates sharing a band are verified."""
+
+    def __init__(self, fingerprints: Iterable = ()):
+        self._buckets: List[Dict] = [{} for _ in range(self.bands)]
+        self._size = 0
+        for fingerprint in fingerprints:
+            self.add(fingerprint)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def find(self, fingerprint):
+        """A stored near-duplicate of fingerprint, or None."""
+        for buckets, key in zip(self._buckets, self.band_keys(fingerprint)):
+            for candidate in buckets.get(key, ()):
+                if self.matches(candidate, fingerprint):
+                    return candidate
+        return None
+
+    def add(self, fingerprint):
+        for buckets, key in zip(self._buckets, self.band_keys(fingerprint)):
+            buckets.setdefault(key, []).append(fingerprint)
+        self._size += 1
+
+
+class SimHashIndex(_BandedIndex):
+    """SimHash fingerprints within max_distance bits of each other match."""
+
+    def __init__(self, max_distance: int = BODY_MAX_DISTANCE, fingerprints: Iterable[int] = ()):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        width = SIMHASH_BITS // self.bands
+        self._ranges = [(i * width, SIMHASH_BITS if i == self.bands - 1 else (i + 1) * width)
+                        for i in range(self.bands)]
+        super().__init__(fingerprints)
+
+    def band_keys(self, fingerprint: int):
+        return [fingerprint >> start & ((1 << (stop - start)) - 1) for start, stop in self._ranges]
+
+    def matches(self, a: int, b: int) -> bool:
+        return hamming(a, b) <= self.max_distance
+
+    @staticmethod
+    def encode(fingerprint: int) -> str:
+        return f'{fingerprint:016x}'
+
+    @staticmethod
+    def decode(value: str) -> int:
+        return int(value, 16)
+
+
+class MinHashIndex(_BandedIndex):
+    """MinHash signatures with estimated Jaccard similarity >= min_similarity match."""
+
+    bands = MINHASH_BANDS
+
+    def __init__(self, min_similarity: float = TITLE_MIN_SIMILARITY,
+                 fingerprints: Iterable[Tuple[int, ...]] = ()):
+        self.min_similarity = min_similarity
+        self._rows = MINHASH_PERMUTATIONS // self.bands
+        super().__init__(fingerprints)
+
+    def band_keys(self, signature: Tuple[int, ...]):
+        rows = self._rows
+        return [signature[i * rows:(i + 1) * rows] for i in range(self.bands)]
+
+    def matches(self, a: Tuple[int, ...], b: Tuple[int, ...]) -> bool:
+        return similarity(a, b) >= self.min_similarity
+
+    @staticmethod
+    def encode(signature: Tuple[int, ...]) -> str:
+        return base64.b64encode(struct.pack(_MINHASH_FORMAT, *signature)).decode('ascii')
+
+    @staticmethod
+    def decode(value: str) -> Tuple[int, ...]:
+        return struct.unpack(_MINHASH_FORMAT, base64.b64decode(value))
+
+
+class NearDuplicateFilter:
+    """
+    One stream of items (e.g. zh article titles) checked against earlier items
+    of the same run and against encoded fingerprints from previous days.
+    """
+
+    def __init__(self, fingerprint: Callable[[str], object], index_factory: Callable[[], _BandedIndex],
+                 history: Iterable[str] = ()):
+        self.fingerprint = fingerprint
+        self.seen = index_factory()
+        self.history = index_factory()
+        for value in history:
+            try:
+                self.history.add(self.history.decode(value))
+            except (ValueError, struct.error):
+                continue
+        self.stats = {'unique': 0, 'run': 0, 'history': 0}
+
+    def check(self, text: str) -> Optional[str]:
+        """
+        None if text is new (it is remembered), otherwise where its
+        near-duplicate was seen: 'run' or 'history'.
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is not None:
+            for source, index in (('run', self.seen), ('history', self.history)):
+                if index.find(fingerprint) is not None:
+                    self.stats[source] += 1
+                    return source
+            self.seen.add(fingerprint)
+        self.stats['unique'] += 1
+        return None
+
+    def encoded(self, texts: Iterable[str]) -> List[str]:
+        """Encoded fingerprints of texts, for FingerprintStore.record."""
+        result = []
+        for text in texts:
+            fingerprint = self.fingerprint(text)
+            if fingerprint is not None:
+                result.append(self.seen.encode(fingerprint))
+        return result
+
+    @property
+    def duplicates(self) -> int:
+        return self.stats['run'] + self.stats['history']
+
+
+def title_filter(lang: str, history: Iterable[str] = ()) -> NearDuplicateFilter:
+    return NearDuplicateFilter(lambda text: minhash(text, lang), MinHashIndex, history)
+
+
+def body_filter(lang: str, history: Iterable[str] = ()) -> NearDuplicateFilter:
+    return NearDuplicateFilter(lambda text: simhash(text, lang), SimHashIndex, history)
+
+
+class FingerprintStore:
+    """
+    Encoded fingerprints of published items per day and kind (e.g.
+    'titles_zh', 'bodies_en'), trimmed to the last `days` days.
+
+    Only days before `today` feed the history, so re-running on the same day
+    does not discard that day's own items. enabled=False keeps nothing on disk.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_FILE, days: int = HISTORY_DAYS,
+                 today: Optional[str] = None, enabled: bool = True):
+        self.path = path
+        self.days = days
+        self.today = today or datetime.now().strftime('%Y-%m-%d')
+        self.enabled = enabled
+        self._days: Dict[str, Dict[str, List[str]]] = {}
+        if enabled:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._days = json.load(f).get('days', {})
+            except (OSError, ValueError):
+                self._days = {}
+
+    def _cutoff(self) -> str:
+        start = datetime.strptime(self.today, '%Y-%m-%d') - timedelta(days=self.days)
+        return start.strftime('%Y-%m-%d')
+
+    def history(self, kind: str) -> List[str]:
+        """Fingerprints of `kind` published on previous days within the window."""
+        cutoff = self._cutoff()
+        return [value for day, kinds in sorted(self._days.items()) if cutoff <= day < self.today
+                for value in kinds.get(kind, [])]
+
+    def record(self, kind: str, values: List[str]):
+        """Set today's fingerprints of `kind` (replaces an earlier run of the same day)."""
+        self._days.setdefault(self.today, {})[kind] = values
+
+    def save(self):
+        if not self.enabled:
+            return
+        cutoff = self._cutoff()
+        days = {day: kinds for day, kinds in sorted(self._days.items()) if day >= cutoff}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'days': days}, f)
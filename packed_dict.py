@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Packed Binary Dictionary
+字典的緊湊二進位格式 (dictionary.bin)，可依字碼點直接查詢，不需先解析整份資料
+
+格式（皆為 little-endian，各區段對齊 4 bytes）：
+
+    Header (32 bytes)
+      0   magic       b'TXDB'
+      4   u16         版本 (FORMAT_VERSION)
+      6   u16         欄位數 F (zhuyin, cangjie, boshiamy, pinyin)
+      8   u32         字數 N
+      12  u32         cp_min：最小字碼點
+      16  u32         cp_span：字碼點範圍 (max - min + 1)
+      20  (保留 12 bytes)
+
+    slots   u16[cp_span]   字碼點索引：slots[cp - cp_min] = 列號 + 1（0 表示無此字）
+                           列依字碼點排序，查詢為 O(1)
+
+    F × 欄位區段 {
+      u8   mode           POOLED (0)：去重字串池，refs 指向池中字串
+                          DIRECT (1)：字串池即為每列的值（幾乎不重複的欄位省去 refs）
+      u8   (保留)
+      u16  symbol_count   此欄位使用的符號數（上限 256）
+      u32  count          字串池大小
+      u32  symbols[symbol_count]  符號表（Unicode 字碼點）
+      u16  refs[N]        僅 POOLED 模式
+      u32  offsets[count + 1]
+      u8   data[offsets[count]]   每個符號以 1 byte 的符號表索引儲存
+    }
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+MAGIC = b'TXDB'
+FORMAT_VERSION = 1
+FIELDS = ('zhuyin', 'cangjie', 'boshiamy', 'pinyin')
+
+# 多音字模式下，拼音欄位各讀音之間的分隔符號（build_dict 寫入、dictionary 讀取）
+PINYIN_HETERONYM_SEP = '/'
+
+# 欄位區段模式
+POOLED = 0
+DIRECT = 1
+
+_HEADER = struct.Struct('<4sHHIII12x')
+_FIELD_HEADER = struct.Struct('<BxHI')
+_U16_MAX = 0xFFFF
+_MAX_SYMBOLS = 256
+
+
+def _pad4(buf: bytearray):
+    """補齊至 4 bytes 對齊"""
+    buf.extend(b'\0' * (-len(buf) % 4))
+
+
+def _le_bytes(typecode: str, values) -> bytes:
+    """將整數陣列轉為 little-endian bytes"""
+    arr = array(typecode, values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _le_array(typecode: str, data) -> array:
+    """將 little-endian bytes 轉為整數陣列"""
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def build_pool(values: List[str]) -> Tuple[List[str], List[int]]:
+    """建立去重字串池，回傳 (池內字串, 每個值在池中的索引)；依出現順序編號"""
+    index = {}
+    pool = []
+    refs = []
+    for value in values:
+        i = index.get(value)
+        if i is None:
+            i = len(pool)
+            index[value] = i
+            pool.append(value)
+        refs.append(i)
+    return pool, refs
+
+
+def _pack_field(buf: bytearray, name: str, values: List[str]):
+    """寫入單一欄位區段；不重複值超過一半時改用 DIRECT 模式"""
+    pool, refs = build_pool(values)
+    mode = POOLED if len(pool) * 2 <= len(values) else DIRECT
+    if mode == DIRECT:
+        pool = values
+
+    symbols = sorted(set(''.join(pool)))
+    if len(symbols) > _MAX_SYMBOLS:
+        raise ValueError(f"Too many distinct symbols in {name}: {len(symbols)}")
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    encoded = [bytes(symbol_index[symbol] for symbol in value) for value in pool]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    buf += _FIELD_HEADER.pack(mode, len(symbols), len(pool))
+    buf += _le_bytes('I', [ord(symbol) for symbol in symbols])
+    if mode == POOLED:
+        buf += _le_bytes('H', refs)
+        _pad4(buf)
+    buf += _le_bytes('I', offsets)
+    buf += b''.join(encoded)
+    _pad4(buf)
+
+
+def pack_dictionary(dictionary: list) -> bytes:
+    """
+    將字典 [[char, zhuyin, cangjie, boshiamy, pinyin], ...] 打包為二進位格式
+    列數與字串池大小上限為 65,535，每個欄位的符號數上限為 256。
+    """
+    rows = sorted(dictionary, key=lambda entry: ord(entry[0]))
+    count = len(rows)
+    if count >= _U16_MAX:
+        raise ValueError(f"Too many characters for packed format: {count}")
+
+    codepoints = [ord(entry[0]) for entry in rows]
+    cp_min = codepoints[0] if rows else 0
+    cp_span = (codepoints[-1] - cp_min + 1) if rows else 0
+
+    slots = [0] * cp_span
+    for row, cp in enumerate(codepoints):
+        slots[cp - cp_min] = row + 1
+
+    buf = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, len(FIELDS), count, cp_min, cp_span))
+    buf += _le_bytes('H', slots)
+    _pad4(buf)
+
+    for field_index, name in enumerate(FIELDS):
+        _pack_field(buf, name, [entry[field_index + 1] for entry in rows])
+
+    return bytes(buf)
+
+
+class _Field:
+    """單一欄位區段的索引（字串在查詢時才解碼）"""
+
+    __slots__ = ('refs', 'offsets', 'base', 'symbols', 'memo')
+
+    def __init__(self, refs, offsets, base, symbols):
+        self.refs = refs
+        self.offsets = offsets
+        self.base = base
+        self.symbols = symbols
+        self.memo = {}
+
+
+class PackedDictionary:
+    """
+    dictionary.bin 的唯讀查詢介面
+
+    以 mmap 開啟檔案，只解析索引；字串在查詢時才解碼。
+    """
+
+    def __init__(self, filepath: str):
+        self.path = filepath
+        with open(filepath, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._parse()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PackedDictionary':
+        """由記憶體中的 bytes 建立（不經由檔案）"""
+        obj = cls.__new__(cls)
+        obj.path = None
+        obj._data = data
+        obj._parse()
+        return obj
+
+    def _parse(self):
+        data = self._data
+        magic, version, field_count, count, cp_min, cp_span = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a packed dictionary file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported packed dictionary version: {version}")
+
+        self.fields = FIELDS[:field_count]
+        self.count = count
+        self.cp_min = cp_min
+        self.cp_span = cp_span
+        self._codepoints = None
+
+        pos = _HEADER.size
+        self._slots = _le_array('H', data[pos:pos + 2 * cp_span])
+        pos += 2 * cp_span
+        pos += -pos % 4
+
+        self._fields = []
+        for _ in range(field_count):
+            mode, symbol_count, pool_count = _FIELD_HEADER.unpack_from(data, pos)
+            pos += _FIELD_HEADER.size
+            symbols = [chr(cp) for cp in _le_array('I', data[pos:pos + 4 * symbol_count])]
+            pos += 4 * symbol_count
+
+            refs = None
+            if mode == POOLED:
+                refs = _le_array('H', data[pos:pos + 2 * count])
+                pos += 2 * count
+                pos += -pos % 4
+            elif mode != DIRECT:
+                raise ValueError(f"Unknown field mode: {mode}")
+
+            offsets = _le_array('I', data[pos:pos + 4 * (pool_count + 1)])
+            pos += 4 * (pool_count + 1)
+            self._fields.append(_Field(refs, offsets, pos, symbols))
+            pos += offsets[-1]
+            pos += -pos % 4
+
+    def close(self):
+        """釋放 mmap"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self) -> 'PackedDictionary':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, char: str) -> bool:
+        return self.row_of(char) is not None
+
+    def row_of(self, char: str) -> Optional[int]:
+        """字元的列號，查無此字時回傳 None"""
+        i = ord(char) - self.cp_min
+        if 0 <= i < self.cp_span:
+            slot = self._slots[i]
+            if slot:
+                return slot - 1
+        return None
+
+    def codepoint(self, row: int) -> int:
+        """第 row 列的字碼點（首次呼叫時由 slots 建立排序索引）"""
+        if self._codepoints is None:
+            cps = array('I', bytes(4 * self.count))
+            for i, slot in enumerate(self._slots):
+                if slot:
+                    cps[slot - 1] = self.cp_min + i
+            self._codepoints = cps
+        return self._codepoints[row]
+
+    def field(self, row: int, field_index: int) -> str:
+        """第 row 列、第 field_index 個欄位的值"""
+        field = self._fields[field_index]
+        index = field.refs[row] if field.refs is not None else row
+        value = field.memo.get(index)
+        if value is None:
+            start = field.base + field.offsets[index]
+            end = field.base + field.offsets[index + 1]
+            symbols = field.symbols
+            value = ''.join([symbols[b] for b in self._data[start:end]])
+            field.memo[index] = value
+        return value
+
+    def row(self, row: int) -> list:
+        """取得第 row 列：[char, zhuyin, cangjie, boshiamy, pinyin]"""
+        entry = [chr(self.codepoint(row))]
+        for field_index in range(len(self._fields)):
+            entry.append(self.field(row, field_index))
+        return entry
+
+    def lookup(self, char: str) -> Optional[list]:
+        """依字元查詢，查無此字時回傳 None"""
+        row = self.row_of(char)
+        if row is None:
+            return None
+        entry = [char]
+        for field_index in range(len(self._fields)):
+            entry.append(self.field(row, field_index))
+        return entry
+
+    def __iter__(self) -> Iterator[list]:
+        for row in range(self.count):
+            yield self.row(row)
+
+
+if __name__ == '__main__':
+    packed = PackedDictionary(sys.argv[1])
+    print(f"{packed.path}: {len(packed):,} characters, "
+          f"codepoints U+{packed.cp_min:04X}..U+{packed.cp_min + packed.cp_span - 1:04X}")
+    for char in sys.argv[2:]:
+        print(char, packed.lookup(char))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Run Report for the News Pipeline
+Per-stage timers, counters, per-article records, per-host latency histograms
+and connection-pool utilization for one fetch_news.py run, written as JSON
+lines so runs can be compared and slow or wasteful sites spotted.
+
+Each line has a "type":
+- run:     totals (wall time, counters, outcome counts)
+- stage:   wall and CPU time and call count per pipeline stage (CPU time is
+           process-wide, so it includes other tasks running during the stage)
+- host:    request count, failures, bytes and latency histograms per host
+- pool:    in-flight requests (peak and time-weighted mean) and time spent
+           waiting for a free connection
+- article: one record per article candidate (timings, sizes, outcome reason)
+"""
+
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPORT_FILE = os.path.join(SCRIPT_DIR, 'fetch_report.jsonl')
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket is open)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds) with exact percentiles."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.samples: List[float] = []
+
+    def add(self, ms: float):
+        self.samples.append(ms)
+        for i, bound in enumerate(self.bounds):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict:
+        if not self.samples:
+            return {'count': 0}
+        labels = [f'<={b}' for b in self.bounds] + [f'>{self.bounds[-1]}']
+        return {
+            'count': len(self.samples),
+            'mean': round(sum(self.samples) / len(self.samples), 1),
+            'p50': round(self.percentile(0.5), 1),
+            'p90': round(self.percentile(0.9), 1),
+            'max': round(max(self.samples), 1),
+            'buckets': {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class RunReport:
+    """
+    Collects instrumentation for one run; attach it to FetchEngine(report=...)
+    to get request timings, and call write() at the end.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.stages: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {'seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+        self.counters: Counter = Counter()
+        self.articles: List[Dict] = []
+        self.hosts: Dict[str, Dict] = defaultdict(lambda: {
+            'requests': 0, 'failures': 0, 'bytes': 0,
+            'latency': {name: Histogram() for name in ('queued', 'dns', 'connect', 'ttfb', 'download', 'total')},
+        })
+        # Pool utilization: time-weighted integral of in-flight requests
+        # (pool_limit is set by the FetchEngine the report is attached to)
+        self.pool_limit: Optional[int] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._in_flight_area = 0.0
+        self._in_flight_since = self.started
+
+    # ----- stages and counters -----
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block (wall clock including awaits, and CPU) under a stage name."""
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start, time.process_time() - cpu_start)
+
+    def add_time(self, name: str, seconds: float, cpu_seconds: float = 0.0):
+        stage = self.stages[name]
+        stage['seconds'] += seconds
+        stage['cpu_seconds'] += cpu_seconds
+        stage['calls'] += 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    # ----- requests (called by FetchEngine) -----
+
+    def request_started(self):
+        self._advance_in_flight()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self, url: str, timing: Dict, failed: bool = False):
+        """Record a finished request; timing holds millisecond phases and 'bytes'."""
+        self._advance_in_flight()
+        self.in_flight -= 1
+        host = self.hosts[urlsplit(url).netloc.lower()]
+        host['requests'] += 1
+        host['failures'] += failed
+        host['bytes'] += timing.get('bytes', 0)
+        for name, histogram in host['latency'].items():
+            if name in timing:
+                histogram.add(timing[name])
+
+    def _advance_in_flight(self):
+        now = time.perf_counter()
+        self._in_flight_area += self.in_flight * (now - self._in_flight_since)
+        self._in_flight_since = now
+
+    # ----- articles -----
+
+    def article(self, record: Dict):
+        """Add one article candidate's record (must include an 'outcome')."""
+        self.articles.append(record)
+        self.counters[f"article_{record.get('outcome', 'unknown')}"] += 1
+
+    # ----- output -----
+
+    def lines(self) -> List[Dict]:
+        self._advance_in_flight()
+        elapsed = time.perf_counter() - self.started
+        outcomes = Counter(record.get('outcome', 'unknown') for record in self.articles)
+        result = [{
+            'type': 'run', 'started_at': self.started_at, 'seconds': round(elapsed, 3),
+            'counters': dict(self.counters), 'outcomes': dict(outcomes),
+        }]
+        for name, stage in self.stages.items():
+            result.append({'type': 'stage', 'name': name, 'seconds': round(stage['seconds'], 3),
+                           'cpu_seconds': round(stage['cpu_seconds'], 3), 'calls': stage['calls']})
+        for name, host in sorted(self.hosts.items(), key=lambda item: -item[1]['requests']):
+            result.append({'type': 'host', 'host': name, 'requests': host['requests'],
+                           'failures': host['failures'], 'bytes': host['bytes'],
+                           'latency_ms': {k: h.to_dict() for k, h in host['latency'].items() if h.samples}})
+        mean = self._in_flight_area / elapsed if elapsed > 0 else 0.0
+        queued = Histogram()
+        for host in self.hosts.values():
+            for ms in host['latency']['queued'].samples:
+                queued.add(ms)
+        pool = {'type': 'pool', 'peak_in_flight': self.peak_in_flight,
+                'mean_in_flight': round(mean, 2), 'queued_ms': queued.to_dict()}
+        if self.pool_limit:
+            pool['limit'] = self.pool_limit
+            pool['utilization'] = round(mean / self.pool_limit, 3)
+        result.append(pool)
+        result.extend({'type': 'article', **record} for record in self.articles)
+        return result
+
+    def write(self, path: str = DEFAULT_REPORT_FILE) -> str:
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.lines():
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        return path
+
+    def summary(self) -> str:
+        stages = ', '.join(f"{name} {stage['seconds']:.1f}s"
+                           for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']))
+        return f"stages: {stages}; peak {self.peak_in_flight} requests in flight"
+
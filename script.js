@@ -69,7 +69,147 @@ if (typeof dictionaryData === 'undefined') {
     var dictionaryData = {};
 }
 
-// 載入 dictionary.json 並轉換格式（僅當 dictionaryData 為空時）
+// 二進位字典 (dictionary.bin)：依字碼點 O(1) 查詢，不需先轉換整份資料
+// 格式說明見 packed_dict.py
+let packedDictionary = null;
+const PACKED_FIELDS = ['zhuyin', 'cangjie', 'boshiamy', 'pinyin'];
+
+function parsePackedDictionary(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'TXDB' || view.getUint16(4, true) !== 1) {
+        throw new Error('Unsupported dictionary.bin format');
+    }
+    const fieldCount = view.getUint16(6, true);
+    const count = view.getUint32(8, true);
+    const cpMin = view.getUint32(12, true);
+    const cpSpan = view.getUint32(16, true);
+    const align4 = (pos) => pos + ((4 - pos % 4) % 4);
+
+    let pos = 32;
+    const slots = new Uint16Array(buffer, pos, cpSpan);
+    pos = align4(pos + 2 * cpSpan);
+
+    const fields = [];
+    for (let f = 0; f < fieldCount; f++) {
+        const mode = view.getUint8(pos);
+        const symbolCount = view.getUint16(pos + 2, true);
+        const poolCount = view.getUint32(pos + 4, true);
+        pos += 8;
+        const symbols = [];
+        for (let i = 0; i < symbolCount; i++) {
+            symbols.push(String.fromCodePoint(view.getUint32(pos + 4 * i, true)));
+        }
+        pos += 4 * symbolCount;
+        let refs = null;
+        if (mode === 0) {
+            refs = new Uint16Array(buffer, pos, count);
+            pos = align4(pos + 2 * count);
+        }
+        const offsets = new Uint32Array(buffer, pos, poolCount + 1);
+        pos += 4 * (poolCount + 1);
+        const data = new Uint8Array(buffer, pos, offsets[poolCount]);
+        pos = align4(pos + offsets[poolCount]);
+        fields.push({ refs, offsets, data, symbols });
+    }
+
+    return {
+        count,
+        lookup(char) {
+            const i = char.codePointAt(0) - cpMin;
+            if (i < 0 || i >= cpSpan || !slots[i]) return null;
+            const row = slots[i] - 1;
+            const entry = {};
+            fields.forEach((field, f) => {
+                const index = field.refs ? field.refs[row] : row;
+                let value = '';
+                for (let k = field.offsets[index]; k < field.offsets[index + 1]; k++) {
+                    value += field.symbols[field.data[k]];
+                }
+                entry[PACKED_FIELDS[f]] = value;
+            });
+            return entry;
+        }
+    };
+}
+
+// 查詢字典（dictionaryData 優先，其次為 dictionary.bin；查到的結果存回 dictionaryData）
+function lookupDictionary(char) {
+    if (dictionaryData[char]) return dictionaryData[char];
+    if (packedDictionary) {
+        const entry = packedDictionary.lookup(char);
+        if (entry) {
+            dictionaryData[char] = entry;
+            return entry;
+        }
+    }
+    return null;
+}
+
+// 分層字典 (dict-shards/)：先載入常用字分片，冷門分片依字碼點範圍按需載入
+// 格式說明見 build_dict.py 的 save_dictionary_shards
+let dictionaryShards = null;
+const loadedShards = new Map();
+
+function loadDictionaryShard(file) {
+    if (!loadedShards.has(file)) {
+        const request = fetch(`dict-shards/${file}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.json();
+            })
+            .then(data => {
+                data.forEach(([char, zhuyin, cangjie, boshiamy, pinyin]) => {
+                    dictionaryData[char] = { zhuyin, cangjie, boshiamy, pinyin };
+                });
+                return data.length;
+            })
+            .catch(error => {
+                loadedShards.delete(file);  // 失敗時允許下次重試
+                throw error;
+            });
+        loadedShards.set(file, request);
+    }
+    return loadedShards.get(file);
+}
+
+// 確保字元所在的冷門分片已載入（同一分片只請求一次）
+async function ensureDictionaryShards(chars) {
+    if (!dictionaryShards) return;
+    const files = new Set();
+    for (const char of chars) {
+        if (dictionaryData[char]) continue;
+        const cp = char.codePointAt(0);
+        const shard = dictionaryShards.cold.find(s => cp >= s.from && cp <= s.to);
+        if (shard) files.add(shard.file);
+    }
+    await Promise.all([...files].map(file =>
+        loadDictionaryShard(file).catch(error =>
+            console.warn(`Failed to load dictionary shard ${file}:`, error.message))
+    ));
+}
+
+// 套用 daily_news.json 內預先計算的編碼表（fetch_news.py 產生），當日內容不需再逐字查詢
+function applyEncodingBundle(bundle) {
+    if (!bundle || !bundle.table) return 0;
+    const fields = bundle.fields || PACKED_FIELDS;
+    const sep = bundle.sep || '|';
+    let count = 0;
+    for (const [char, packed] of Object.entries(bundle.table)) {
+        if (dictionaryData[char]) continue;
+        const values = packed.split(sep);
+        const entry = {};
+        fields.forEach((name, i) => { entry[name] = values[i]; });
+        dictionaryData[char] = entry;
+        count++;
+    }
+    if (bundle.unresolved && bundle.unresolved.length > 0) {
+        console.log(`Encoding bundle: ${bundle.unresolved.length} unresolved characters (${bundle.unresolved.join('')})`);
+    }
+    return count;
+}
+
+// 載入字典（僅當 dictionaryData 為空時）：優先使用分層字典，其次為 dictionary.bin、dictionary.json、dictionary-data.js
 async function loadDictionary() {
     // 如果 dictionaryData 已從 dictionary-data.js 預載入，就跳過
     if (Object.keys(dictionaryData).length > 0) {
@@ -77,6 +217,32 @@ async function loadDictionary() {
         return true;
     }
 
+    // 嘗試載入分層字典：manifest 與常用字分片
+    try {
+        const response = await fetch('dict-shards/manifest.json');
+        if (response.ok) {
+            const manifest = await response.json();
+            const count = await loadDictionaryShard(manifest.hot.file);
+            dictionaryShards = manifest;
+            console.log(`Dictionary loaded via dict-shards: ${count}/${manifest.total} characters (hot)`);
+            return true;
+        }
+    } catch (error) {
+        console.warn('Failed to load dict-shards, falling back to dictionary.bin:', error.message);
+    }
+
+    // 嘗試載入二進位字典，查詢時才解碼個別字元
+    try {
+        const response = await fetch('dictionary.bin');
+        if (response.ok) {
+            packedDictionary = parsePackedDictionary(await response.arrayBuffer());
+            console.log(`Dictionary loaded via dictionary.bin: ${packedDictionary.count} characters`);
+            return true;
+        }
+    } catch (error) {
+        console.warn('Failed to load dictionary.bin, falling back to dictionary.json:', error.message);
+    }
+
     // 否則嘗試用 fetch 載入 dictionary.json
     try {
         const response = await fetch('dictionary.json');
@@ -93,6 +259,21 @@ async function loadDictionary() {
     } catch (error) {
         console.warn('Failed to load dictionary.json (this is OK if using file:// protocol):', error.message);
     }
+
+    // 最後以 <script> 載入 dictionary-data.js（file:// 協議下 fetch 無法使用）
+    try {
+        await new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = 'dictionary-data.js';
+            script.onload = resolve;
+            script.onerror = () => reject(new Error('script load error'));
+            document.head.appendChild(script);
+        });
+        console.log(`Dictionary loaded via dictionary-data.js: ${Object.keys(dictionaryData).length} characters`);
+        return true;
+    } catch (error) {
+        console.warn('Failed to load dictionary-data.js:', error.message);
+    }
     return false;
 }
 
@@ -323,8 +504,9 @@ function removePinyinTone(pinyin) {
 // 取得編碼（同步，從快取或本地資料庫）
 function getCachedEncoding(char) {
     // 1. 先檢查新的 dictionary.json 資料（優先）
-    if (dictionaryData[char]) {
-        return dictionaryData[char];
+    const entry = lookupDictionary(char);
+    if (entry) {
+        return entry;
     }
     // 2. 再檢查持久化快取
     if (persistentEncodingCache[char]) {
@@ -340,7 +522,11 @@ function getCachedEncoding(char) {
 // 即時查詢單一字元編碼並快取
 async function fetchEncodingForChar(char) {
     // 已有資料就跳過（優先檢查 dictionary.json）
-    if (dictionaryData[char]) return dictionaryData[char];
+    let entry = lookupDictionary(char);
+    if (entry) return entry;
+    await ensureDictionaryShards([char]);
+    entry = lookupDictionary(char);
+    if (entry) return entry;
     if (persistentEncodingCache[char]) return persistentEncodingCache[char];
     if (typeof encodingData !== 'undefined' && encodingData[char]) return encodingData[char];
 
@@ -368,10 +554,11 @@ async function fetchEncodingForChar(char) {
 async function prefetchAllEncodings(texts) {
     const allText = texts.join('');
     const chineseChars = [...new Set(allText.split('').filter(isChinese))];
+    await ensureDictionaryShards(chineseChars);
 
     // 找出需要查詢的字元（優先檢查 dictionary.json）
     const charsToFetch = chineseChars.filter(char =>
-        !dictionaryData[char] &&
+        !lookupDictionary(char) &&
         !persistentEncodingCache[char] &&
         !(typeof encodingData !== 'undefined' && encodingData[char])
     );
@@ -514,6 +701,10 @@ async function loadTodayNewsInBackground() {
                 newsData.zh = data.zh;
                 newsData.en = data.en;
 
+                // 套用預先計算的編碼表
+                const bundled = applyEncodingBundle(data.encodings);
+                if (bundled > 0) console.log(`✓ Applied ${bundled} bundled encodings`);
+
                 // 載入文章資料
                 if (data.articles_zh && data.articles_zh.length > 0) {
                     articleData.zh = data.articles_zh;
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Input Method Table Reader
+輸入法碼表讀取器：同時支援 .cin 與 Fcitx5 table 兩種格式
+
+整份檔案一次讀入，使用預先編譯的行文法（regex）切出區塊與字碼紀錄，
+不再逐行 strip / split / 比對區塊標記。
+
+.cin 格式 (OpenVanilla / chinese-opendesktop)：
+- %name value                單行屬性，如 %ename、%selkey、%endkey
+- %name begin ... %name end  區塊，如 %keyname、%chardef
+- 區塊內每行格式: code char
+
+Fcitx5 格式：
+- key=value                  屬性，如 键码=、码长=
+- [数据] / [資料] / [Data]    之後為字碼定義，每行格式: code char
+"""
+
+import os
+import re
+from typing import Dict, Iterator, List, Tuple
+
+# ========================================
+# 行文法 (Line Grammar)
+# ========================================
+# 水平空白（不含換行）
+_HS = r'[^\S\n]'
+
+# 字碼紀錄：code 不可以 # 開頭，char 必須為單一字元
+_RECORD_RE = re.compile(
+    rf'^{_HS}*([^\s#]\S*){_HS}+(\S){_HS}*$',
+    re.MULTILINE,
+)
+
+# .cin 區塊開頭：%name begin（結尾 %name end 由 _cin_block_end 尋找）
+_CIN_BEGIN_RE = re.compile(
+    rf'^{_HS}*%(\w+){_HS}+begin{_HS}*$\n?',
+    re.MULTILINE,
+)
+
+# .cin 單行屬性：%name value
+_CIN_PROPERTY_RE = re.compile(
+    rf'^{_HS}*%(\w+)(?:{_HS}+(.*?))?{_HS}*$',
+    re.MULTILINE,
+)
+
+# Fcitx5 區塊標記：[name]
+_FCITX_SECTION_RE = re.compile(
+    rf'^{_HS}*\[([^\]\n]*)\]{_HS}*$',
+    re.MULTILINE,
+)
+
+# Fcitx5 屬性：key=value
+_FCITX_PROPERTY_RE = re.compile(
+    rf'^{_HS}*([^\s#=\[][^=\n]*?){_HS}*={_HS}*(.*?){_HS}*$',
+    re.MULTILINE,
+)
+
+# Fcitx5 資料區塊名稱
+FCITX_DATA_SECTIONS = ('数据', '資料', 'Data')
+
+# 含有字碼紀錄的 .cin 區塊
+CIN_RECORD_BLOCKS = ('chardef',)
+
+
+def _read_text(filepath: str) -> str:
+    """一次讀入整份檔案並統一換行符號"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+class InputMethodTable:
+    """
+    已讀入的輸入法碼表
+
+    - properties: 單行屬性 (如 ename、selkey、endkey 或 Fcitx5 的 键码)
+    - blocks: 區塊原文 (如 keyname、chardef，或 Fcitx5 的 数据)
+    """
+
+    __slots__ = ('path', 'format', 'properties', 'blocks')
+
+    def __init__(self, path: str, fmt: str, properties: Dict[str, str],
+                 blocks: Dict[str, List[str]]):
+        self.path = path
+        self.format = fmt
+        self.properties = properties
+        self.blocks = blocks
+
+    @property
+    def selkey(self) -> str:
+        """選字鍵"""
+        return self.properties.get('selkey', '')
+
+    @property
+    def endkey(self) -> str:
+        """結束鍵（如注音的聲調鍵）"""
+        return self.properties.get('endkey', '')
+
+    @property
+    def keyname(self) -> Dict[str, str]:
+        """%keyname 區塊：鍵盤碼到字根/符號的對照表"""
+        return dict(self.block_records('keyname'))
+
+    def block_records(self, name: str) -> Iterator[Tuple[str, str]]:
+        """依序產生指定區塊內的 (code, char) 紀錄"""
+        for body in self.blocks.get(name, ()):
+            yield from _RECORD_RE.findall(body)
+
+    def records(self) -> Iterator[Tuple[str, str]]:
+        """依序產生所有字碼定義的 (code, char) 紀錄"""
+        names = FCITX_DATA_SECTIONS if self.format == 'fcitx' else CIN_RECORD_BLOCKS
+        for name in names:
+            yield from self.block_records(name)
+
+
+def _cin_block_end(text: str, name: str, pos: int) -> Tuple[int, int]:
+    """
+    尋找 %name end 標記，回傳 (區塊內容結尾, 標記結尾)
+    未結束的區塊延伸至檔尾。
+    """
+    end_re = re.compile(rf'^{_HS}*%{re.escape(name)}{_HS}+end{_HS}*$', re.MULTILINE)
+    match = end_re.search(text, pos)
+    if match is None:
+        return len(text), len(text)
+    return match.start(), match.end()
+
+
+def _split_cin(text: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """切出 .cin 的單行屬性與區塊"""
+    properties = {}
+    blocks = {}
+    headers = []
+    pos = 0
+
+    while True:
+        match = _CIN_BEGIN_RE.search(text, pos)
+        if match is None:
+            break
+        name = match.group(1)
+        body_end, pos_next = _cin_block_end(text, name, match.end())
+        headers.append(text[pos:match.start()])
+        blocks.setdefault(name, []).append(text[match.end():body_end])
+        pos = pos_next
+    headers.append(text[pos:])
+
+    for header in headers:
+        for name, value in _CIN_PROPERTY_RE.findall(header):
+            properties.setdefault(name, value)
+
+    return properties, blocks
+
+
+def _split_fcitx(text: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """切出 Fcitx5 的屬性與 [區塊]"""
+    matches = list(_FCITX_SECTION_RE.finditer(text))
+    header_end = matches[0].start() if matches else len(text)
+
+    properties = {}
+    for key, value in _FCITX_PROPERTY_RE.findall(text, 0, header_end):
+        properties.setdefault(key, value)
+
+    blocks = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        blocks.setdefault(match.group(1), []).append(text[match.end():end])
+
+    return properties, blocks
+
+
+def detect_format(text: str) -> str:
+    """判斷碼表格式：有 .cin 區塊標記即為 'cin'，否則為 'fcitx'"""
+    if _CIN_BEGIN_RE.search(text):
+        return 'cin'
+    return 'fcitx'
+
+
+def read_table(filepath: str, fmt: str = None) -> InputMethodTable:
+    """
+    讀入輸入法碼表
+
+    fmt 可為 'cin' 或 'fcitx'；未指定時依檔案內容自動判斷。
+    """
+    text = _read_text(filepath)
+    if fmt is None:
+        fmt = detect_format(text)
+
+    if fmt == 'cin':
+        properties, blocks = _split_cin(text)
+    elif fmt == 'fcitx':
+        properties, blocks = _split_fcitx(text)
+    else:
+        raise ValueError(f"Unknown table format: {fmt}")
+
+    return InputMethodTable(filepath, fmt, properties, blocks)
+
+
+def iter_records(filepath: str, fmt: str = None) -> Iterator[Tuple[str, str]]:
+    """依序產生碼表中所有 (code, char) 紀錄"""
+    return read_table(filepath, fmt).records()
+
+
+def collect_char_codes(records) -> Dict[str, List[str]]:
+    """將 (code, char) 紀錄整理為 {char: [code, ...]}，保留原始順序"""
+    char_codes = {}
+    for code, char in records:
+        codes = char_codes.get(char)
+        if codes is None:
+            char_codes[char] = [code]
+        else:
+            codes.append(code)
+    return char_codes
+
+
+if __name__ == '__main__':
+    import sys
+
+    for path in sys.argv[1:]:
+        table = read_table(path)
+        count = sum(1 for _ in table.records())
+        print(f"{os.path.basename(path)}: format={table.format}, "
+              f"records={count}, blocks={sorted(table.blocks)}")
+        if table.selkey:
+            print(f"  selkey: {table.selkey}")
+        if table.endkey:
+            print(f"  endkey: {table.endkey}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+News Text Normalization
+Single-pass cleanup for titles and article text: one fused regex for everything
+that needs context (tags, entities, ellipses, quotes, dashes, number
+separators), then one precompiled character table for the context-free
+mappings (half- to full-width punctuation, digits), then whitespace collapse.
+The regex only matches the rare spans, so ordinary punctuation never goes
+through a Python callback.
+
+The table is applied as str.replace for the characters that actually occur:
+str.translate looks up every character of a CJK string in a dict and measured
+over 10x slower than a handful of memchr-backed replaces.
+
+Chinese text ('zh'):
+- , . ? ! : ; ( )    -> full-width，。？！：；（）
+  except between digits or letters (3.5, 1,000, 12:30, Node.js keep ASCII)
+- ... / … / 。。。    -> ……
+- “ ” and paired "   -> 「 」;  ‘ ’ -> 『 』 (apostrophes inside words stay ')
+- — ― runs           -> ——;  ‒ – -> -
+- ０-９ -> 0-9
+English text ('en'):
+- “ ” -> ";  ‘ ’ -> ';  ‒ – — ― -> -;  … -> ...;  ０-９ -> 0-9
+Both: whitespace runs collapse to one space, ends are stripped; with html=True
+tags are removed and entities decoded as well.
+"""
+
+import html as _html
+import re
+
+# Separators kept half-width are emitted as private-use placeholders by the
+# regex and mapped back to ASCII by the table (plain . , : become full-width)
+_KEEP = {'.': '\ue000', ',': '\ue001', ':': '\ue002'}
+
+_FULLWIDTH_DIGITS = [(chr(0xFF10 + i), str(i)) for i in range(10)]
+
+# Ordered (source, replacement) pairs; placeholders are restored last so the
+# ASCII they produce is not converted again
+_TABLES = {
+    'zh': tuple(_FULLWIDTH_DIGITS + [
+        (',', '，'), ('.', '。'), ('?', '？'), ('!', '！'),
+        (':', '：'), (';', '；'), ('(', '（'), (')', '）'),
+        ('“', '「'), ('”', '」'), ('‘', '『'), ('’', '』'),
+        ('‒', '-'), ('–', '-'),
+    ] + [(v, k) for k, v in _KEEP.items()]),
+    'en': tuple(_FULLWIDTH_DIGITS + [
+        ('“', '"'), ('”', '"'), ('‘', "'"), ('’', "'"),
+        ('‒', '-'), ('–', '-'), ('—', '-'), ('―', '-'), ('…', '...'),
+    ]),
+}
+
+_ELLIPSIS = {'zh': '……', 'en': '...'}
+
+# Every alternative starts with a literal character, so the regex engine can
+# skip ahead on a character-set prefix instead of trying each rule at every
+# position; the callback dispatches on the matched text.
+_MARKUP = [
+    r'</?[A-Za-z!][^<>]*>',
+    r'&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);',
+]
+_COMMON = [
+    r'\.\.\.+', r'……+', r'⋯⋯*', r'。。。+',
+]
+_ZH_RULES = [
+    r'…',
+    # Separators between digits or letters stay half-width
+    r'\.(?<=[0-9A-Za-z]\.)(?=[0-9A-Za-z])',
+    r',(?<=[0-9A-Za-z],)(?=[0-9A-Za-z])',
+    r':(?<=[0-9A-Za-z]:)(?=[0-9A-Za-z])',
+    # Apostrophe inside a word
+    r'’(?<=[A-Za-z]’)(?=[A-Za-z])',
+    r'—[—―]*', r'―[—―]*',
+    r'"',
+]
+
+
+def _compile(lang: str, html: bool) -> re.Pattern:
+    rules = (_MARKUP if html else []) + _COMMON + (_ZH_RULES if lang == 'zh' else [])
+    return re.compile('|'.join(rules))
+
+
+_PATTERNS = {(lang, html): _compile(lang, html) for lang in ('zh', 'en') for html in (False, True)}
+
+
+def normalize_text(text: str, lang: str, html: bool = False) -> str:
+    """
+    Normalize text for typing practice: one regex pass, then the character table.
+
+    lang is 'zh' or 'en' (anything else is treated as 'en'); html=True also
+    strips tags and decodes entities (RSS titles).
+    """
+    lang = 'zh' if lang == 'zh' else 'en'
+    plain = _PATTERNS[(lang, False)]
+    ellipsis = _ELLIPSIS[lang]
+    double_quote_open = [True]
+
+    def replace(match: re.Match) -> str:
+        value = match.group()
+        first = value[0]
+        if first == '"':
+            opened = double_quote_open[0]
+            double_quote_open[0] = not opened
+            return '「' if opened else '」'
+        if first == '<':
+            return ''
+        if first == '&':
+            # Decoded characters get the same treatment (and quote pairing) as literal ones
+            decoded = _html.unescape(value)
+            return plain.sub(replace, decoded) if decoded != value else value
+        if len(value) == 1:
+            if first in _KEEP:
+                return _KEEP[first]
+            if first == '’':
+                return "'"
+            if first == '…':
+                return ellipsis
+        if first in '—―':
+            return '——'
+        return ellipsis
+
+    text = _PATTERNS[(lang, html)].sub(replace, text)
+    for source, target in _TABLES[lang]:
+        if source in text:
+            text = text.replace(source, target)
+    # Collapse whitespace runs (including any left by removed tags) and strip
+    return ' '.join(text.split())